@@ -0,0 +1,57 @@
+package main
+
+import (
+	"context"
+	"database/sql"
+
+	"github.com/marktplaats-scraper/scraper-golang/internal/marktplaats"
+)
+
+// mailQueueDepth — сколько готовых к рассылке проходов может ждать, пока идёт SMTP предыдущего.
+const mailQueueDepth = 4
+
+// mailQueue — рассылка в режиме -scrape-loop: проходы скрапа кладут объявления в канал, одна горутина
+// их рассылает. Следующий проход не ждёт SMTP (задержки -mail-delay между письмами), а потребитель
+// спит на канале без опроса. Переполненная очередь блокирует push — скрап не уходит далеко вперёд почты.
+// После отмены ctx (сигнал) текущая рассылка останавливается между письмами, а поставленные проходы
+// отбрасываются: close не держит процесс на минутах SMTP.
+type mailQueue struct {
+	ctx  context.Context
+	ch   chan []marktplaats.Listing
+	done chan struct{}
+}
+
+func startMailQueue(ctx context.Context, db *sql.DB, m mailOpts) *mailQueue {
+	q := &mailQueue{
+		ctx:  ctx,
+		ch:   make(chan []marktplaats.Listing, mailQueueDepth),
+		done: make(chan struct{}),
+	}
+	go func() {
+		defer close(q.done)
+		for list := range q.ch {
+			if ctx.Err() != nil {
+				continue // отмена: оставшиеся проходы только вычитываются
+			}
+			sendMailAfterScrape(ctx, db, m, list)
+		}
+	}()
+	return q
+}
+
+func (q *mailQueue) push(list []marktplaats.Listing) {
+	if len(list) == 0 {
+		return
+	}
+	select {
+	case q.ch <- list:
+	case <-q.ctx.Done():
+	}
+}
+
+// close закрывает очередь и ждёт, пока уйдут уже поставленные проходы (после отмены ctx — только
+// до конца текущего письма).
+func (q *mailQueue) close() {
+	close(q.ch)
+	<-q.done
+}
@@ -26,6 +26,7 @@ const defaultURL = "https://www.marktplaats.nl/"
 
 func main() {
 	envload.LoadDefaults()
+	defer prettylog.Flush()
 
 	headless := flag.Bool("headless", false, "запуск Chromium без окна (headless)")
 	nonHeadless := flag.Bool("non-headless", false, "запуск Chromium с видимым окном; перекрывает -headless")
@@ -191,43 +192,65 @@ func main() {
 			}
 			ctx, stop := signal.NotifyContext(context.Background(), os.Interrupt, syscall.SIGTERM)
 			defer stop()
+			var parentCache *parentCategoryCache
+			if *scrapeLoop {
+				parentCache = &parentCategoryCache{}
+			}
+			deliver := func(list []marktplaats.Listing) { sendMailAfterScrape(ctx, db, m, list) }
+			if *scrapeLoop && m.send {
+				mq := startMailQueue(ctx, db, m)
+				defer func() {
+					// После сигнала — обычная обработка следующего: повторный Ctrl+C завершает процесс сразу.
+					if ctx.Err() != nil {
+						stop()
+					}
+					mq.close()
+				}()
+				deliver = mq.push
+			}
+			// Один таймер паузы на все циклы: time.After в select заводил бы новый таймер на каждый проход.
+			pause := time.NewTimer(0)
+			if !pause.Stop() {
+				<-pause.C
+			}
+			defer pause.Stop()
 			for cycle := 1; ; cycle++ {
-				select {
-				case <-ctx.Done():
+				if ctx.Err() != nil {
 					prettylog.Warn("останов по сигналу", "")
 					return
-				default:
 				}
 				if *scrapeLoop {
 					prettylog.Section(fmt.Sprintf("Цикл скрапа %d", cycle))
 				}
 				list, saved, _, audits, perr := runScrapePool(ctx, pb, scrapePoolParams{
-					baseURL:    *scrapeBase,
-					limit:      *limit,
-					fast:       *fast,
-					skipCount:  *skipCount,
-					db:         db,
-					maxAge:     maxAge,
-					workers:    *scrapeWorkers,
-					allParents: scrapeAllParentsEff,
-					parentIdx:  *parentIdx,
-					proxyRing:  poolProxyRing,
-					policy:     policy,
+					baseURL:     *scrapeBase,
+					limit:       *limit,
+					fast:        *fast,
+					skipCount:   *skipCount,
+					db:          db,
+					maxAge:      maxAge,
+					workers:     *scrapeWorkers,
+					allParents:  scrapeAllParentsEff,
+					parentIdx:   *parentIdx,
+					proxyRing:   poolProxyRing,
+					policy:      policy,
+					parentCache: parentCache,
 				})
 				if perr != nil {
 					prettylog.Warnf("ошибка прохода: %v", perr)
 				}
 				printPoolResults(audits, list, saved, *scrapeWorkers > 1, db)
-				sendMailAfterScrape(db, m, list)
+				deliver(list)
 				if !*scrapeLoop {
 					break
 				}
 				prettylog.Scrapef("следующий цикл через %s (Ctrl+C — выход)", (*scrapeLoopInterval).String())
+				pause.Reset(*scrapeLoopInterval)
 				select {
 				case <-ctx.Done():
 					prettylog.Warn("останов по сигналу", "")
 					return
-				case <-time.After(*scrapeLoopInterval):
+				case <-pause.C:
 				}
 			}
 			return
@@ -314,20 +337,16 @@ func runScrape(sess *marktplaats.PlaywrightSession, base string, limit int, fast
 		AuditTrail:  &listingAudits,
 	}
 	if db != nil {
-		existing, lerr := listingsdb.LoadItemIDs(db)
-		if lerr != nil {
-			prettylog.Fatalf("SQLite: загрузка item_id: %v", lerr)
-		}
-		opts.ExistingIDs = existing
-		prettylog.Scrapef("в БД уже объявлений (дубликаты пропускаются): %d", len(existing))
+		opts.FilterNewIDs = filterNewIDs(db)
+		prettylog.Scrape("дубликаты", "сверка item_id с БД по страницам выдачи")
 		opts.OnBatch = func(batch []marktplaats.Listing) {
-			for _, item := range batch {
-				if uerr := listingsdb.Upsert(db, item); uerr != nil {
-					prettylog.Warnf("SQLite upsert %s: %v", item.ItemID, uerr)
-					continue
-				}
-				savedDB++
+			n, berr := listingsdb.UpsertBatch(db, batch, func(id string, uerr error) {
+				prettylog.Warnf("SQLite upsert %s: %v", id, uerr)
+			})
+			if berr != nil {
+				prettylog.Warnf("SQLite upsert пачки (%d): %v", len(batch), berr)
 			}
+			savedDB += n
 		}
 	}
 	doneListings := prettylog.Timer("объявления: подкатегории, счётчик, страницы поиска")
@@ -390,17 +409,30 @@ func runScrape(sess *marktplaats.PlaywrightSession, base string, limit int, fast
 		prettylog.OKf("записей добавлено/обновлено в SQLite за эту сессию: %d", savedDB)
 	}
 
-	sendMailAfterScrape(db, m, list)
+	sendMailAfterScrape(context.Background(), db, m, list)
+}
+
+// filterNewIDs сверка item_id страницы выдачи с listings; при ошибке БД все id считаются новыми
+// (UpsertBatch всё равно обновит уже сохранённые).
+func filterNewIDs(db *sql.DB) func([]string) []string {
+	return func(ids []string) []string {
+		fresh, err := listingsdb.FilterNewItemIDs(db, ids)
+		if err != nil {
+			prettylog.Warnf("SQLite: сверка item_id: %v", err)
+			return ids
+		}
+		return fresh
+	}
 }
 
-func sendMailAfterScrape(db *sql.DB, m mailOpts, list []marktplaats.Listing) {
+func sendMailAfterScrape(ctx context.Context, db *sql.DB, m mailOpts, list []marktplaats.Listing) {
 	if !m.send || db == nil || len(list) == 0 {
 		return
 	}
 	prettylog.Section("Почта (Gmail SMTP)")
 	prettylog.Scrapef("воркер user_id=%d · объявлений в рассылке: %d", m.userID, len(list))
 	doneMail := prettylog.Timer("рассылка писем продавцам")
-	st := mailer.BulkSendListings(db, m.userID, list, m.delay, m.skipRCPT)
+	st := mailer.BulkSendListingsContext(ctx, db, m.userID, list, m.delay, m.skipRCPT)
 	doneMail()
 	prettylog.OKf("писем отправлено: %d", st.OK)
 	if st.NotExists > 0 {
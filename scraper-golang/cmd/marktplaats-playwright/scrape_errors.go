@@ -2,11 +2,15 @@ package main
 
 import (
 	"errors"
-	"strings"
+	"regexp"
 
 	"github.com/marktplaats-scraper/scraper-golang/internal/marktplaats"
 )
 
+// rotateErrRe — одна предкомпилированная альтернатива вместо цепочки strings.Contains
+// (таймауты, закрытый таргет/фрейм, net::ERR_* и ошибки прокси/туннеля).
+var rotateErrRe = regexp.MustCompile(`(?i)timeout|err_aborted|target closed|frame was detached|net::err|err_(?:proxy|tunnel|socks)_|proxy|tunnel|econnrefused|err_internet_disconnected`)
+
 // shouldRotatePlaywrightErr — ошибки, после которых имеет смысл следующий прокси / новый контекст.
 func shouldRotatePlaywrightErr(err error) bool {
 	if err == nil {
@@ -15,23 +19,7 @@ func shouldRotatePlaywrightErr(err error) bool {
 	if errors.Is(err, marktplaats.ErrForbidden) {
 		return true
 	}
-	s := strings.ToLower(err.Error())
-	if strings.Contains(s, "timeout") {
-		return true
-	}
-	if strings.Contains(s, "err_aborted") {
-		return true
-	}
-	if strings.Contains(s, "target closed") {
-		return true
-	}
-	if strings.Contains(s, "frame was detached") {
-		return true
-	}
-	if strings.Contains(s, "net::err") {
-		return true
-	}
-	return false
+	return rotateErrRe.MatchString(err.Error())
 }
 
 // maxProxyAttempts — число попыток с переключением прокси (минимум 3, максимум 20).
@@ -0,0 +1,33 @@
+package main
+
+import (
+	"errors"
+	"fmt"
+	"testing"
+
+	"github.com/marktplaats-scraper/scraper-golang/internal/marktplaats"
+)
+
+func TestShouldRotatePlaywrightErr(t *testing.T) {
+	rotate := []error{
+		fmt.Errorf("goto: %w", marktplaats.ErrForbidden),
+		errors.New("Timeout 30000ms exceeded"),
+		errors.New("page.goto: net::ERR_ABORTED at https://www.marktplaats.nl/"),
+		errors.New("net::ERR_PROXY_CONNECTION_FAILED"),
+		errors.New("net::ERR_TUNNEL_CONNECTION_FAILED"),
+		errors.New("dial tcp 1.2.3.4:8080: connect: ECONNREFUSED"),
+		errors.New("Target closed"),
+		errors.New("Frame was detached"),
+	}
+	for _, err := range rotate {
+		if !shouldRotatePlaywrightErr(err) {
+			t.Fatalf("expected rotate for %q", err)
+		}
+	}
+	keep := []error{nil, marktplaats.ErrNextDataMissing, errors.New("json: unexpected end")}
+	for _, err := range keep {
+		if shouldRotatePlaywrightErr(err) {
+			t.Fatalf("unexpected rotate for %v", err)
+		}
+	}
+}
@@ -28,9 +28,11 @@ type scrapePoolParams struct {
 	parentIdx  int
 	proxyRing  *proxyRing // nil — без прокси; при ошибках скрапа Advance() и новый контекст
 	policy     marktplaats.BrowserResourcePolicy
+	// parentCache — кеш родительских категорий между циклами -scrape-loop; nil — каждый раз с главной.
+	parentCache *parentCategoryCache
 }
 
-func runScrapePool(_ context.Context, pb *marktplaats.PlaywrightBrowser, p scrapePoolParams) ([]marktplaats.Listing, int, *marktplaats.TimingStats, []marktplaats.ListingAuditRow, error) {
+func runScrapePool(ctx context.Context, pb *marktplaats.PlaywrightBrowser, p scrapePoolParams) ([]marktplaats.Listing, int, *marktplaats.TimingStats, []marktplaats.ListingAuditRow, error) {
 	if pb == nil {
 		return nil, 0, nil, nil, errors.New("браузер не задан")
 	}
@@ -41,57 +43,18 @@ func runScrapePool(_ context.Context, pb *marktplaats.PlaywrightBrowser, p scrap
 	stats := &marktplaats.TimingStats{}
 	policy := p.policy
 
-	var coPage playwright.Page
-	var coCtx playwright.BrowserContext
-	defer func() {
-		if coPage != nil {
-			_ = coPage.Close()
-		}
-		if coCtx != nil {
-			_ = coCtx.Close()
-		}
-	}()
-
-	maxCat := maxProxyAttempts(0)
-	if p.proxyRing != nil {
-		maxCat = maxProxyAttempts(p.proxyRing.Len())
-	}
 	prettylog.Section("Категории")
-	prettylog.Scrapef("главная → родительские категории (%s)", p.baseURL)
-	var parents []marktplaats.Category
-	var err error
-	for catTry := 0; catTry < maxCat; catTry++ {
-		pw := (*playwright.Proxy)(nil)
-		if p.proxyRing != nil {
-			pw = p.proxyRing.Playwright()
-		}
-		coPage, coCtx, err = pb.NewStealthPage(pw, policy)
+	parents := p.parentCache.get(p.baseURL)
+	if parents != nil {
+		prettylog.Scrapef("родительские категории из кеша прошлого цикла (%s)", p.baseURL)
+	} else {
+		prettylog.Scrapef("главная → родительские категории (%s)", p.baseURL)
+		var err error
+		parents, err = loadParentCategories(pb, p, stats)
 		if err != nil {
 			return nil, 0, stats, nil, err
 		}
-		coSc := marktplaats.NewScraper(coPage)
-		coSc.BaseURL = p.baseURL
-		coSc.TimeoutMS = 30_000
-		coSc.Stats = stats
-
-		doneParents := prettylog.Timer("категории: главная, HTML и __CONFIG__")
-		parents, err = coSc.GetParentCategories()
-		doneParents()
-		if err == nil {
-			break
-		}
-		_ = coPage.Close()
-		_ = coCtx.Close()
-		coPage, coCtx = nil, nil
-		if p.proxyRing == nil || !shouldRotatePlaywrightErr(err) {
-			return nil, 0, stats, nil, err
-		}
-		prettylog.Warnf("категории: смена прокси · %v", err)
-		p.proxyRing.Advance()
-		prettylog.Proxy("следующий прокси (категории)", p.proxyRing.Mask())
-	}
-	if err != nil {
-		return nil, 0, stats, nil, err
+		p.parentCache.put(p.baseURL, parents)
 	}
 	prettylog.OKf("найдено родительских категорий: %d", len(parents))
 	if len(parents) == 0 {
@@ -117,15 +80,10 @@ func runScrapePool(_ context.Context, pb *marktplaats.PlaywrightBrowser, p scrap
 	prettylog.Scrapef("воркеров (контекстов): %d · родительских категорий в очереди: %d", p.workers, len(toRun))
 
 	sharedSeen := make(map[string]struct{})
+	var filterNew func([]string) []string
 	if p.db != nil {
-		existing, lerr := listingsdb.LoadItemIDs(p.db)
-		if lerr != nil {
-			return nil, 0, stats, nil, fmt.Errorf("SQLite: загрузка item_id: %w", lerr)
-		}
-		for id := range existing {
-			sharedSeen[id] = struct{}{}
-		}
-		prettylog.Scrapef("в БД уже объявлений (дубликаты пропускаются): %d", len(existing))
+		filterNew = filterNewIDs(p.db)
+		prettylog.Scrape("дубликаты", "сверка item_id с БД по страницам выдачи")
 	}
 
 	var listingAudits []marktplaats.ListingAuditRow
@@ -146,6 +104,9 @@ func runScrapePool(_ context.Context, pb *marktplaats.PlaywrightBrowser, p scrap
 	var firstErr error
 	var errOnce sync.Once
 
+	// Один темп на хост для всех воркеров и всех попыток через прокси: backoff после 403 общий.
+	limits := marktplaats.RateLimitsFor(p.baseURL)
+
 	doneListings := prettylog.Timer("объявления: пул, подкатегории, страницы поиска")
 
 	for w := 0; w < p.workers; w++ {
@@ -153,6 +114,10 @@ func runScrapePool(_ context.Context, pb *marktplaats.PlaywrightBrowser, p scrap
 		go func(workerID int) {
 			defer wg.Done()
 			for parent := range jobs {
+				// По сигналу новые категории не берутся; уже собранное возвращается и печатается.
+				if ctx.Err() != nil {
+					return
+				}
 				maxAtt := maxProxyAttempts(0)
 				if p.proxyRing != nil {
 					maxAtt = maxProxyAttempts(p.proxyRing.Len())
@@ -174,30 +139,32 @@ func runScrapePool(_ context.Context, pb *marktplaats.PlaywrightBrowser, p scrap
 					}
 					sc := marktplaats.NewScraper(page)
 					sc.BaseURL = p.baseURL
+					sc.Limits = limits
 					sc.Fast = p.fast
 					sc.SkipCount = p.skipCount
 					sc.TimeoutMS = 30_000
 					sc.Stats = stats
 
 					opts := marktplaats.GetListingsOptions{
-						SkipCount:   p.skipCount,
-						MaxAgeHours: p.maxAge,
-						ExistingIDs: sharedSeen,
-						ItemIDsMu:   &itemMu,
-						AuditTrail:  &listingAudits,
-						AuditMu:     &auditMu,
+						SkipCount:    p.skipCount,
+						MaxAgeHours:  p.maxAge,
+						ExistingIDs:  sharedSeen,
+						FilterNewIDs: filterNew,
+						ItemIDsMu:    &itemMu,
+						AuditTrail:   &listingAudits,
+						AuditMu:      &auditMu,
 					}
 					if p.db != nil {
 						opts.OnBatch = func(batch []marktplaats.Listing) {
 							batchMu.Lock()
 							defer batchMu.Unlock()
-							for _, item := range batch {
-								if uerr := listingsdb.Upsert(p.db, item); uerr != nil {
-									prettylog.Warnf("SQLite upsert %s: %v", item.ItemID, uerr)
-									continue
-								}
-								savedDB++
+							n, berr := listingsdb.UpsertBatch(p.db, batch, func(id string, uerr error) {
+								prettylog.Warnf("SQLite upsert %s: %v", id, uerr)
+							})
+							if berr != nil {
+								prettylog.Warnf("SQLite upsert пачки (%d): %v", len(batch), berr)
 							}
+							savedDB += n
 						}
 					}
 
@@ -214,7 +181,7 @@ func runScrapePool(_ context.Context, pb *marktplaats.PlaywrightBrowser, p scrap
 						gerr = nil
 						break
 					}
-					if p.proxyRing == nil || !shouldRotatePlaywrightErr(gerr) {
+					if p.proxyRing == nil || !shouldRotatePlaywrightErr(gerr) || ctx.Err() != nil {
 						break
 					}
 					prettylog.Warnf("воркер %d · id=%d: ошибка, смена прокси · %v", workerID, parent.ID, gerr)
@@ -240,6 +207,10 @@ func runScrapePool(_ context.Context, pb *marktplaats.PlaywrightBrowser, p scrap
 	}
 	wg.Wait()
 	doneListings()
+	if err := ctx.Err(); err != nil && firstErr == nil {
+		prettylog.Warnf("проход прерван по сигналу · собрано объявлений: %d", len(allList))
+		firstErr = err
+	}
 
 	nav, wNext, nNav, nWait := stats.Snapshot()
 	if nNav > 0 {
@@ -295,3 +266,80 @@ func printPoolResults(listingAudits []marktplaats.ListingAuditRow, list []marktp
 		prettylog.OKf("записей добавлено/обновлено в SQLite за этот проход: %d", savedDB)
 	}
 }
+
+// loadParentCategories открывает отдельный контекст, читает главную и закрывает его; при сетевых ошибках крутит прокси.
+func loadParentCategories(pb *marktplaats.PlaywrightBrowser, p scrapePoolParams, stats *marktplaats.TimingStats) ([]marktplaats.Category, error) {
+	var coPage playwright.Page
+	var coCtx playwright.BrowserContext
+	defer func() {
+		if coPage != nil {
+			_ = coPage.Close()
+		}
+		if coCtx != nil {
+			_ = coCtx.Close()
+		}
+	}()
+
+	maxCat := maxProxyAttempts(0)
+	if p.proxyRing != nil {
+		maxCat = maxProxyAttempts(p.proxyRing.Len())
+	}
+	var parents []marktplaats.Category
+	var err error
+	for catTry := 0; catTry < maxCat; catTry++ {
+		pw := (*playwright.Proxy)(nil)
+		if p.proxyRing != nil {
+			pw = p.proxyRing.Playwright()
+		}
+		coPage, coCtx, err = pb.NewStealthPage(pw, p.policy)
+		if err != nil {
+			return nil, err
+		}
+		coSc := marktplaats.NewScraper(coPage)
+		coSc.BaseURL = p.baseURL
+		coSc.TimeoutMS = 30_000
+		coSc.Stats = stats
+
+		doneParents := prettylog.Timer("категории: главная, HTML и __CONFIG__")
+		parents, err = coSc.GetParentCategories()
+		doneParents()
+		if err == nil {
+			return parents, nil
+		}
+		_ = coPage.Close()
+		_ = coCtx.Close()
+		coPage, coCtx = nil, nil
+		if p.proxyRing == nil || !shouldRotatePlaywrightErr(err) {
+			return nil, err
+		}
+		prettylog.Warnf("категории: смена прокси · %v", err)
+		p.proxyRing.Advance()
+		prettylog.Proxy("следующий прокси (категории)", p.proxyRing.Mask())
+	}
+	return nil, err
+}
+
+// parentCategoriesTTL — сколько циклы -scrape-loop переиспользуют список родительских категорий:
+// он меняется редко, а каждый запрос — отдельный контекст браузера и загрузка главной.
+const parentCategoriesTTL = 30 * time.Minute
+
+// parentCategoryCache родительские категории между циклами пула; nil — без кеша (одиночный проход).
+type parentCategoryCache struct {
+	base    string
+	list    []marktplaats.Category
+	expires time.Time
+}
+
+func (c *parentCategoryCache) get(base string) []marktplaats.Category {
+	if c == nil || c.base != base || time.Now().After(c.expires) {
+		return nil
+	}
+	return c.list
+}
+
+func (c *parentCategoryCache) put(base string, list []marktplaats.Category) {
+	if c == nil || len(list) == 0 {
+		return
+	}
+	c.base, c.list, c.expires = base, list, time.Now().Add(parentCategoriesTTL)
+}
@@ -0,0 +1,29 @@
+package main
+
+import (
+	"testing"
+	"time"
+
+	"github.com/marktplaats-scraper/scraper-golang/internal/marktplaats"
+)
+
+func TestParentCategoryCache(t *testing.T) {
+	t.Parallel()
+	var none *parentCategoryCache
+	none.put("https://a", []marktplaats.Category{{ID: 1}})
+	if none.get("https://a") != nil {
+		t.Fatal("nil cache must not hit")
+	}
+	c := &parentCategoryCache{}
+	c.put("https://a", []marktplaats.Category{{ID: 1}})
+	if got := c.get("https://a"); len(got) != 1 {
+		t.Fatalf("got %v", got)
+	}
+	if c.get("https://b") != nil {
+		t.Fatal("other base must miss")
+	}
+	c.expires = time.Now().Add(-time.Second)
+	if c.get("https://a") != nil {
+		t.Fatal("expired entry must miss")
+	}
+}
@@ -10,8 +10,12 @@ import (
 	tgbotapi "github.com/go-telegram-bot-api/telegram-bot-api/v5"
 
 	"github.com/marktplaats-scraper/scraper-golang/internal/prettylog"
+	"github.com/marktplaats-scraper/scraper-golang/internal/proxy"
 )
 
+// callbackWorkers — сколько inline-кнопок обрабатывается одновременно.
+const callbackWorkers = 8
+
 // Bot админ-панель: один процесс, опрос Telegram Updates.
 type Bot struct {
 	db     *sql.DB
@@ -26,13 +30,16 @@ type Bot struct {
 	dlgTplName    string
 	dlgTplSubject string
 	dlgEditID     int64
+
+	emailsN countCache
+	edits   editCoalescer
 }
 
 // NewBot открывает API; tgHTTP — клиент для Bot API (например с прокси); nil = прямое подключение, таймаут 120s.
 // client — второй бот для уведомления воркера при одобрении (если токен задан).
 func NewBot(db *sql.DB, cfg Config, tgHTTP *http.Client) (*Bot, error) {
 	if tgHTTP == nil {
-		tgHTTP = &http.Client{Timeout: 120 * time.Second}
+		tgHTTP, _ = proxy.HTTPClient(nil, 120*time.Second) // без прокси ошибки нет
 	}
 	ep := cfg.APIEndpoint
 	if ep == "" {
@@ -78,7 +85,18 @@ func (b *Bot) Run() {
 	u := tgbotapi.NewUpdate(0)
 	u.Timeout = 60
 	updates := b.api.GetUpdatesChan(u)
+	// Кнопки обрабатываются параллельно (не больше callbackWorkers): запросы к SQLite и SMTP в одном
+	// обработчике не задерживают остальные апдейты. Сообщения — строго по порядку, от них зависят шаги диалога.
+	sem := make(chan struct{}, callbackWorkers)
 	for up := range updates {
-		b.handleUpdate(up)
+		if up.CallbackQuery == nil {
+			b.handleUpdate(up)
+			continue
+		}
+		sem <- struct{}{}
+		go func(up tgbotapi.Update) {
+			defer func() { <-sem }()
+			b.handleUpdate(up)
+		}(up)
 	}
 }
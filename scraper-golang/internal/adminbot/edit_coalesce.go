@@ -0,0 +1,144 @@
+package adminbot
+
+import (
+	"errors"
+	"sync"
+	"time"
+
+	tgbotapi "github.com/go-telegram-bot-api/telegram-bot-api/v5"
+
+	"github.com/marktplaats-scraper/scraper-golang/internal/prettylog"
+)
+
+// editMinGap — минимальный интервал между editMessageText одного сообщения. Частые клики по кнопкам
+// упираются в лимит Telegram (~1 правка/с на чат) и получают 429; промежуточные экраны всё равно не видны.
+const editMinGap = 250 * time.Millisecond
+
+// maxRetryAfter — дольше этого ответ 429 не ждём (retry_after бывает десятки секунд при флуде).
+const maxRetryAfter = 30 * time.Second
+
+type editKey struct {
+	chatID int64
+	msgID  int
+}
+
+// pendingEdit — последняя отложенная правка сообщения; более ранние просто перезаписываются.
+type pendingEdit struct {
+	edit tgbotapi.EditMessageTextConfig
+	send func(tgbotapi.EditMessageTextConfig)
+	stop func() bool
+}
+
+// editCoalescer склеивает правки одного сообщения, пришедшие чаще editMinGap: уходит только последняя.
+// Время последней правки хранится только пока оно влияет на паузу (editMinGap), поэтому last не растёт
+// со временем жизни бота. Нулевое значение готово к использованию.
+type editCoalescer struct {
+	mu      sync.Mutex
+	last    map[editKey]time.Time
+	pending map[editKey]*pendingEdit
+
+	// now и afterFunc — часы; nil — time.Now и time.AfterFunc (тест подставляет свои).
+	now       func() time.Time
+	afterFunc func(d time.Duration, f func()) (stop func() bool)
+}
+
+func (c *editCoalescer) clock() time.Time {
+	if c.now != nil {
+		return c.now()
+	}
+	return time.Now()
+}
+
+func (c *editCoalescer) after(d time.Duration, f func()) func() bool {
+	if c.afterFunc != nil {
+		return c.afterFunc(d, f)
+	}
+	return time.AfterFunc(d, f).Stop
+}
+
+// schedule отправляет правку сразу или откладывает её до конца окна editMinGap.
+func (c *editCoalescer) schedule(k editKey, edit tgbotapi.EditMessageTextConfig, send func(tgbotapi.EditMessageTextConfig)) {
+	c.mu.Lock()
+	if c.last == nil {
+		c.last = make(map[editKey]time.Time)
+		c.pending = make(map[editKey]*pendingEdit)
+	}
+	if p, ok := c.pending[k]; ok {
+		p.edit, p.send = edit, send
+		c.mu.Unlock()
+		return
+	}
+	now := c.clock()
+	wait := editMinGap - now.Sub(c.last[k])
+	if wait <= 0 {
+		c.markSent(k, now)
+		c.mu.Unlock()
+		send(edit)
+		return
+	}
+	p := &pendingEdit{edit: edit, send: send}
+	c.pending[k] = p
+	p.stop = c.after(wait, func() {
+		c.mu.Lock()
+		if c.pending[k] != p {
+			c.mu.Unlock() // уже отправлена flushChat
+			return
+		}
+		e, send := p.edit, p.send
+		delete(c.pending, k)
+		c.markSent(k, c.clock())
+		c.mu.Unlock()
+		send(e)
+	})
+	c.mu.Unlock()
+}
+
+// markSent запоминает время правки и через editMinGap удаляет запись, если новых правок не было. Под c.mu.
+func (c *editCoalescer) markSent(k editKey, at time.Time) {
+	c.last[k] = at
+	c.after(editMinGap, func() {
+		c.mu.Lock()
+		if _, busy := c.pending[k]; !busy && c.last[k].Equal(at) {
+			delete(c.last, k)
+		}
+		c.mu.Unlock()
+	})
+}
+
+// flushChat сразу отправляет отложенные правки чата. Вызывается перед новым сообщением: экран с
+// инструкцией и кнопкой отмены (tpl_edsubj/tpl_edbody) должен оказаться выше присланного следом текста,
+// а не потеряться или прийти после него.
+func (c *editCoalescer) flushChat(chatID int64) {
+	c.mu.Lock()
+	var due []*pendingEdit
+	now := c.clock()
+	for k, p := range c.pending {
+		if k.chatID == chatID {
+			p.stop()
+			delete(c.pending, k)
+			c.markSent(k, now)
+			due = append(due, p)
+		}
+	}
+	c.mu.Unlock()
+	for _, p := range due {
+		p.send(p.edit)
+	}
+}
+
+// sendRespectingRetryAfter шлёт запрос; на 429 ждёт ровно retry_after из ответа и повторяет один раз.
+func (b *Bot) sendRespectingRetryAfter(c tgbotapi.Chattable) error {
+	_, err := b.api.Request(c)
+	var tgErr *tgbotapi.Error
+	if err == nil || !errors.As(err, &tgErr) || tgErr.RetryAfter <= 0 {
+		return err
+	}
+	d := time.Duration(tgErr.RetryAfter) * time.Second
+	if d > maxRetryAfter {
+		return err
+	}
+	prettylog.Warnf("Telegram 429 · ждём %s", d)
+	time.Sleep(d)
+	_, err = b.api.Request(c)
+	return err
+}
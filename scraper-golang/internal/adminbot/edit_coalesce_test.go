@@ -0,0 +1,128 @@
+package adminbot
+
+import (
+	"strings"
+	"sync"
+	"testing"
+	"time"
+
+	tgbotapi "github.com/go-telegram-bot-api/telegram-bot-api/v5"
+)
+
+// fakeEditClock ручные часы для editCoalescer: таймеры срабатывают только в advance.
+type fakeEditClock struct {
+	mu     sync.Mutex
+	now    time.Time
+	timers []*fakeEditTimer
+}
+
+type fakeEditTimer struct {
+	at      time.Time
+	f       func()
+	stopped bool
+}
+
+func (fc *fakeEditClock) install(c *editCoalescer) {
+	fc.now = time.Unix(1_700_000_000, 0)
+	c.now = func() time.Time {
+		fc.mu.Lock()
+		defer fc.mu.Unlock()
+		return fc.now
+	}
+	c.afterFunc = func(d time.Duration, f func()) func() bool {
+		fc.mu.Lock()
+		defer fc.mu.Unlock()
+		t := &fakeEditTimer{at: fc.now.Add(d), f: f}
+		fc.timers = append(fc.timers, t)
+		return func() bool {
+			fc.mu.Lock()
+			defer fc.mu.Unlock()
+			was := !t.stopped
+			t.stopped = true
+			return was
+		}
+	}
+}
+
+// advance сдвигает время и вызывает наступившие таймеры (вне мьютекса часов).
+func (fc *fakeEditClock) advance(d time.Duration) {
+	fc.mu.Lock()
+	fc.now = fc.now.Add(d)
+	var due []func()
+	rest := fc.timers[:0]
+	for _, t := range fc.timers {
+		switch {
+		case t.stopped:
+		case !t.at.After(fc.now):
+			due = append(due, t.f)
+		default:
+			rest = append(rest, t)
+		}
+	}
+	fc.timers = rest
+	fc.mu.Unlock()
+	for _, f := range due {
+		f()
+	}
+}
+
+func TestEditCoalescerKeepsLast(t *testing.T) {
+	t.Parallel()
+	var c editCoalescer
+	var fc fakeEditClock
+	fc.install(&c)
+	var sent []string
+	send := func(e tgbotapi.EditMessageTextConfig) { sent = append(sent, e.Text) }
+	k := editKey{1, 2}
+	for _, s := range []string{"a", "b", "c", "d"} {
+		c.schedule(k, tgbotapi.NewEditMessageText(1, 2, s), send)
+	}
+	fc.advance(editMinGap)
+	if len(sent) != 2 || sent[0] != "a" || sent[1] != "d" {
+		t.Fatalf("sent %v", sent)
+	}
+}
+
+func TestEditCoalescerPrunesLast(t *testing.T) {
+	t.Parallel()
+	var c editCoalescer
+	var fc fakeEditClock
+	fc.install(&c)
+	send := func(tgbotapi.EditMessageTextConfig) {}
+	for msg := 1; msg <= 3; msg++ {
+		c.schedule(editKey{1, msg}, tgbotapi.NewEditMessageText(1, msg, "x"), send)
+	}
+	c.schedule(editKey{1, 1}, tgbotapi.NewEditMessageText(1, 1, "y"), send)
+	fc.advance(editMinGap)
+	fc.advance(editMinGap)
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if len(c.last) != 0 || len(c.pending) != 0 {
+		t.Fatalf("last=%d pending=%d", len(c.last), len(c.pending))
+	}
+}
+
+// TestEditCoalescerFlushBeforeSend — как tpl_edbody: правка экрана и сразу sendHTML с текущим текстом.
+func TestEditCoalescerFlushBeforeSend(t *testing.T) {
+	t.Parallel()
+	var c editCoalescer
+	var fc fakeEditClock
+	fc.install(&c)
+	var api []string
+	send := func(e tgbotapi.EditMessageTextConfig) { api = append(api, "edit:"+e.Text) }
+	c.schedule(editKey{1, 2}, tgbotapi.NewEditMessageText(1, 2, "menu"), send)
+	c.schedule(editKey{1, 2}, tgbotapi.NewEditMessageText(1, 2, "prompt"), send) // клик быстрее editMinGap
+	c.schedule(editKey{9, 2}, tgbotapi.NewEditMessageText(9, 2, "other"), send)
+	c.schedule(editKey{9, 2}, tgbotapi.NewEditMessageText(9, 2, "other2"), send)
+	c.flushChat(1)
+	api = append(api, "send:pre")
+	want := []string{"edit:menu", "edit:other", "edit:prompt", "send:pre"}
+	if strings.Join(api, ",") != strings.Join(want, ",") {
+		t.Fatalf("api %v, want %v", api, want)
+	}
+	fc.advance(editMinGap)
+	want = append(want, "edit:other2") // чужой чат не тронут, повторной отправки prompt нет
+	if strings.Join(api, ",") != strings.Join(want, ",") {
+		t.Fatalf("api %v, want %v", api, want)
+	}
+}
@@ -0,0 +1,52 @@
+package adminbot
+
+import (
+	"sync"
+	"time"
+
+	"github.com/marktplaats-scraper/scraper-golang/internal/listingsdb"
+)
+
+// emailsCountTTL — сколько живёт закешированный счётчик почт админа между изменениями из бота.
+const emailsCountTTL = 5 * time.Second
+
+// countCache — счётчик почт владельца для меню и списка: почти каждая кнопка раздела «Почты»
+// перерисовывает «Всего: N», а меняется он только добавлением/удалением почт.
+// Нулевое значение готово к использованию.
+type countCache struct {
+	mu      sync.Mutex
+	n       int
+	expires time.Time
+}
+
+// emailsCount возвращает число почт владельца; при попадании в кеш SQLite не трогается.
+func (b *Bot) emailsCount() int {
+	c := &b.emailsN
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if time.Now().Before(c.expires) {
+		return c.n
+	}
+	n, err := listingsdb.EmailsTotalCount(b.db, b.ownerID)
+	if err != nil {
+		return n
+	}
+	c.n = n
+	c.expires = time.Now().Add(emailsCountTTL)
+	return n
+}
+
+// invalidateEmailsCount сбрасывает кеш после изменения базы почт.
+func (b *Bot) invalidateEmailsCount() {
+	b.emailsN.mu.Lock()
+	b.emailsN.expires = time.Time{}
+	b.emailsN.mu.Unlock()
+}
+
+// setEmailsCount кладёт в кеш уже известный счётчик (например, вернувшийся из DeleteEmail).
+func (b *Bot) setEmailsCount(n int) {
+	b.emailsN.mu.Lock()
+	b.emailsN.n = n
+	b.emailsN.expires = time.Now().Add(emailsCountTTL)
+	b.emailsN.mu.Unlock()
+}
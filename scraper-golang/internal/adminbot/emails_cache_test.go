@@ -0,0 +1,23 @@
+package adminbot
+
+import (
+	"testing"
+
+	"github.com/marktplaats-scraper/scraper-golang/internal/listingsdb"
+)
+
+func TestEmailsCountCachedUntilInvalidate(t *testing.T) {
+	b, db, done := newTestBot(t, false)
+	defer done()
+	if n := b.emailsCount(); n != 0 {
+		t.Fatalf("want 0, got %d", n)
+	}
+	_, _ = listingsdb.AddEmailsBatch(db, testAdminChat, [][2]string{{"c1@gmail.com", "p"}})
+	if n := b.emailsCount(); n != 0 {
+		t.Fatalf("expected cached 0, got %d", n)
+	}
+	b.invalidateEmailsCount()
+	if n := b.emailsCount(); n != 1 {
+		t.Fatalf("want 1 after invalidate, got %d", n)
+	}
+}
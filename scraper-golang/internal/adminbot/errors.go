@@ -6,4 +6,7 @@ var (
 	errNoToken     = errors.New("adminbot: нет токена (ADMIN_BOT_TOKEN или флаг -token)")
 	errNoAdminChat = errors.New("adminbot: нет ADMIN_CHAT_ID")
 	errNoDB        = errors.New("adminbot: не указан путь к SQLite (-db)")
+
+	// ErrCSVNoEmailColumn — CSV пуст или в заголовке нет колонки с почтой.
+	ErrCSVNoEmailColumn = errors.New("adminbot: в CSV нет колонки email")
 )
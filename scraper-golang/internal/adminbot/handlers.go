@@ -1,12 +1,17 @@
 package adminbot
 
 import (
+	"bytes"
+	"database/sql"
+	"encoding/csv"
+	"errors"
 	"fmt"
 	"html"
 	"io"
 	"net/http"
 	"strconv"
 	"strings"
+	"sync"
 
 	tgbotapi "github.com/go-telegram-bot-api/telegram-bot-api/v5"
 
@@ -26,13 +31,32 @@ func (b *Bot) answerCallback(cbID, text string) {
 	}
 }
 
+// handleUpdate — единственная точка проверки админ-чата: апдейты из чужих чатов отсекаются
+// до разбора и логирования, обработчики кнопок и сообщений повторно чат не проверяют.
 func (b *Bot) handleUpdate(u tgbotapi.Update) {
 	switch {
 	case u.CallbackQuery != nil:
-		prettylog.Adminf("апдейт · inline-кнопка · id=%s", u.CallbackQuery.ID)
-		b.onCallback(u.CallbackQuery)
+		cb := u.CallbackQuery
+		if cb.Message == nil || !b.isAdminChat(cb.Message.Chat.ID) {
+			var chID, fromUID int64
+			if cb.Message != nil {
+				chID = cb.Message.Chat.ID
+			}
+			if cb.From != nil {
+				fromUID = cb.From.ID
+			}
+			prettylog.Adminf("кнопка игнор (не админ-чат) · chat=%d user=%d · data=%q", chID, fromUID, cb.Data)
+			b.answerCallback(cb.ID, "")
+			return
+		}
+		prettylog.Adminf("апдейт · inline-кнопка · id=%s", cb.ID)
+		b.onCallback(cb)
 	case u.Message != nil:
 		m := u.Message
+		if !b.isAdminChat(m.Chat.ID) {
+			prettylog.Adminf("сообщение игнор · chat=%d (не админ)", m.Chat.ID)
+			return
+		}
 		kind := "текст"
 		if m.Document != nil {
 			kind = fmt.Sprintf("документ %q", m.Document.FileName)
@@ -46,65 +70,66 @@ func (b *Bot) handleUpdate(u tgbotapi.Update) {
 	}
 }
 
+// onCallback вызывается только для кнопок из админ-чата (см. handleUpdate).
 func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 	data := cb.Data
-	var chID, fromUID int64
-	if cb.Message != nil {
-		chID = cb.Message.Chat.ID
-	}
+	var fromUID int64
 	if cb.From != nil {
 		fromUID = cb.From.ID
 	}
 
-	if cb.Message == nil || !b.isAdminChat(cb.Message.Chat.ID) {
-		prettylog.Adminf("кнопка игнор (не админ-чат) · chat=%d user=%d · data=%q", chID, fromUID, data)
-		b.answerCallback(cb.ID, "")
-		return
-	}
-
 	chatID := cb.Message.Chat.ID
 	msgID := cb.Message.MessageID
 	prettylog.Adminf("кнопка · chat=%d msg=%d user=%d · data=%q", chatID, msgID, fromUID, data)
 
-	switch {
-	case data == "admin_main":
+	op, arg := splitCallback(data)
+	switch op {
+	case "admin_main":
 		prettylog.Admin("экран · главная панель", "")
 		b.clearDialog()
 		b.editHTML(chatID, msgID, mainPanelHTML(), kbMain())
-	case data == "admin_pending":
+	case "admin_pending":
 		prettylog.Admin("экран · ожидают подтверждения", "")
 		b.clearDialog()
 		b.showPending(chatID, msgID)
-	case strings.HasPrefix(data, "approve_"):
+	case "approve":
 		b.clearDialog()
-		uid, _ := strconv.ParseInt(strings.TrimPrefix(data, "approve_"), 10, 64)
+		uid, _ := strconv.ParseInt(arg, 10, 64)
 		_ = listingsdb.AuthorizeUser(b.db, uid)
 		prettylog.OKf("воркер %d одобрен", uid)
-		b.notifyWorkerApproved(uid)
+		// Уведомление воркеру и перерисовка панели — независимые запросы к Telegram, идут параллельно;
+		// ошибки каждого логируются отдельно, неудачный push не мешает обновить панель.
+		var wg sync.WaitGroup
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			b.notifyWorkerApproved(uid)
+		}()
 		b.showPending(chatID, msgID)
+		wg.Wait()
 		b.answerCallback(cb.ID, "✅ Воркер одобрен")
 		return
-	case strings.HasPrefix(data, "reject_"):
+	case "reject":
 		b.clearDialog()
-		uid, _ := strconv.ParseInt(strings.TrimPrefix(data, "reject_"), 10, 64)
+		uid, _ := strconv.ParseInt(arg, 10, 64)
 		_ = listingsdb.BlockUser(b.db, uid)
 		prettylog.Warnf("заявка отклонена (блок) · user_id=%d", uid)
 		b.showPending(chatID, msgID)
 		b.answerCallback(cb.ID, "❌ Отклонён")
 		return
-	case data == "admin_workers":
+	case "admin_workers":
 		prettylog.Admin("экран · воркеры", "")
 		b.clearDialog()
 		b.showWorkers(chatID, msgID)
-	case strings.HasPrefix(data, "block_"):
-		uid, _ := strconv.ParseInt(strings.TrimPrefix(data, "block_"), 10, 64)
+	case "block":
+		uid, _ := strconv.ParseInt(arg, 10, 64)
 		_ = listingsdb.BlockUser(b.db, uid)
 		prettylog.Warnf("воркер заблокирован · user_id=%d", uid)
 		b.showWorkers(chatID, msgID)
 		b.answerCallback(cb.ID, "🚫 Заблокирован")
 		return
-	case strings.HasPrefix(data, "delete_"):
-		uid, _ := strconv.ParseInt(strings.TrimPrefix(data, "delete_"), 10, 64)
+	case "delete":
+		uid, _ := strconv.ParseInt(arg, 10, 64)
 		ok, _ := listingsdb.DeleteUser(b.db, uid)
 		if ok {
 			prettylog.OKf("воркер удалён из БД · user_id=%d", uid)
@@ -118,54 +143,52 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 			b.answerCallback(cb.ID, "Не найден")
 		}
 		return
-	case data == "admin_blocked":
+	case "admin_blocked":
 		prettylog.Admin("экран · заблокированные", "")
 		b.clearDialog()
 		b.showBlocked(chatID, msgID)
-	case strings.HasPrefix(data, "unblock_"):
-		uid, _ := strconv.ParseInt(strings.TrimPrefix(data, "unblock_"), 10, 64)
+	case "unblock":
+		uid, _ := strconv.ParseInt(arg, 10, 64)
 		_ = listingsdb.UnblockUser(b.db, uid)
 		prettylog.OKf("снята блокировка · user_id=%d", uid)
 		b.showBlocked(chatID, msgID)
 		b.answerCallback(cb.ID, "🔓 Разблокирован")
 		return
-	case data == "admin_emails":
+	case "admin_emails":
 		prettylog.Admin("экран · меню почт", "")
 		b.clearDialog()
 		b.showEmailsMenu(chatID, msgID)
-	case data == "emails_add":
+	case "emails_add":
 		prettylog.Admin("диалог · ввод почт построчно", "")
 		b.dlgMu.Lock()
 		b.dlgStep = "emails"
 		b.dlgMu.Unlock()
-		b.editHTML(chatID, msgID, emailsAddHTML(), tgbotapi.NewInlineKeyboardMarkup(
-			tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("❌ Отмена", "admin_emails")),
-		))
-	case data == "emails_upload":
+		b.editHTML(chatID, msgID, emailsAddHTML(), kbCancelToEmails)
+	case "emails_upload":
 		prettylog.Admin("экран · загрузка CSV", "")
 		b.clearDialog()
-		b.editHTML(chatID, msgID, emailsUploadHTML(), tgbotapi.NewInlineKeyboardMarkup(
-			tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ К меню почт", "admin_emails")),
-		))
-	case strings.HasPrefix(data, "emails_list_"):
-		page, _ := strconv.Atoi(strings.TrimPrefix(data, "emails_list_"))
+		b.editHTML(chatID, msgID, emailsUploadHTML(), kbToEmailsMenu)
+	case "emails_list":
+		page, _ := strconv.Atoi(arg)
 		prettylog.Adminf("экран · список почт · страница %d", page)
 		b.showEmailsList(chatID, msgID, page)
-	case strings.HasPrefix(data, "emails_unblock_"):
-		rest := strings.TrimPrefix(data, "emails_unblock_")
-		page, email := parsePageAndSafeEmail(rest)
+	case "emails_unblock":
+		page, email := parsePageAndSafeEmail(arg)
 		em := decodeEmailFromCallback(email)
 		_, _ = listingsdb.UnblockEmail(b.db, b.ownerID, em)
 		prettylog.OKf("почта разблокирована · %s · стр.%d", em, page)
 		b.showEmailsList(chatID, msgID, page)
 		b.answerCallback(cb.ID, "↩️ Разблокировано")
 		return
-	case strings.HasPrefix(data, "emails_del_"):
-		rest := strings.TrimPrefix(data, "emails_del_")
-		page, emailSafe := parsePageAndSafeEmail(rest)
+	case "emails_del":
+		page, emailSafe := parsePageAndSafeEmail(arg)
 		em := decodeEmailFromCallback(emailSafe)
-		_, _ = listingsdb.DeleteEmail(b.db, b.ownerID, em)
-		n, _ := listingsdb.EmailsTotalCount(b.db, b.ownerID)
+		_, n, err := listingsdb.DeleteEmail(b.db, b.ownerID, em)
+		if err == nil {
+			b.setEmailsCount(n)
+		} else {
+			b.invalidateEmailsCount()
+		}
 		if page > 0 && n <= page*emailsPerPage {
 			page = max(0, page-1)
 		}
@@ -173,7 +196,7 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 		b.showEmailsList(chatID, msgID, page)
 		b.answerCallback(cb.ID, "🗑 Удалено")
 		return
-	case data == "emails_test":
+	case "emails_test":
 		email, pass, ok := listingsdb.RandomActiveEmail(b.db, b.ownerID)
 		if !ok {
 			prettylog.Admin("тест почты · нет активных записей", "")
@@ -190,8 +213,8 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 			b.sendHTML(chatID, fmt.Sprintf("❌ Ошибка с <code>%s</code>", html.EscapeString(email)))
 		}
 		return
-	case data == "emails_test_all":
-		n, _ := listingsdb.EmailsTotalCount(b.db, b.ownerID)
+	case "emails_test_all":
+		n := b.emailsCount()
 		if n == 0 {
 			prettylog.Admin("тест всех почт · база пуста", "")
 			b.answerCallback(cb.ID, "Нет почт")
@@ -225,36 +248,30 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 		}
 		b.sendHTML(chatID, sb.String())
 		return
-	case data == "emails_export":
-		rows, err := listingsdb.ListEmails(b.db, b.ownerID, 10000, 0)
-		if err != nil || len(rows) == 0 {
+	case "emails_export":
+		data, n, err := emailsExportCSV(func(yield func(email, password string) error) error {
+			return listingsdb.EachEmail(b.db, b.ownerID, 10000, yield)
+		})
+		if err != nil || n == 0 {
 			prettylog.Admin("экспорт CSV · нет данных", "")
 			b.answerCallback(cb.ID, "Нет почт")
 			return
 		}
-		var sb strings.Builder
-		sb.WriteString("email,password\n")
-		for _, r := range rows {
-			sb.WriteString(r.Email)
-			sb.WriteByte(',')
-			sb.WriteString(r.Password)
-			sb.WriteByte('\n')
-		}
-		prettylog.Adminf("экспорт CSV · строк %d → sendDocument", len(rows))
-		doc := tgbotapi.NewDocument(chatID, tgbotapi.FileBytes{Name: "emails_export.csv", Bytes: []byte(sb.String())})
-		doc.Caption = fmt.Sprintf("📥 Экспорт: %d почт", len(rows))
+		prettylog.Adminf("экспорт CSV · строк %d → sendDocument", n)
+		doc := tgbotapi.NewDocument(chatID, tgbotapi.FileBytes{Name: "emails_export.csv", Bytes: data})
+		doc.Caption = fmt.Sprintf("📥 Экспорт: %d почт", n)
 		if _, err := b.api.Send(doc); err != nil {
 			prettylog.Warnf("sendDocument (экспорт) · %v", err)
 		} else {
-			prettylog.OK("файл экспорта отправлен в чат", fmt.Sprintf("%d почт", len(rows)))
+			prettylog.OK("файл экспорта отправлен в чат", fmt.Sprintf("%d почт", n))
 		}
 		b.answerCallback(cb.ID, "📥 Файл отправлен")
 		return
-	case data == "admin_templates":
+	case "admin_templates":
 		prettylog.Admin("экран · шаблоны писем", "")
 		b.clearDialog()
 		b.showTemplates(chatID, msgID)
-	case data == "tpl_add":
+	case "tpl_add":
 		prettylog.Admin("диалог · новый шаблон (шаг название)", "")
 		b.dlgMu.Lock()
 		b.dlgStep = "tpl_name"
@@ -262,11 +279,9 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 		b.dlgTplName = ""
 		b.dlgTplSubject = ""
 		b.dlgMu.Unlock()
-		b.editHTML(chatID, msgID, tplAddStep1HTML(), tgbotapi.NewInlineKeyboardMarkup(
-			tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("❌ Отмена", "admin_templates")),
-		))
-	case strings.HasPrefix(data, "tpl_edit_"):
-		tid, _ := strconv.ParseInt(strings.TrimPrefix(data, "tpl_edit_"), 10, 64)
+		b.editHTML(chatID, msgID, tplAddStep1HTML(), kbCancelToTemplates)
+	case "tpl_edit":
+		tid, _ := strconv.ParseInt(arg, 10, 64)
 		name, _, _, ok := listingsdb.GetEmailTemplate(b.db, b.ownerID, tid)
 		if !ok {
 			prettylog.Warnf("меню правки шаблона · id=%d не найден", tid)
@@ -280,12 +295,12 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 					tgbotapi.NewInlineKeyboardButtonData("Тема", fmt.Sprintf("tpl_edsubj_%d", tid)),
 					tgbotapi.NewInlineKeyboardButtonData("Текст", fmt.Sprintf("tpl_edbody_%d", tid)),
 				),
-				tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ К шаблонам", "admin_templates")),
+				rowToTemplates,
 			))
 		b.answerCallback(cb.ID, "")
 		return
-	case strings.HasPrefix(data, "tpl_edsubj_"):
-		tid, _ := strconv.ParseInt(strings.TrimPrefix(data, "tpl_edsubj_"), 10, 64)
+	case "tpl_edsubj":
+		tid, _ := strconv.ParseInt(arg, 10, 64)
 		name, subj, _, ok := listingsdb.GetEmailTemplate(b.db, b.ownerID, tid)
 		if !ok {
 			b.answerCallback(cb.ID, "Не найден")
@@ -298,14 +313,12 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 		b.dlgMu.Unlock()
 		b.editHTML(chatID, msgID,
 			fmt.Sprintf("📝 <b>Тема письма</b> — «%s»\n\nОтправьте новую тему (переменные <code>{title}</code> и др.). Пусто или <code>-</code> — в письме только название товара.", html.EscapeString(name)),
-			tgbotapi.NewInlineKeyboardMarkup(
-				tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("Отмена", "admin_templates")),
-			))
+			kbAbortToTemplates)
 		b.sendHTML(chatID, "<pre>"+html.EscapeString(subj)+"</pre>")
 		b.answerCallback(cb.ID, "")
 		return
-	case strings.HasPrefix(data, "tpl_edbody_"):
-		tid, _ := strconv.ParseInt(strings.TrimPrefix(data, "tpl_edbody_"), 10, 64)
+	case "tpl_edbody":
+		tid, _ := strconv.ParseInt(arg, 10, 64)
 		name, subj, body, ok := listingsdb.GetEmailTemplate(b.db, b.ownerID, tid)
 		if !ok {
 			b.answerCallback(cb.ID, "Не найден")
@@ -317,18 +330,16 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 		b.dlgTplName = name
 		b.dlgTplSubject = subj
 		b.dlgMu.Unlock()
-		b.editHTML(chatID, msgID, fmt.Sprintf("✏️ <b>Текст письма</b> — «%s»\n\nОтправьте новый текст:", html.EscapeString(name)),
-			tgbotapi.NewInlineKeyboardMarkup(
-				tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("Отмена", "admin_templates")),
-			))
+		b.editHTML(chatID, msgID, fmt.Sprintf("✏️ <b>Текст письма</b> — «%s»\n\nОтправьте новый текст:", html.EscapeString(name)), kbAbortToTemplates)
 		b.sendHTML(chatID, "<pre>"+html.EscapeString(body)+"</pre>")
 		b.answerCallback(cb.ID, "")
 		return
-	case strings.HasPrefix(data, "tpl_del_"):
-		tid, _ := strconv.ParseInt(strings.TrimPrefix(data, "tpl_del_"), 10, 64)
+	case "tpl_del":
+		tid, _ := strconv.ParseInt(arg, 10, 64)
 		_ = listingsdb.ClearActiveTemplateIf(b.db, b.ownerID, tid)
 		ok, _ := listingsdb.DeleteEmailTemplate(b.db, b.ownerID, tid)
 		if ok {
+			ForgetTemplateLine(tid)
 			prettylog.Warnf("шаблон удалён · id=%d", tid)
 		} else {
 			prettylog.Warnf("удаление шаблона · id=%d не найден", tid)
@@ -348,6 +359,52 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 	b.answerCallback(cb.ID, "")
 }
 
+// emailsExportCSV пишет CSV сразу в байтовый буфер (без промежуточной строки и её копии в []byte);
+// строки приходят из each по одной (курсор БД), поэтому срез всех почт целиком в памяти не собирается.
+// encoding/csv экранирует пароли с запятыми и кавычками. n — число записанных почт.
+func emailsExportCSV(each func(yield func(email, password string) error) error) (data []byte, n int, err error) {
+	var buf bytes.Buffer
+	w := csv.NewWriter(&buf)
+	_ = w.Write([]string{"email", "password"})
+	rec := make([]string, 2)
+	err = each(func(email, password string) error {
+		rec[0], rec[1] = email, password
+		n++
+		return w.Write(rec)
+	})
+	w.Flush()
+	if err == nil {
+		err = w.Error()
+	}
+	return buf.Bytes(), n, err
+}
+
+// callbackOps — кнопки с аргументом после «<op>_»: approve_<uid>, emails_del_<page>_<email>, tpl_edit_<id>…
+var callbackOps = map[string]struct{}{
+	"approve": {}, "reject": {}, "block": {}, "delete": {}, "unblock": {},
+	"emails_list": {}, "emails_unblock": {}, "emails_del": {},
+	"tpl_edit": {}, "tpl_edsubj": {}, "tpl_edbody": {}, "tpl_del": {},
+}
+
+// splitCallback делит data на операцию и аргумент одним проходом: имя операции — не больше двух слов
+// через «_», поэтому проверяются максимум два префикса по таблице вместо цепочки HasPrefix по всем кнопкам.
+// Кнопки без аргумента (admin_main, emails_test_all…) возвращаются как op целиком с пустым arg.
+func splitCallback(data string) (op, arg string) {
+	from := 0
+	for n := 0; n < 2; n++ {
+		i := strings.IndexByte(data[from:], '_')
+		if i < 0 {
+			break
+		}
+		i += from
+		if _, ok := callbackOps[data[:i]]; ok {
+			return data[:i], data[i+1:]
+		}
+		from = i + 1
+	}
+	return data, ""
+}
+
 func parsePageAndSafeEmail(rest string) (page int, safe string) {
 	i := strings.IndexByte(rest, '_')
 	if i < 0 {
@@ -364,12 +421,8 @@ func max(a, b int) int {
 	return b
 }
 
+// onMessage вызывается только для сообщений из админ-чата (см. handleUpdate).
 func (b *Bot) onMessage(msg *tgbotapi.Message) {
-	if !b.isAdminChat(msg.Chat.ID) {
-		prettylog.Adminf("сообщение игнор · chat=%d (не админ)", msg.Chat.ID)
-		return
-	}
-
 	b.dlgMu.Lock()
 	step := b.dlgStep
 	b.dlgMu.Unlock()
@@ -405,17 +458,18 @@ func (b *Bot) onMessage(msg *tgbotapi.Message) {
 		pairs := ParseEmailsText(msg.Text)
 		if len(pairs) == 0 {
 			prettylog.Warn("ввод почт · нет валидных строк", previewOneLine(msg.Text, 80))
-			b.sendHTML(msg.Chat.ID, "❌ Не найдено валидных строк. Формат: mail@gmail.com:apppassword")
+			b.sendPlain(msg.Chat.ID, "❌ Не найдено валидных строк. Формат: mail@gmail.com:apppassword")
 			return
 		}
 		added, skipped := listingsdb.AddEmailsBatch(b.db, b.ownerID, pairs)
+		b.invalidateEmailsCount()
 		prettylog.OKf("почты добавлены · +%d дублей пропущено %d", added, skipped)
 		b.clearDialog()
-		b.sendHTML(msg.Chat.ID, fmt.Sprintf("✅ Добавлено: %d, пропущено (дубли): %d", added, skipped))
-		n, _ := listingsdb.EmailsTotalCount(b.db, b.ownerID)
+		b.sendPlain(msg.Chat.ID, fmt.Sprintf("✅ Добавлено: %d, пропущено (дубли): %d", added, skipped))
+		n := b.emailsCount()
 		m := tgbotapi.NewMessage(msg.Chat.ID, fmt.Sprintf("📧 <b>База почт</b>\n\nВсего: %d", n))
 		m.ParseMode = "HTML"
-		m.ReplyMarkup = emailsMenuKB(b.db, b.ownerID)
+		m.ReplyMarkup = emailsMenuKBCount(n)
 		if _, err := b.api.Send(m); err != nil {
 			prettylog.Warnf("sendMessage (меню почт) · %v", err)
 		} else {
@@ -425,7 +479,7 @@ func (b *Bot) onMessage(msg *tgbotapi.Message) {
 		name := strings.TrimSpace(msg.Text)
 		if name == "" {
 			prettylog.Admin("шаблон · пустое имя — просим повтор", "")
-			b.sendHTML(msg.Chat.ID, "Введите название")
+			b.sendPlain(msg.Chat.ID, "Введите название")
 			return
 		}
 		b.dlgMu.Lock()
@@ -433,16 +487,7 @@ func (b *Bot) onMessage(msg *tgbotapi.Message) {
 		b.dlgStep = "tpl_subject"
 		b.dlgMu.Unlock()
 		prettylog.Adminf("шаблон · название принято · %q → шаг тема", name)
-		vars := strings.Builder{}
-		for k := range TemplateVarDescriptions {
-			if vars.Len() > 0 {
-				vars.WriteString(", ")
-			}
-			vars.WriteString("<code>{")
-			vars.WriteString(k)
-			vars.WriteString("}</code>")
-		}
-		b.sendHTML(msg.Chat.ID, "Шаг 2/3: введите <b>тему письма</b>.\n\nПусто или <code>-</code> — только название товара.\n\nПеременные: "+vars.String())
+		b.sendHTML(msg.Chat.ID, "Шаг 2/3: введите <b>тему письма</b>.\n\nПусто или <code>-</code> — только название товара.\n\nПеременные: "+TemplateVarsInlineHTML)
 	case "tpl_subject":
 		b.dlgMu.Lock()
 		b.dlgTplSubject = strings.TrimSpace(msg.Text)
@@ -450,16 +495,7 @@ func (b *Bot) onMessage(msg *tgbotapi.Message) {
 		name := b.dlgTplName
 		b.dlgMu.Unlock()
 		prettylog.Adminf("шаблон · тема принята · %q → шаг тело", name)
-		vars := strings.Builder{}
-		for k := range TemplateVarDescriptions {
-			if vars.Len() > 0 {
-				vars.WriteString(", ")
-			}
-			vars.WriteString("<code>{")
-			vars.WriteString(k)
-			vars.WriteString("}</code>")
-		}
-		b.sendHTML(msg.Chat.ID, "Шаг 3/3: введите <b>текст шаблона</b>.\n\nПеременные: "+vars.String())
+		b.sendHTML(msg.Chat.ID, "Шаг 3/3: введите <b>текст шаблона</b>.\n\nПеременные: "+TemplateVarsInlineHTML)
 	case "tpl_editsubj":
 		newSubj := strings.TrimSpace(msg.Text)
 		b.dlgMu.Lock()
@@ -517,33 +553,69 @@ func (b *Bot) handleCSVUpload(msg *tgbotapi.Message) {
 	file, err := b.api.GetFile(fileCfg)
 	if err != nil {
 		prettylog.Warnf("CSV · getFile · %v", err)
-		b.sendHTML(msg.Chat.ID, "❌ Файл: "+err.Error())
+		b.sendPlain(msg.Chat.ID, "❌ Файл: "+err.Error())
 		return
 	}
 	url := file.Link(b.api.Token)
 	prettylog.Adminf("CSV · скачивание · %s", url)
-	resp, err := http.Get(url)
+	// Тот же HTTP-клиент, что у Bot API (прокси, таймаут, пул соединений), вместо http.DefaultClient.
+	req, err := http.NewRequest(http.MethodGet, url, nil)
 	if err != nil {
 		prettylog.Warnf("CSV · HTTP · %v", err)
-		b.sendHTML(msg.Chat.ID, "❌ Скачивание: "+err.Error())
+		b.sendPlain(msg.Chat.ID, "❌ Скачивание: "+err.Error())
 		return
 	}
-	defer resp.Body.Close()
-	data, err := io.ReadAll(resp.Body)
+	resp, err := b.api.Client.Do(req)
 	if err != nil {
-		prettylog.Warnf("CSV · чтение тела · %v", err)
-		b.sendHTML(msg.Chat.ID, "❌ Чтение: "+err.Error())
+		prettylog.Warnf("CSV · HTTP · %v", err)
+		b.sendPlain(msg.Chat.ID, "❌ Скачивание: "+err.Error())
 		return
 	}
-	pairs := ParseEmailsCSV(string(data))
-	if len(pairs) == 0 {
-		prettylog.Warn("CSV · не распознаны строки email", fmt.Sprintf("%d байт", len(data)))
-		b.sendHTML(msg.Chat.ID, "❌ В CSV не найдено email (колонки email, apppassword)")
+	defer resp.Body.Close()
+	seen, added, skipped, err := ImportEmailsCSV(b.db, b.ownerID, resp.Body)
+	if added > 0 {
+		b.invalidateEmailsCount()
+	}
+	if err != nil && !errors.Is(err, ErrCSVNoEmailColumn) {
+		prettylog.Warnf("CSV импорт остановлен · +%d пропуск %d · файл %q · %v", added, skipped, fn, err)
+		b.sendPlain(msg.Chat.ID, fmt.Sprintf("❌ CSV: импорт остановлен, %v\nДо этой строки добавлено %d, пропущено %d", err, added, skipped))
+		return
+	}
+	if seen == 0 {
+		prettylog.Warn("CSV · не распознаны строки email", fmt.Sprintf("%d байт", msg.Document.FileSize))
+		b.sendPlain(msg.Chat.ID, "❌ В CSV не найдено email (колонки email, apppassword)")
 		return
 	}
-	added, skipped := listingsdb.AddEmailsBatch(b.db, b.ownerID, pairs)
 	prettylog.OKf("CSV импорт · +%d пропуск %d · файл %q", added, skipped, fn)
-	b.sendHTML(msg.Chat.ID, fmt.Sprintf("✅ Из CSV: добавлено %d, пропущено %d", added, skipped))
+	b.sendPlain(msg.Chat.ID, fmt.Sprintf("✅ Из CSV: добавлено %d, пропущено %d", added, skipped))
+}
+
+// csvImportBatch — сколько строк CSV вставляется одной транзакцией AddEmailsBatch.
+const csvImportBatch = 1000
+
+// ImportEmailsCSV читает CSV почт потоково (EachEmailCSV) и пишет в базу пачками по csvImportBatch строк:
+// память не растёт с размером файла, вставки идут, пока файл ещё дочитывается.
+// seen — сколько строк с email распознано. err — ошибка EachEmailCSV: на битой строке импорт
+// останавливается, уже вставленные пачки остаются (added/skipped считают их).
+func ImportEmailsCSV(db *sql.DB, ownerUserID int64, src io.Reader) (seen, added, skipped int, err error) {
+	batch := make([][2]string, 0, csvImportBatch)
+	flush := func() {
+		a, sk := listingsdb.AddEmailsBatch(db, ownerUserID, batch)
+		added += a
+		skipped += sk
+		batch = batch[:0]
+	}
+	err = EachEmailCSV(src, func(email, pass string) {
+		seen++
+		batch = append(batch, [2]string{email, pass})
+		if len(batch) == csvImportBatch {
+			flush()
+		}
+	})
+	if len(batch) > 0 {
+		flush()
+	}
+	return seen, added, skipped, err
 }
 
 func (b *Bot) notifyWorkerApproved(userID int64) {
@@ -566,12 +638,15 @@ func (b *Bot) editHTML(chatID int64, msgID int, text string, kb tgbotapi.InlineK
 	prettylog.Adminf("→ editMessageText · chat=%d msg=%d · %s", chatID, msgID, previewOneLine(text, 100))
 	edit := tgbotapi.NewEditMessageTextAndMarkup(chatID, msgID, text, kb)
 	edit.ParseMode = "HTML"
-	if _, err := b.api.Send(edit); err != nil {
-		prettylog.Warnf("editMessageText · %v", err)
-	}
+	b.edits.schedule(editKey{chatID, msgID}, edit, func(e tgbotapi.EditMessageTextConfig) {
+		if err := b.sendRespectingRetryAfter(e); err != nil {
+			prettylog.Warnf("editMessageText · %v", err)
+		}
+	})
 }
 
 func (b *Bot) sendHTML(chatID int64, text string) {
+	b.edits.flushChat(chatID)
 	prettylog.Adminf("→ sendMessage HTML · chat=%d · %s", chatID, previewOneLine(text, 120))
 	m := tgbotapi.NewMessage(chatID, text)
 	m.ParseMode = "HTML"
@@ -580,7 +655,17 @@ func (b *Bot) sendHTML(chatID int64, text string) {
 	}
 }
 
+// sendPlain без parse_mode — для текстов без разметки (и с err.Error(), где могут быть «<» и «&»).
+func (b *Bot) sendPlain(chatID int64, text string) {
+	b.edits.flushChat(chatID)
+	prettylog.Adminf("→ sendMessage · chat=%d · %s", chatID, previewOneLine(text, 120))
+	if _, err := b.api.Send(tgbotapi.NewMessage(chatID, text)); err != nil {
+		prettylog.Warnf("sendMessage · %v", err)
+	}
+}
+
 func (b *Bot) sendHTMLWithKB(chatID int64, text string, kb tgbotapi.InlineKeyboardMarkup) {
+	b.edits.flushChat(chatID)
 	prettylog.Adminf("→ sendMessage HTML+клавиатура · chat=%d · %s", chatID, previewOneLine(text, 100))
 	m := tgbotapi.NewMessage(chatID, text)
 	m.ParseMode = "HTML"
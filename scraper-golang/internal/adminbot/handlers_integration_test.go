@@ -166,6 +166,19 @@ func TestCallbackAdminMainAndPending(t *testing.T) {
 	}
 }
 
+func TestCallbackAdminMainClearsDialog(t *testing.T) {
+	b, _, done := newTestBot(t, false)
+	defer done()
+	b.handleUpdate(cbQ(testAdminChat, 5, "tpl_add"))
+	if b.dlgStep != "tpl_name" {
+		t.Fatalf("dlg step=%q", b.dlgStep)
+	}
+	b.handleUpdate(cbQ(testAdminChat, 5, "admin_main"))
+	if b.dlgStep != "" {
+		t.Fatalf("admin_main left dlg step=%q", b.dlgStep)
+	}
+}
+
 func TestCallbackApproveRejectBlockUnblockDelete(t *testing.T) {
 	b, db, done := newTestBot(t, true)
 	defer done()
@@ -0,0 +1,23 @@
+package adminbot
+
+import (
+	"strings"
+	"testing"
+)
+
+func TestPreviewRunes(t *testing.T) {
+	t.Parallel()
+	if got := previewRunes("  ", 10); got != "∅" {
+		t.Fatalf("empty: %q", got)
+	}
+	if got := previewRunes("привет", 6); got != "привет" {
+		t.Fatalf("fits: %q", got)
+	}
+	if got := previewRunes("приветмир", 6); got != "приве…" {
+		t.Fatalf("cut: %q", got)
+	}
+	long := "a\nb" + strings.Repeat("я", 5000)
+	if got := previewOneLine(long, 8); got != "a ↵ bяя…" {
+		t.Fatalf("one line: %q", got)
+	}
+}
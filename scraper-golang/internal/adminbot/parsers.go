@@ -1,7 +1,11 @@
 package adminbot
 
 import (
+	"bufio"
 	"encoding/csv"
+	"errors"
+	"fmt"
+	"io"
 	"strings"
 )
 
@@ -11,55 +15,139 @@ func ParseEmailLine(line string) (email, password string, ok bool) {
 	if line == "" || strings.HasPrefix(line, "#") {
 		return "", "", false
 	}
-	for _, sep := range []string{":", ";", "\t"} {
-		if strings.Contains(line, sep) {
-			parts := strings.SplitN(line, sep, 2)
-			if len(parts) >= 2 && strings.Contains(parts[0], "@") {
-				return strings.TrimSpace(strings.ToLower(parts[0])), strings.TrimSpace(parts[1]), true
-			}
-		}
+	at := strings.IndexByte(line, '@')
+	if at < 0 {
+		return "", "", false
 	}
-	if strings.Contains(line, "@") {
-		return strings.ToLower(strings.TrimSpace(line)), "", true
+	// Разделители по приоритету; подходит первый, левее которого уже есть «@».
+	for i := 0; i < len(emailLineSeps); i++ {
+		if j := strings.IndexByte(line, emailLineSeps[i]); j > at {
+			return strings.TrimSpace(strings.ToLower(line[:j])), strings.TrimSpace(line[j+1:]), true
+		}
 	}
-	return "", "", false
+	return strings.ToLower(line), "", true
 }
 
-// ParseEmailsText многострочный ввод.
+// emailLineSeps разделители email и пароля в строке, в порядке приоритета.
+const emailLineSeps = ":;\t"
+
+// ParseEmailsText многострочный ввод. Строки режутся по месту (strings.Cut), без промежуточного
+// среза всех строк: на вставке в 100k строк это одна аллокация результата вместо двух.
 func ParseEmailsText(text string) [][2]string {
 	var out [][2]string
-	for _, line := range strings.Split(text, "\n") {
-		e, p, ok := ParseEmailLine(line)
-		if ok {
+	for rest, more := text, true; more; {
+		var line string
+		line, rest, more = strings.Cut(rest, "\n")
+		if e, p, ok := ParseEmailLine(line); ok {
+			if out == nil {
+				out = make([][2]string, 0, strings.Count(rest, "\n")+1)
+			}
 			out = append(out, [2]string{e, p})
 		}
 	}
 	return out
 }
 
-// ParseEmailsCSV содержимое CSV (колонки email/почта/mail и password/пароль).
+// ParseEmailsCSV содержимое CSV (колонки email/почта/mail и password/пароль); nil, если файл битый
+// (как прежний csv.ReadAll: частичный результат не отдаётся).
 func ParseEmailsCSV(content string) [][2]string {
-	r := csv.NewReader(strings.NewReader(content))
-	r.TrimLeadingSpace = true
-	rows, err := r.ReadAll()
-	if err != nil || len(rows) == 0 {
+	var out [][2]string
+	if err := EachEmailCSV(strings.NewReader(content), func(email, pass string) {
+		out = append(out, [2]string{email, pass})
+	}); err != nil {
 		return nil
 	}
-	header := rows[0]
-	if len(header) == 1 && strings.Contains(header[0], ";") {
-		r = csv.NewReader(strings.NewReader(content))
-		r.Comma = ';'
-		rows, err = r.ReadAll()
-		if err != nil || len(rows) == 0 {
+	return out
+}
+
+// EachEmailCSV читает CSV потоково и вызывает fn для каждой строки с email; весь файл в память не грузится.
+// Разделитель «,» или «;» определяется по первой строке, заголовок и строки читает один csv.Reader
+// (заголовок в кавычках может быть многострочным). ErrCSVNoEmailColumn — колонку email найти не удалось;
+// на битой строке обход останавливается с ошибкой «строка N: …» — строки до неё fn уже получил.
+func EachEmailCSV(src io.Reader, fn func(email, pass string)) error {
+	br := bufio.NewReader(src)
+	r := csv.NewReader(br)
+	r.Comma = sniffCSVComma(br)
+	r.TrimLeadingSpace = true
+	r.FieldsPerRecord = -1
+	header, err := r.Read()
+	if err == io.EOF {
+		return ErrCSVNoEmailColumn
+	}
+	if err != nil {
+		return csvLineError(err)
+	}
+	emailCol, passCol := emailsCSVColumns(header)
+	if emailCol < 0 {
+		return ErrCSVNoEmailColumn
+	}
+	r.ReuseRecord = true
+	for {
+		row, err := r.Read()
+		if err == io.EOF {
 			return nil
 		}
-		header = rows[0]
+		if err != nil {
+			return csvLineError(err)
+		}
+		if len(row) <= emailCol {
+			continue
+		}
+		email := strings.TrimSpace(strings.ToLower(row[emailCol]))
+		pass := ""
+		if passCol < len(row) {
+			pass = strings.TrimSpace(row[passCol])
+		}
+		if email != "" && strings.Contains(email, "@") {
+			fn(email, pass)
+		}
 	}
+}
+
+// sniffCSVComma «;», если в первой строке (вне кавычек) есть «;» и нет «,»; иначе «,». Смотрит только
+// буфер bufio.Reader (Peek), ничего не потребляя.
+func sniffCSVComma(br *bufio.Reader) rune {
+	head, _ := br.Peek(br.Size())
+	var quoted, semi bool
+	for _, c := range head {
+		switch {
+		case c == '"':
+			quoted = !quoted
+		case quoted:
+		case c == '\n':
+			return commaOr(semi)
+		case c == ',':
+			return ','
+		case c == ';':
+			semi = true
+		}
+	}
+	return commaOr(semi)
+}
+
+func commaOr(semi bool) rune {
+	if semi {
+		return ';'
+	}
+	return ','
+}
+
+// csvLineError ошибка разбора с номером строки файла, где начинается битая запись.
+func csvLineError(err error) error {
+	var pe *csv.ParseError
+	if errors.As(err, &pe) {
+		return fmt.Errorf("строка %d: %w", pe.StartLine, pe.Err)
+	}
+	return err
+}
+
+// emailsCSVColumns индексы колонок email и пароля по заголовку; emailCol < 0 — колонки нет.
+func emailsCSVColumns(header []string) (emailCol, passCol int) {
 	low := make([]string, len(header))
 	for i, h := range header {
 		low[i] = strings.ToLower(strings.TrimSpace(h))
 	}
-	emailCol, passCol := -1, -1
+	emailCol, passCol = -1, -1
 	for i, h := range low {
 		switch h {
 		case "email", "почта", "mail", "логин", "login", "username":
@@ -77,7 +165,7 @@ func ParseEmailsCSV(content string) [][2]string {
 		}
 	}
 	if emailCol < 0 {
-		return nil
+		return -1, -1
 	}
 	if passCol < 0 {
 		passCol = emailCol + 1
@@ -85,19 +173,5 @@ func ParseEmailsCSV(content string) [][2]string {
 			passCol = emailCol
 		}
 	}
-	var out [][2]string
-	for _, row := range rows[1:] {
-		if len(row) <= emailCol {
-			continue
-		}
-		email := strings.TrimSpace(strings.ToLower(row[emailCol]))
-		pass := ""
-		if passCol < len(row) {
-			pass = strings.TrimSpace(row[passCol])
-		}
-		if email != "" && strings.Contains(email, "@") {
-			out = append(out, [2]string{email, pass})
-		}
-	}
-	return out
+	return emailCol, passCol
 }
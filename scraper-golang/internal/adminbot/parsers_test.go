@@ -2,7 +2,10 @@ package adminbot
 
 import (
 	"reflect"
+	"strings"
 	"testing"
+
+	"github.com/marktplaats-scraper/scraper-golang/internal/listingsdb"
 )
 
 func TestParseEmailLine(t *testing.T) {
@@ -20,6 +23,8 @@ func TestParseEmailLine(t *testing.T) {
 		{"only@gmail.com", "only@gmail.com", "", true},
 		{"nocolon@x.com", "nocolon@x.com", "", true},
 		{"badline", "", "", false},
+		{"x:a@b.c;pw", "x:a@b.c", "pw", true},
+		{"a@b.c;x:y", "a@b.c;x", "y", true},
 	}
 	for _, tc := range tests {
 		e, p, ok := ParseEmailLine(tc.line)
@@ -92,3 +97,87 @@ func TestMax(t *testing.T) {
 		t.Fatal(max(1, 2), max(3, 2))
 	}
 }
+
+func TestEmailsExportCSVRoundtrip(t *testing.T) {
+	t.Parallel()
+	rows := []listingsdb.EmailAccount{
+		{Email: "a@gmail.com", Password: "plain"},
+		{Email: "b@gmail.com", Password: `p,w"d`},
+	}
+	data, n, err := emailsExportCSV(func(yield func(email, password string) error) error {
+		for _, r := range rows {
+			if err := yield(r.Email, r.Password); err != nil {
+				return err
+			}
+		}
+		return nil
+	})
+	if err != nil || n != len(rows) {
+		t.Fatalf("n=%d err=%v", n, err)
+	}
+	got := ParseEmailsCSV(string(data))
+	if len(got) != 2 || got[0] != [2]string{"a@gmail.com", "plain"} || got[1] != [2]string{"b@gmail.com", `p,w"d`} {
+		t.Fatalf("%#v", got)
+	}
+}
+
+func TestSplitCallback(t *testing.T) {
+	t.Parallel()
+	tests := []struct{ data, op, arg string }{
+		{"admin_main", "admin_main", ""},
+		{"emails_test_all", "emails_test_all", ""},
+		{"approve_42", "approve", "42"},
+		{"unblock_7", "unblock", "7"},
+		{"emails_list_3", "emails_list", "3"},
+		{"emails_unblock_2_eF9h", "emails_unblock", "2_eF9h"},
+		{"emails_del_0_a_b", "emails_del", "0_a_b"},
+		{"tpl_edsubj_5", "tpl_edsubj", "5"},
+		{"x", "x", ""},
+	}
+	for _, tc := range tests {
+		op, arg := splitCallback(tc.data)
+		if op != tc.op || arg != tc.arg {
+			t.Errorf("splitCallback(%q) = (%q,%q) want (%q,%q)", tc.data, op, arg, tc.op, tc.arg)
+		}
+	}
+}
+
+func TestEachEmailCSVStreams(t *testing.T) {
+	t.Parallel()
+	var got [][2]string
+	err := EachEmailCSV(strings.NewReader("Email, Pass\nA@x.com, 1\nshort\nb@x.com,2,extra\n"), func(e, p string) {
+		got = append(got, [2]string{e, p})
+	})
+	want := [][2]string{{"a@x.com", "1"}, {"b@x.com", "2"}}
+	if err != nil || !reflect.DeepEqual(got, want) {
+		t.Fatalf("err=%v got %#v", err, got)
+	}
+}
+
+func TestEachEmailCSVErrors(t *testing.T) {
+	t.Parallel()
+	for src, want := range map[string]string{
+		"":                   ErrCSVNoEmailColumn.Error(),
+		"a,b\n1,2\n":         ErrCSVNoEmailColumn.Error(),
+		"email\n\"a@x.com\n": "строка 2",
+	} {
+		err := EachEmailCSV(strings.NewReader(src), func(string, string) {})
+		if err == nil || !strings.Contains(err.Error(), want) {
+			t.Errorf("%q: err=%v want %q", src, err, want)
+		}
+	}
+	if ParseEmailsCSV("email,password\na@x.com,1\nb@x.com,\"p\"q\n") != nil {
+		t.Error("broken file must be rejected as a whole")
+	}
+}
+
+func TestEachEmailCSVMultilineHeader(t *testing.T) {
+	t.Parallel()
+	var got [][2]string
+	err := EachEmailCSV(strings.NewReader("\"note\nline;x\";email;password\nn;a@x.com;1\n"), func(e, p string) {
+		got = append(got, [2]string{e, p})
+	})
+	if err != nil || !reflect.DeepEqual(got, [][2]string{{"a@x.com", "1"}}) {
+		t.Fatalf("err=%v got %#v", err, got)
+	}
+}
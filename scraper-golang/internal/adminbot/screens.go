@@ -5,12 +5,17 @@ import (
 	"fmt"
 	"html"
 	"strings"
+	"sync"
 
 	tgbotapi "github.com/go-telegram-bot-api/telegram-bot-api/v5"
 
 	"github.com/marktplaats-scraper/scraper-golang/internal/listingsdb"
 )
 
+// listTextGrow — начальная ёмкость текста экранов-списков: строки пишутся сразу в один буфер,
+// без промежуточного []string и strings.Join.
+const listTextGrow = 1024
+
 func mainPanelHTML() string {
 	return "👑 <b>Панель администратора</b>\n\nВыберите действие:"
 }
@@ -25,9 +30,10 @@ func (b *Bot) showPending(chatID int64, msgID int) {
 		b.editHTML(chatID, msgID, "📋 <b>Ожидающие подтверждения</b>\n\nНет заявок.", kbBackMain())
 		return
 	}
-	var lines []string
-	lines = append(lines, "📋 <b>Ожидающие подтверждения</b>")
-	var rows [][]tgbotapi.InlineKeyboardButton
+	var sb strings.Builder
+	sb.Grow(listTextGrow)
+	sb.WriteString("📋 <b>Ожидающие подтверждения</b>")
+	rows := make([][]tgbotapi.InlineKeyboardButton, 0, min(len(pending), 15)+1)
 	for _, u := range pending {
 		if len(rows) >= 15 {
 			break
@@ -36,14 +42,15 @@ func (b *Bot) showPending(chatID int64, msgID int) {
 		if len(created) > 10 {
 			created = created[:10]
 		}
-		lines = append(lines, fmt.Sprintf("• ID <code>%d</code> — %s", u.UserID, html.EscapeString(created)))
+		sb.WriteByte('\n')
+		fmt.Fprintf(&sb, "• ID <code>%d</code> — %s", u.UserID, html.EscapeString(created))
 		rows = append(rows, tgbotapi.NewInlineKeyboardRow(
 			tgbotapi.NewInlineKeyboardButtonData(fmt.Sprintf("✅ Одобрить %d", u.UserID), fmt.Sprintf("approve_%d", u.UserID)),
 			tgbotapi.NewInlineKeyboardButtonData(fmt.Sprintf("❌ Отклонить %d", u.UserID), fmt.Sprintf("reject_%d", u.UserID)),
 		))
 	}
-	rows = append(rows, tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ Назад", "admin_main")))
-	b.editHTML(chatID, msgID, strings.Join(lines, "\n"), tgbotapi.InlineKeyboardMarkup{InlineKeyboard: rows})
+	rows = append(rows, rowBackMain)
+	b.editHTML(chatID, msgID, sb.String(), tgbotapi.InlineKeyboardMarkup{InlineKeyboard: rows})
 }
 
 func (b *Bot) showWorkers(chatID int64, msgID int) {
@@ -64,9 +71,10 @@ func (b *Bot) showWorkers(chatID int64, msgID int) {
 		b.editHTML(chatID, msgID, "👥 <b>Воркеры</b>\n\nНет авторизованных воркеров.", kbBackMain())
 		return
 	}
-	var lines []string
-	lines = append(lines, "👥 <b>Воркеры</b>")
-	var rows [][]tgbotapi.InlineKeyboardButton
+	var sb strings.Builder
+	sb.Grow(listTextGrow)
+	sb.WriteString("👥 <b>Воркеры</b>")
+	rows := make([][]tgbotapi.InlineKeyboardButton, 0, min(len(stats), 20)+1)
 	for i, w := range stats {
 		if i >= 20 {
 			break
@@ -79,16 +87,17 @@ func (b *Bot) showWorkers(chatID int64, msgID int) {
 		if len(cr) > 10 {
 			cr = cr[:10]
 		}
-		lines = append(lines, fmt.Sprintf(
+		sb.WriteByte('\n')
+		fmt.Fprintf(&sb,
 			"• ID <code>%d</code> — %s\n  📅 Рег: %s | 📦 Сегодня: %d | 🕐 Последний: %s",
-			w.UserID, shift, html.EscapeString(cr), w.ListingsToday, html.EscapeString(w.LastListingAt)))
+			w.UserID, shift, html.EscapeString(cr), w.ListingsToday, html.EscapeString(w.LastListingAt))
 		rows = append(rows, tgbotapi.NewInlineKeyboardRow(
 			tgbotapi.NewInlineKeyboardButtonData(fmt.Sprintf("🚫 Блок %d", w.UserID), fmt.Sprintf("block_%d", w.UserID)),
 			tgbotapi.NewInlineKeyboardButtonData(fmt.Sprintf("🗑 Удалить %d", w.UserID), fmt.Sprintf("delete_%d", w.UserID)),
 		))
 	}
-	rows = append(rows, tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ Назад", "admin_main")))
-	b.editHTML(chatID, msgID, strings.Join(lines, "\n"), tgbotapi.InlineKeyboardMarkup{InlineKeyboard: rows})
+	rows = append(rows, rowBackMain)
+	b.editHTML(chatID, msgID, sb.String(), tgbotapi.InlineKeyboardMarkup{InlineKeyboard: rows})
 }
 
 func (b *Bot) showBlocked(chatID int64, msgID int) {
@@ -101,9 +110,10 @@ func (b *Bot) showBlocked(chatID int64, msgID int) {
 		b.editHTML(chatID, msgID, "🚫 <b>Заблокированные</b>\n\nНет заблокированных.", kbBackMain())
 		return
 	}
-	var lines []string
-	lines = append(lines, "🚫 <b>Заблокированные</b>")
-	var rows [][]tgbotapi.InlineKeyboardButton
+	var sb strings.Builder
+	sb.Grow(listTextGrow)
+	sb.WriteString("🚫 <b>Заблокированные</b>")
+	rows := make([][]tgbotapi.InlineKeyboardButton, 0, min(len(list), 20)+1)
 	for i, u := range list {
 		if i >= 20 {
 			break
@@ -112,38 +122,38 @@ func (b *Bot) showBlocked(chatID int64, msgID int) {
 		if len(ba) > 10 {
 			ba = ba[:10]
 		}
-		lines = append(lines, fmt.Sprintf("• ID <code>%d</code> — %s", u.UserID, html.EscapeString(ba)))
+		sb.WriteByte('\n')
+		fmt.Fprintf(&sb, "• ID <code>%d</code> — %s", u.UserID, html.EscapeString(ba))
 		rows = append(rows, tgbotapi.NewInlineKeyboardRow(
 			tgbotapi.NewInlineKeyboardButtonData(fmt.Sprintf("🔓 Разблокировать %d", u.UserID), fmt.Sprintf("unblock_%d", u.UserID)),
 		))
 	}
-	rows = append(rows, tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ Назад", "admin_main")))
-	b.editHTML(chatID, msgID, strings.Join(lines, "\n"), tgbotapi.InlineKeyboardMarkup{InlineKeyboard: rows})
+	rows = append(rows, rowBackMain)
+	b.editHTML(chatID, msgID, sb.String(), tgbotapi.InlineKeyboardMarkup{InlineKeyboard: rows})
 }
 
 func emailsMenuKB(db *sql.DB, ownerID int64) tgbotapi.InlineKeyboardMarkup {
 	n, _ := listingsdb.EmailsTotalCount(db, ownerID)
-	return tgbotapi.NewInlineKeyboardMarkup(
-		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("➕ Добавить (mail:apppassword)", "emails_add")),
-		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("📤 Загрузить CSV", "emails_upload")),
-		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData(fmt.Sprintf("📋 Список (%d)", n), "emails_list_0")),
-		tgbotapi.NewInlineKeyboardRow(
-			tgbotapi.NewInlineKeyboardButtonData("📧 Тест почты", "emails_test"),
-			tgbotapi.NewInlineKeyboardButtonData("🔄 Протестировать все", "emails_test_all"),
-		),
-		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("📥 Экспорт CSV", "emails_export")),
-		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ Назад", "admin_main")),
-	)
+	return emailsMenuKBCount(n)
+}
+
+// emailsMenuKBCount — меню почт с уже известным числом записей (без запроса к БД).
+func emailsMenuKBCount(n int) tgbotapi.InlineKeyboardMarkup {
+	rows := make([][]tgbotapi.InlineKeyboardButton, 0, len(emailsMenuHead)+1+len(emailsMenuTail))
+	rows = append(rows, emailsMenuHead...)
+	rows = append(rows, tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData(fmt.Sprintf("📋 Список (%d)", n), "emails_list_0")))
+	rows = append(rows, emailsMenuTail...)
+	return tgbotapi.InlineKeyboardMarkup{InlineKeyboard: rows}
 }
 
 func (b *Bot) showEmailsMenu(chatID int64, msgID int) {
-	n, _ := listingsdb.EmailsTotalCount(b.db, b.ownerID)
+	n := b.emailsCount()
 	text := fmt.Sprintf(
 		"📧 <b>База почт</b>\n\nВсего: %d\n\n"+
 			"• Добавить — mail:apppassword (несколько строк)\n"+
 			"• Загрузить CSV — файл .csv\n"+
 			"• Список — просмотр и удаление", n)
-	b.editHTML(chatID, msgID, text, emailsMenuKB(b.db, b.ownerID))
+	b.editHTML(chatID, msgID, text, emailsMenuKBCount(n))
 }
 
 func emailsAddHTML() string {
@@ -157,22 +167,19 @@ func emailsUploadHTML() string {
 
 func (b *Bot) showEmailsList(chatID int64, msgID int, page int) {
 	offset := page * emailsPerPage
-	rows, err := listingsdb.ListEmails(b.db, b.ownerID, emailsPerPage, offset)
+	rows, total, lastUsed, err := listingsdb.EmailsPage(b.db, b.ownerID, emailsPerPage, offset)
 	if err != nil {
-		b.editHTML(chatID, msgID, "Ошибка: "+html.EscapeString(err.Error()), emailsMenuKB(b.db, b.ownerID))
+		b.editHTML(chatID, msgID, "Ошибка: "+html.EscapeString(err.Error()), emailsMenuKBCount(b.emailsCount()))
 		return
 	}
-	total, _ := listingsdb.EmailsTotalCount(b.db, b.ownerID)
-	lastUsed := listingsdb.LastUsedEmail(b.db, b.ownerID)
 	if len(rows) == 0 {
-		b.editHTML(chatID, msgID, "📋 <b>Список почт</b>\n\nПусто.", tgbotapi.NewInlineKeyboardMarkup(
-			tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ К меню почт", "admin_emails")),
-		))
+		b.editHTML(chatID, msgID, "📋 <b>Список почт</b>\n\nПусто.", kbToEmailsMenu)
 		return
 	}
-	var lines []string
-	lines = append(lines, fmt.Sprintf("📋 <b>Почты</b> (стр. %d, всего %d)", page+1, total))
-	var kbRows [][]tgbotapi.InlineKeyboardButton
+	var sb strings.Builder
+	sb.Grow(listTextGrow)
+	fmt.Fprintf(&sb, "📋 <b>Почты</b> (стр. %d, всего %d)", page+1, total)
+	kbRows := make([][]tgbotapi.InlineKeyboardButton, 0, len(rows)+2)
 	for _, r := range rows {
 		badge := ""
 		if strings.EqualFold(r.Email, lastUsed) && !r.Blocked {
@@ -180,7 +187,8 @@ func (b *Bot) showEmailsList(chatID int64, msgID int, page int) {
 		} else if r.Blocked {
 			badge = " 🚫"
 		}
-		lines = append(lines, fmt.Sprintf("• <code>%s</code>%s", html.EscapeString(r.Email), badge))
+		sb.WriteByte('\n')
+		fmt.Fprintf(&sb, "• <code>%s</code>%s", html.EscapeString(r.Email), badge)
 		safe := emailToCallbackSafe(r.Email)
 		var row []tgbotapi.InlineKeyboardButton
 		if r.Blocked {
@@ -203,8 +211,8 @@ func (b *Bot) showEmailsList(chatID int64, msgID int, page int) {
 	if len(nav) > 0 {
 		kbRows = append(kbRows, nav)
 	}
-	kbRows = append(kbRows, tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ К меню почт", "admin_emails")))
-	text := strings.Join(lines, "\n")
+	kbRows = append(kbRows, rowToEmailsMenu)
+	text := sb.String()
 	if len(text) > 4000 {
 		text = text[:3997] + "..."
 	}
@@ -216,17 +224,14 @@ func templatesListHTML(db *sql.DB, ownerID int64) string {
 	if err != nil || len(tpls) == 0 {
 		return "📝 <b>Шаблоны сообщений</b>\n\nНет шаблонов."
 	}
-	var lines []string
-	lines = append(lines, "📝 <b>Шаблоны</b>")
-	lines = append(lines, "<i>При рассылке используются по кругу: 1‑е письмо — 1‑й шаблон, 2‑е — 2‑й…</i>")
+	var sb strings.Builder
+	sb.Grow(listTextGrow)
+	sb.WriteString("📝 <b>Шаблоны</b>\n<i>При рассылке используются по кругу: 1‑е письмо — 1‑й шаблон, 2‑е — 2‑й…</i>")
 	for _, t := range tpls {
-		prev := t.Body
-		if len([]rune(prev)) > 50 {
-			prev = string([]rune(prev)[:50]) + "…"
-		}
-		lines = append(lines, fmt.Sprintf("• <b>%s</b>\n  <i>%s</i>", html.EscapeString(t.Name), html.EscapeString(prev)))
+		sb.WriteByte('\n')
+		sb.WriteString(TemplateListLine(t.ID, t.Name, t.Body))
 	}
-	out := strings.Join(lines, "\n")
+	out := sb.String()
 	if len(out) > 4000 {
 		return out[:3997] + "..."
 	}
@@ -243,24 +248,34 @@ func templatesListKB(db *sql.DB, ownerID int64) tgbotapi.InlineKeyboardMarkup {
 		))
 	}
 	rows = append(rows, tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("➕ Добавить", "tpl_add")))
-	rows = append(rows, tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ Назад", "admin_main")))
+	rows = append(rows, rowBackMain)
 	return tgbotapi.InlineKeyboardMarkup{InlineKeyboard: rows}
 }
 
 func (b *Bot) showTemplates(chatID int64, msgID int) {
 	tpls, _ := listingsdb.ListEmailTemplates(b.db, b.ownerID)
 	if len(tpls) == 0 {
-		kb := tgbotapi.NewInlineKeyboardMarkup(
-			tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("➕ Добавить", "tpl_add")),
-			tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ Назад", "admin_main")),
-		)
-		b.editHTML(chatID, msgID, "📝 <b>Шаблоны сообщений</b>\n\nНет шаблонов.", kb)
+		b.editHTML(chatID, msgID, "📝 <b>Шаблоны сообщений</b>\n\nНет шаблонов.", kbTemplatesEmpty)
 		return
 	}
 	b.editHTML(chatID, msgID, templatesListHTML(b.db, b.ownerID), templatesListKB(b.db, b.ownerID))
 }
 
+var (
+	tplAddStep1Once sync.Once
+	tplAddStep1Text string
+)
+
+// tplAddStep1HTML — справка первого шага мастера шаблонов; зависит только от констант пакета,
+// поэтому собирается (с подстановкой примеров и экранированием) один раз.
 func tplAddStep1HTML() string {
+	tplAddStep1Once.Do(func() {
+		tplAddStep1Text = buildTplAddStep1HTML()
+	})
+	return tplAddStep1Text
+}
+
+func buildTplAddStep1HTML() string {
 	var help strings.Builder
 	help.WriteString("<b>Доступные переменные:</b>\n")
 	for k, desc := range TemplateVarDescriptions {
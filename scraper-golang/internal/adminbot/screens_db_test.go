@@ -72,3 +72,36 @@ func substringsAll(s string, subs ...string) bool {
 	}
 	return true
 }
+
+func TestTemplateListLine(t *testing.T) {
+	t.Parallel()
+	long := strings.Repeat("я", 60)
+	got := TemplateListLine(-1, "<a>", long)
+	want := "• <b>&lt;a&gt;</b>\n  <i>" + strings.Repeat("я", 50) + "…</i>"
+	if got != want {
+		t.Fatalf("got %q", got)
+	}
+	if got := TemplateListLine(-1, "<a>", "x&y"); got != "• <b>&lt;a&gt;</b>\n  <i>x&amp;y</i>" {
+		t.Fatalf("stale cache: %q", got)
+	}
+	ForgetTemplateLine(-1)
+}
+
+func TestImportEmailsCSV(t *testing.T) {
+	t.Parallel()
+	db, err := listingsdb.Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	src := "email;password\na@gmail.com;1\nb@gmail.com;2\na@gmail.com;3\n"
+	seen, added, skipped, err := ImportEmailsCSV(db, 7, strings.NewReader(src))
+	if seen != 3 || added != 2 || skipped != 1 || err != nil {
+		t.Fatalf("seen=%d added=%d skipped=%d err=%v", seen, added, skipped, err)
+	}
+	// Битая строка 3: импорт останавливается с её номером, строка 2 уже в базе.
+	seen, added, _, err = ImportEmailsCSV(db, 7, strings.NewReader("email,password\nc@gmail.com,1\nd@gmail.com,\"x\"y\ne@gmail.com,2\n"))
+	if seen != 1 || added != 1 || err == nil || !strings.Contains(err.Error(), "строка 3") {
+		t.Fatalf("seen=%d added=%d err=%v", seen, added, err)
+	}
+}
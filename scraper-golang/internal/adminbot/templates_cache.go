@@ -0,0 +1,61 @@
+package adminbot
+
+import (
+	"html"
+	"strings"
+	"sync"
+)
+
+// templatePreviewRunes — длина превью тела шаблона в списке.
+const templatePreviewRunes = 50
+
+// tplLine — готовая HTML-строка шаблона для списка и исходные name/body, из которых она собрана.
+type tplLine struct {
+	name, body string
+	html       string
+}
+
+// tplLines — экранированные строки списка шаблонов по id: шаблоны правятся редко, а список
+// перерисовывается на каждое открытие раздела, поэтому escape делается один раз на версию шаблона.
+var (
+	tplLinesMu sync.Mutex
+	tplLines   = map[int64]tplLine{}
+)
+
+// TemplateListLine строка «• <b>name</b> / <i>превью</i>»; пересобирается, только если name или body изменились.
+// id шаблонов общие для админа и воркеров (одна таблица), поэтому кешем пользуется и clientbot.
+func TemplateListLine(id int64, name, body string) string {
+	tplLinesMu.Lock()
+	defer tplLinesMu.Unlock()
+	if l, ok := tplLines[id]; ok && l.name == name && l.body == body {
+		return l.html
+	}
+	var sb strings.Builder
+	sb.WriteString("• <b>")
+	sb.WriteString(html.EscapeString(name))
+	sb.WriteString("</b>\n  <i>")
+	sb.WriteString(html.EscapeString(templatePreview(body)))
+	sb.WriteString("</i>")
+	l := tplLine{name: name, body: body, html: sb.String()}
+	tplLines[id] = l
+	return l.html
+}
+
+// ForgetTemplateLine убирает строку удалённого шаблона из кеша.
+func ForgetTemplateLine(id int64) {
+	tplLinesMu.Lock()
+	delete(tplLines, id)
+	tplLinesMu.Unlock()
+}
+
+// templatePreview первые templatePreviewRunes рун тела и «…», без копирования всего тела в []rune.
+func templatePreview(body string) string {
+	n := 0
+	for i := range body {
+		if n == templatePreviewRunes {
+			return body[:i] + "…"
+		}
+		n++
+	}
+	return body
+}
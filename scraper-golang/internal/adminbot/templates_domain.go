@@ -1,6 +1,11 @@
 package adminbot
 
-import "github.com/marktplaats-scraper/scraper-golang/internal/listingsdb"
+import (
+	"sort"
+	"strings"
+
+	"github.com/marktplaats-scraper/scraper-golang/internal/listingsdb"
+)
 
 // TemplateVarDescriptions подписи переменных (как TEMPLATE_VARS в Python).
 var TemplateVarDescriptions = map[string]string{
@@ -16,6 +21,30 @@ var TemplateVarDescriptions = map[string]string{
 	"item_id":       "ID объявления",
 }
 
+// TemplateVarKeys имена переменных по алфавиту — порядок подсказок не скачет от запуска к запуску.
+var TemplateVarKeys = func() []string {
+	keys := make([]string, 0, len(TemplateVarDescriptions))
+	for k := range TemplateVarDescriptions {
+		keys = append(keys, k)
+	}
+	sort.Strings(keys)
+	return keys
+}()
+
+// TemplateVarsInlineHTML «<code>{title}</code>, …» для подсказок шагов 2/3 и 3/3 — собирается один раз.
+var TemplateVarsInlineHTML = func() string {
+	var sb strings.Builder
+	for i, k := range TemplateVarKeys {
+		if i > 0 {
+			sb.WriteString(", ")
+		}
+		sb.WriteString("<code>{")
+		sb.WriteString(k)
+		sb.WriteString("}</code>")
+	}
+	return sb.String()
+}()
+
 func exampleTemplateVars() map[string]string {
 	return map[string]string{
 		"url":           "https://marktplaats.nl/v/example/m1234567890",
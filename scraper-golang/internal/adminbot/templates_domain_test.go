@@ -32,3 +32,16 @@ func TestTemplateVarDescriptionsKeys(t *testing.T) {
 		}
 	}
 }
+
+func TestTemplateVarsInlineHTML(t *testing.T) {
+	t.Parallel()
+	if len(TemplateVarKeys) != len(TemplateVarDescriptions) {
+		t.Fatalf("keys=%d descriptions=%d", len(TemplateVarKeys), len(TemplateVarDescriptions))
+	}
+	if got := strings.Count(TemplateVarsInlineHTML, "<code>{"); got != len(TemplateVarKeys) {
+		t.Fatalf("inline vars=%d", got)
+	}
+	if !strings.HasPrefix(TemplateVarsInlineHTML, "<code>{"+TemplateVarKeys[0]+"}</code>, ") {
+		t.Fatalf("unexpected order: %s", TemplateVarsInlineHTML)
+	}
+}
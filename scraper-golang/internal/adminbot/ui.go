@@ -1,40 +1,143 @@
 package adminbot
 
 import (
+	"container/list"
+	"encoding/base64"
+	"strconv"
 	"strings"
+	"sync"
 
 	tgbotapi "github.com/go-telegram-bot-api/telegram-bot-api/v5"
 )
 
-func kbMain() tgbotapi.InlineKeyboardMarkup {
-	return tgbotapi.NewInlineKeyboardMarkup(
+// Статические клавиатуры собираются один раз при загрузке пакета; вызывающие их не изменяют,
+// поэтому общие срезы кнопок безопасно переиспользовать (в том числе из параллельных колбэков).
+var (
+	rowBackMain     = tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ Назад", "admin_main"))
+	rowToEmailsMenu = tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ К меню почт", "admin_emails"))
+	rowToTemplates  = tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ К шаблонам", "admin_templates"))
+
+	kbMainMarkup = tgbotapi.NewInlineKeyboardMarkup(
 		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("📋 Ожидают подтверждения", "admin_pending")),
 		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("👥 Воркеры", "admin_workers")),
 		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("🚫 Заблокированные", "admin_blocked")),
 		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("📧 Почты", "admin_emails")),
 		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("📝 Шаблоны", "admin_templates")),
 	)
+	kbBackMainMarkup    = tgbotapi.NewInlineKeyboardMarkup(rowBackMain)
+	kbToEmailsMenu      = tgbotapi.NewInlineKeyboardMarkup(rowToEmailsMenu)
+	kbCancelToEmails    = tgbotapi.NewInlineKeyboardMarkup(tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("❌ Отмена", "admin_emails")))
+	kbCancelToTemplates = tgbotapi.NewInlineKeyboardMarkup(tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("❌ Отмена", "admin_templates")))
+	kbAbortToTemplates  = tgbotapi.NewInlineKeyboardMarkup(tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("Отмена", "admin_templates")))
+	kbTemplatesEmpty    = tgbotapi.NewInlineKeyboardMarkup(
+		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("➕ Добавить", "tpl_add")),
+		rowBackMain,
+	)
+
+	// Меню почт: меняется только кнопка «Список (N)», остальные ряды общие.
+	emailsMenuHead = [][]tgbotapi.InlineKeyboardButton{
+		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("➕ Добавить (mail:apppassword)", "emails_add")),
+		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("📤 Загрузить CSV", "emails_upload")),
+	}
+	emailsMenuTail = [][]tgbotapi.InlineKeyboardButton{
+		tgbotapi.NewInlineKeyboardRow(
+			tgbotapi.NewInlineKeyboardButtonData("📧 Тест почты", "emails_test"),
+			tgbotapi.NewInlineKeyboardButtonData("🔄 Протестировать все", "emails_test_all"),
+		),
+		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("📥 Экспорт CSV", "emails_export")),
+		rowBackMain,
+	}
+)
+
+func kbMain() tgbotapi.InlineKeyboardMarkup {
+	return kbMainMarkup
 }
 
 func kbBackMain() tgbotapi.InlineKeyboardMarkup {
-	return tgbotapi.NewInlineKeyboardMarkup(
-		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ Назад", "admin_main")),
-	)
+	return kbBackMainMarkup
 }
 
+// callbackEmailMax — сколько байт закодированной почты помещается в callback_data: лимит Telegram 64 байта
+// минус самый длинный префикс "emails_unblock_<стр.>_".
+const callbackEmailMax = 64 - len("emails_unblock_999_")
+
+// callbackTokenPrefix отмечает короткий токен вместо base64 (символа нет в алфавите base64url).
+const callbackTokenPrefix = "~"
+
+// callbackTokensMax — сколько токенов длинных почт держим в памяти; самые давно не использованные
+// вытесняются (устаревший токен декодируется в "" — как после рестарта).
+const callbackTokensMax = 512
+
+// tokenLRU — длинные почты, не влезающие в callback_data: токен ↔ адрес, не больше max записей.
+type tokenLRU struct {
+	mu      sync.Mutex
+	max     int
+	seq     int
+	order   *list.List // от свежих к старым; Value — *tokenEntry
+	byEmail map[string]*list.Element
+	byToken map[string]*list.Element
+}
+
+type tokenEntry struct{ token, email string }
+
+func newTokenLRU(max int) *tokenLRU {
+	return &tokenLRU{max: max, order: list.New(), byEmail: map[string]*list.Element{}, byToken: map[string]*list.Element{}}
+}
+
+// token возвращает токен почты (выдаёт новый при первом обращении).
+func (c *tokenLRU) token(email string) string {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if el, ok := c.byEmail[email]; ok {
+		c.order.MoveToFront(el)
+		return el.Value.(*tokenEntry).token
+	}
+	c.seq++
+	e := &tokenEntry{token: callbackTokenPrefix + strconv.Itoa(c.seq), email: email}
+	el := c.order.PushFront(e)
+	c.byEmail[email] = el
+	c.byToken[e.token] = el
+	for c.order.Len() > c.max {
+		old := c.order.Remove(c.order.Back()).(*tokenEntry)
+		delete(c.byEmail, old.email)
+		delete(c.byToken, old.token)
+	}
+	return e.token
+}
+
+// email почта по токену; "" если токен вытеснен или выдан до рестарта.
+func (c *tokenLRU) email(token string) string {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	el, ok := c.byToken[token]
+	if !ok {
+		return ""
+	}
+	c.order.MoveToFront(el)
+	return el.Value.(*tokenEntry).email
+}
+
+var callbackTokens = newTokenLRU(callbackTokensMax)
+
+// emailToCallbackSafe кодирует почту для callback_data: base64url без паддинга, однозначно обратимо
+// (прежняя замена "_"/"@"/":" путала адреса с "_a_" в локальной части).
 func emailToCallbackSafe(email string) string {
 	e := strings.TrimSpace(strings.ToLower(email))
-	e = strings.ReplaceAll(e, "_", "__")
-	e = strings.ReplaceAll(e, "@", "_a_")
-	e = strings.ReplaceAll(e, ":", "_c_")
-	return e
+	enc := base64.RawURLEncoding.EncodeToString([]byte(e))
+	if len(enc) <= callbackEmailMax {
+		return enc
+	}
+	return callbackTokens.token(e)
 }
 
-// decodeEmailFromCallback обратное к emailToCallbackSafe (как в admin_bot.py).
+// decodeEmailFromCallback обратное к emailToCallbackSafe; "" если данные повреждены или токен устарел (рестарт или вытеснен).
 func decodeEmailFromCallback(safe string) string {
-	s := safe
-	s = strings.ReplaceAll(s, "_c_", ":")
-	s = strings.ReplaceAll(s, "_a_", "@")
-	s = strings.ReplaceAll(s, "__", "_")
-	return s
+	if strings.HasPrefix(safe, callbackTokenPrefix) {
+		return callbackTokens.email(safe)
+	}
+	b, err := base64.RawURLEncoding.DecodeString(safe)
+	if err != nil {
+		return ""
+	}
+	return string(b)
 }
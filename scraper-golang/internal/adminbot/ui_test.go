@@ -12,6 +12,9 @@ func TestEmailCallbackSafeRoundtrip(t *testing.T) {
 		"user_name@domain.co.uk",
 		"weird__user@test.com",
 		"a:b@c.com", // ':' in local part after decode path
+		"x_a_y@gmail.com",
+		"c_c_d@gmail.com",
+		"very.long.local.part.for.callback.limits@example-domain.com",
 	} {
 		enc := emailToCallbackSafe(em)
 		dec := decodeEmailFromCallback(enc)
@@ -19,6 +22,31 @@ func TestEmailCallbackSafeRoundtrip(t *testing.T) {
 		if dec != want {
 			t.Errorf("%q enc=%q dec=%q want %q", em, enc, dec, want)
 		}
+		if len("emails_unblock_999_"+enc) > 64 {
+			t.Errorf("%q: callback_data too long (%d)", em, len("emails_unblock_999_"+enc))
+		}
+	}
+}
+
+func TestTokenLRUBounded(t *testing.T) {
+	t.Parallel()
+	c := newTokenLRU(2)
+	a, b := c.token("a@x"), c.token("b@x")
+	if c.email(a) != "a@x" { // a теперь свежее b
+		t.Fatalf("a: %q", c.email(a))
+	}
+	cc := c.token("c@x")
+	if c.email(b) != "" {
+		t.Fatalf("b not evicted")
+	}
+	if c.email(a) != "a@x" || c.email(cc) != "c@x" {
+		t.Fatalf("a=%q c=%q", c.email(a), c.email(cc))
+	}
+	if c.order.Len() != 2 || len(c.byEmail) != 2 || len(c.byToken) != 2 {
+		t.Fatalf("size %d/%d/%d", c.order.Len(), len(c.byEmail), len(c.byToken))
+	}
+	if nb := c.token("b@x"); nb == b {
+		t.Fatalf("evicted token %q reused", b)
 	}
 }
 
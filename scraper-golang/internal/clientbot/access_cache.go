@@ -0,0 +1,88 @@
+package clientbot
+
+import (
+	"sync"
+	"time"
+
+	"github.com/marktplaats-scraper/scraper-golang/internal/listingsdb"
+)
+
+// accessTTL — сколько живёт закешированный статус воркера. Одобрение и блок делает админ-бот
+// (другой процесс), поэтому кеш короткий: изменение видно не позже чем через accessTTL.
+const accessTTL = 3 * time.Second
+
+type accessEntry struct {
+	authorized, blocked, onShift bool
+	expires                      time.Time
+}
+
+// accessCache — authorized/blocked/shift_active по user_id (один запрос listingsdb.UserState): их проверяет
+// почти каждая кнопка и каждое сообщение воркера, часто по нескольку раз за апдейт.
+// Просроченные записи удаляются: при промахе по ним и проходом по всей карте не чаще раза в accessTTL,
+// поэтому в карте только те, кто писал боту последние ~2·accessTTL, а не все когда-либо написавшие.
+// Нулевое значение готово к использованию.
+type accessCache struct {
+	mu    sync.Mutex
+	m     map[int64]accessEntry
+	swept time.Time
+}
+
+// get запись user_id, если она ещё не просрочена (просроченная удаляется). Под c.mu.
+func (c *accessCache) get(userID int64, now time.Time) (accessEntry, bool) {
+	e, ok := c.m[userID]
+	if !ok {
+		return accessEntry{}, false
+	}
+	if !now.Before(e.expires) {
+		delete(c.m, userID)
+		return accessEntry{}, false
+	}
+	return e, true
+}
+
+// put кеширует запись на accessTTL и заодно выметает просроченные. Под c.mu.
+func (c *accessCache) put(userID int64, e accessEntry, now time.Time) {
+	if c.m == nil {
+		c.m = make(map[int64]accessEntry)
+	}
+	if now.Sub(c.swept) >= accessTTL {
+		for id, old := range c.m {
+			if !now.Before(old.expires) {
+				delete(c.m, id)
+			}
+		}
+		c.swept = now
+	}
+	e.expires = now.Add(accessTTL)
+	c.m[userID] = e
+}
+
+func (b *Bot) access(userID int64) accessEntry {
+	c := &b.accessC
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	now := time.Now()
+	if e, ok := c.get(userID, now); ok {
+		return e
+	}
+	auth, blocked, onShift, err := listingsdb.UserState(b.db, userID)
+	e := accessEntry{authorized: auth, blocked: blocked, onShift: onShift}
+	if err != nil {
+		return e
+	}
+	c.put(userID, e, now)
+	return e
+}
+
+func (b *Bot) isAuthorized(userID int64) bool { return b.access(userID).authorized }
+
+func (b *Bot) isBlocked(userID int64) bool { return b.access(userID).blocked }
+
+func (b *Bot) isOnShift(userID int64) bool { return b.access(userID).onShift }
+
+// forgetAccess сбрасывает статус после изменения users/blocked_users из этого бота.
+func (b *Bot) forgetAccess(userID int64) {
+	b.accessC.mu.Lock()
+	delete(b.accessC.m, userID)
+	b.accessC.mu.Unlock()
+}
@@ -0,0 +1,29 @@
+package clientbot
+
+import (
+	"testing"
+	"time"
+)
+
+func TestAccessCacheDropsExpired(t *testing.T) {
+	t.Parallel()
+	var c accessCache
+	t0 := time.Unix(1_700_000_000, 0)
+	for id := int64(1); id <= 100; id++ {
+		c.put(id, accessEntry{authorized: true}, t0)
+	}
+	if e, ok := c.get(1, t0.Add(accessTTL/2)); !ok || !e.authorized {
+		t.Fatalf("fresh entry: %v %v", e, ok)
+	}
+	if _, ok := c.get(2, t0.Add(accessTTL)); ok {
+		t.Fatal("expired entry returned")
+	}
+	if _, ok := c.m[2]; ok {
+		t.Fatal("expired entry kept after lookup")
+	}
+	// Новый пользователь через accessTTL выметает всех, кто больше не писал.
+	c.put(500, accessEntry{}, t0.Add(accessTTL))
+	if len(c.m) != 1 {
+		t.Fatalf("entries after sweep: %d", len(c.m))
+	}
+}
@@ -10,8 +10,12 @@ import (
 	tgbotapi "github.com/go-telegram-bot-api/telegram-bot-api/v5"
 
 	"github.com/marktplaats-scraper/scraper-golang/internal/prettylog"
+	"github.com/marktplaats-scraper/scraper-golang/internal/proxy"
 )
 
+// callbackWorkers — сколько inline-кнопок обрабатывается одновременно.
+const callbackWorkers = 4
+
 // Bot воркерский Telegram-бот.
 type Bot struct {
 	db         *sql.DB
@@ -20,18 +24,18 @@ type Bot struct {
 	cfg        Config
 	httpClient *http.Client // тот же транспорт, что у Bot API — и для скачивания файлов getFile
 
-	dlgMu        sync.Mutex
-	dlgStep      string // "", worker_emails, worker_tpl_name, worker_tpl_subject, worker_tpl_editsubj, worker_tpl_body, worker_bulk_csv
-	dlgTplName   string
-	dlgTplSubject string
-	dlgTplEditID int64
-	dlgBulkDelay time.Duration
+	// dlgs — шаг диалога по user_id: воркеров много, и ввод одного не должен сбивать шаг другого.
+	dlgMu sync.Mutex
+	dlgs  map[int64]*dialog
+
+	accessC   accessCache
+	lastEdits editDedup
 }
 
 // NewBot client = CLIENT_BOT_TOKEN; при заданном AdminBotToken — второй API для sendMessage админу.
 func NewBot(db *sql.DB, cfg Config, tgHTTP *http.Client) (*Bot, error) {
 	if tgHTTP == nil {
-		tgHTTP = &http.Client{Timeout: 120 * time.Second}
+		tgHTTP, _ = proxy.HTTPClient(nil, 120*time.Second) // без прокси ошибки нет
 	}
 	ep := cfg.APIEndpoint
 	if ep == "" {
@@ -53,13 +57,43 @@ func NewBot(db *sql.DB, cfg Config, tgHTTP *http.Client) (*Bot, error) {
 	return &Bot{db: db, api: api, adminAPI: adminAPI, cfg: cfg, httpClient: tgHTTP}, nil
 }
 
-func (b *Bot) clearDialog() {
+// dialog состояние многошагового ввода одного воркера.
+type dialog struct {
+	step       string // "", worker_emails, worker_tpl_name, worker_tpl_subject, worker_tpl_editsubj, worker_tpl_body, worker_bulk_csv
+	tplName    string
+	tplSubject string
+	tplEditID  int64
+	bulkDelay  time.Duration
+}
+
+// dialogOf копия состояния диалога воркера (нулевое — диалога нет).
+func (b *Bot) dialogOf(userID int64) dialog {
+	b.dlgMu.Lock()
+	defer b.dlgMu.Unlock()
+	if d := b.dlgs[userID]; d != nil {
+		return *d
+	}
+	return dialog{}
+}
+
+// updateDialog меняет состояние диалога воркера под мьютексом.
+func (b *Bot) updateDialog(userID int64, fn func(d *dialog)) {
 	b.dlgMu.Lock()
-	b.dlgStep = ""
-	b.dlgTplName = ""
-	b.dlgTplSubject = ""
-	b.dlgTplEditID = 0
-	b.dlgBulkDelay = 0
+	defer b.dlgMu.Unlock()
+	d := b.dlgs[userID]
+	if d == nil {
+		if b.dlgs == nil {
+			b.dlgs = make(map[int64]*dialog)
+		}
+		d = &dialog{}
+		b.dlgs[userID] = d
+	}
+	fn(d)
+}
+
+func (b *Bot) clearDialog(userID int64) {
+	b.dlgMu.Lock()
+	delete(b.dlgs, userID)
 	b.dlgMu.Unlock()
 }
 
@@ -77,7 +111,22 @@ func (b *Bot) Run() {
 	u := tgbotapi.NewUpdate(0)
 	u.Timeout = 60
 	ch := b.api.GetUpdatesChan(u)
+	// Кнопки разных воркеров обрабатываются параллельно (не больше callbackWorkers): экспорт, списки и
+	// рассылка читают SQLite десятки миллисекунд и не должны задерживать чужие апдейты.
+	// Сообщения одного воркера — по порядку (от них зависят шаги диалога), но в своей очереди (messageQueues):
+	// загрузка CSV одним воркером не держит ввод остальных.
+	sem := make(chan struct{}, callbackWorkers)
+	msgs := messageQueues{handle: b.handleUpdate}
 	for up := range ch {
-		b.handleUpdate(up)
+		if up.CallbackQuery == nil {
+			msgs.push(up)
+			continue
+		}
+		sem <- struct{}{}
+		go func(up tgbotapi.Update) {
+			defer func() { <-sem }()
+			b.handleUpdate(up)
+		}(up)
 	}
+	msgs.wait()
 }
@@ -0,0 +1,123 @@
+package clientbot
+
+import (
+	"strconv"
+	"sync"
+	"testing"
+	"time"
+
+	tgbotapi "github.com/go-telegram-bot-api/telegram-bot-api/v5"
+)
+
+func TestDialogPerUser(t *testing.T) {
+	t.Parallel()
+	b := &Bot{}
+	b.updateDialog(1, func(d *dialog) { d.step = "worker_tpl_name" })
+	b.updateDialog(2, func(d *dialog) { d.step = "worker_emails" })
+	if got := b.dialogOf(1).step; got != "worker_tpl_name" {
+		t.Fatalf("user 1 step = %q", got)
+	}
+	b.clearDialog(2)
+	if got := b.dialogOf(2).step; got != "" {
+		t.Fatalf("user 2 step after clear = %q", got)
+	}
+	if got := b.dialogOf(1).step; got != "worker_tpl_name" {
+		t.Fatalf("user 1 step after clearing 2 = %q", got)
+	}
+}
+
+func TestStepHandlersCoverTextSteps(t *testing.T) {
+	t.Parallel()
+	for _, step := range []string{"worker_emails", "worker_tpl_name", "worker_tpl_subject", "worker_tpl_editsubj", "worker_tpl_body"} {
+		if stepHandlers[step] == nil {
+			t.Errorf("no handler for %q", step)
+		}
+	}
+	// CSV рассылки приходит документом, текстом этот шаг не обрабатывается.
+	if stepHandlers["worker_bulk_csv"] != nil {
+		t.Error("worker_bulk_csv must fall through to the menu")
+	}
+}
+
+func TestMessageQueuesPerUser(t *testing.T) {
+	t.Parallel()
+	msg := func(uid int64, text string) tgbotapi.Update {
+		return tgbotapi.Update{Message: &tgbotapi.Message{From: &tgbotapi.User{ID: uid}, Chat: &tgbotapi.Chat{ID: uid}, Text: text}}
+	}
+	release := make(chan struct{})
+	var mu sync.Mutex
+	got := map[int64][]string{}
+	q := messageQueues{handle: func(up tgbotapi.Update) {
+		if up.Message.Text == "slow" {
+			<-release // долгая загрузка CSV воркера 1
+		}
+		mu.Lock()
+		got[up.Message.From.ID] = append(got[up.Message.From.ID], up.Message.Text)
+		mu.Unlock()
+	}}
+	q.push(msg(1, "slow"))
+	for i := 0; i < 100; i++ { // больше прежнего буфера в 16 — ничего не отбрасывается
+		q.push(msg(1, strconv.Itoa(i)))
+	}
+	q.push(msg(2, "email"))
+	deadline := time.Now().Add(5 * time.Second)
+	for {
+		mu.Lock()
+		n := len(got[2])
+		mu.Unlock()
+		if n == 1 {
+			break
+		}
+		if time.Now().After(deadline) {
+			t.Fatal("user 2 blocked by user 1")
+		}
+		time.Sleep(time.Millisecond)
+	}
+	close(release)
+	q.wait()
+	if len(got[1]) != 101 || got[1][0] != "slow" {
+		t.Fatalf("user 1: %d messages, first %q", len(got[1]), got[1][0])
+	}
+	for i, s := range got[1][1:] {
+		if s != strconv.Itoa(i) {
+			t.Fatalf("user 1 order: %v", got[1])
+		}
+	}
+	if len(q.m) != 0 {
+		t.Fatalf("idle queues not removed: %d", len(q.m))
+	}
+	if k := messageKey(tgbotapi.Update{Message: &tgbotapi.Message{Chat: &tgbotapi.Chat{ID: -7}}}); k != -7 {
+		t.Fatalf("no sender -> %d", k)
+	}
+}
+
+func TestIsCSVDocument(t *testing.T) {
+	t.Parallel()
+	for name, want := range map[string]bool{"emails.csv": true, "EMAILS.CSV": true, "x.Csv": true, "photo.jpg": false, "csv": false, "": false} {
+		msg := &tgbotapi.Message{Document: &tgbotapi.Document{FileName: name}}
+		if got := isCSVDocument(msg); got != want {
+			t.Errorf("%q: got %v", name, got)
+		}
+	}
+	if isCSVDocument(&tgbotapi.Message{Text: "a.csv"}) {
+		t.Error("text message treated as document")
+	}
+}
+
+func TestProgressThrottleCadence(t *testing.T) {
+	t.Parallel()
+	t0 := time.Unix(1_700_000_000, 0)
+	now := t0
+	due := progressThrottle(14, 5*time.Second, func() time.Time { return now })
+	var edits []int
+	for done := 1; done <= 14; done++ { // одно письмо в секунду
+		if due(done) {
+			edits = append(edits, done)
+		}
+		now = now.Add(time.Second)
+	}
+	// Правки на 0с, 5с, 10с; 14-е (последнее) не правится — итог уходит отдельно.
+	if len(edits) != 3 || edits[0] != 1 || edits[1] != 6 || edits[2] != 11 {
+		t.Fatalf("edits at %v", edits)
+	}
+}
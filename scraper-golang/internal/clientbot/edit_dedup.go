@@ -0,0 +1,77 @@
+package clientbot
+
+import (
+	"sync"
+
+	tgbotapi "github.com/go-telegram-bot-api/telegram-bot-api/v5"
+)
+
+// editDedupMax — сколько сообщений помним; при переполнении таблица сбрасывается целиком
+// (хуже от этого только одна лишняя правка на сообщение).
+const editDedupMax = 1024
+
+type editKey struct {
+	chatID int64
+	msgID  int
+}
+
+type sentEdit struct {
+	text string
+	html bool
+	kb   tgbotapi.InlineKeyboardMarkup
+}
+
+// editDedup — последний отправленный текст и клавиатура по сообщению. Повторный клик по тому же
+// экрану («Обновить», «Назад» на текущий экран) даёт ту же правку, и Telegram отвечает
+// «message is not modified» — такой запрос не отправляем вовсе. Нулевое значение готово к использованию.
+type editDedup struct {
+	mu sync.Mutex
+	m  map[editKey]sentEdit
+}
+
+// unchanged true — сообщение уже показывает это; иначе правка запоминается как отправленная.
+func (d *editDedup) unchanged(k editKey, e sentEdit) bool {
+	d.mu.Lock()
+	defer d.mu.Unlock()
+	if prev, ok := d.m[k]; ok && prev.text == e.text && prev.html == e.html && sameKB(prev.kb, e.kb) {
+		return true
+	}
+	if d.m == nil || len(d.m) >= editDedupMax {
+		d.m = make(map[editKey]sentEdit)
+	}
+	d.m[k] = e
+	return false
+}
+
+// forget убирает запись после неудачной правки, чтобы повтор не был отброшен.
+func (d *editDedup) forget(k editKey) {
+	d.mu.Lock()
+	delete(d.m, k)
+	d.mu.Unlock()
+}
+
+func sameKB(a, b tgbotapi.InlineKeyboardMarkup) bool {
+	if len(a.InlineKeyboard) != len(b.InlineKeyboard) {
+		return false
+	}
+	for i, ra := range a.InlineKeyboard {
+		rb := b.InlineKeyboard[i]
+		if len(ra) != len(rb) {
+			return false
+		}
+		for j := range ra {
+			if ra[j].Text != rb[j].Text || strPtr(ra[j].CallbackData) != strPtr(rb[j].CallbackData) ||
+				strPtr(ra[j].URL) != strPtr(rb[j].URL) {
+				return false
+			}
+		}
+	}
+	return true
+}
+
+func strPtr(p *string) string {
+	if p == nil {
+		return ""
+	}
+	return *p
+}
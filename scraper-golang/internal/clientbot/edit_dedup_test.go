@@ -0,0 +1,29 @@
+package clientbot
+
+import (
+	"testing"
+
+	tgbotapi "github.com/go-telegram-bot-api/telegram-bot-api/v5"
+)
+
+func TestEditDedup(t *testing.T) {
+	t.Parallel()
+	var d editDedup
+	k := editKey{1, 10}
+	e := sentEdit{text: "меню", html: true, kb: kbToEmailsMenu}
+	if d.unchanged(k, e) {
+		t.Fatal("first edit reported unchanged")
+	}
+	if !d.unchanged(k, e) {
+		t.Fatal("repeat edit not detected")
+	}
+	e2 := e
+	e2.kb = tgbotapi.NewInlineKeyboardMarkup(rowTplAdd)
+	if d.unchanged(k, e2) {
+		t.Fatal("keyboard change reported unchanged")
+	}
+	d.forget(k)
+	if d.unchanged(k, e2) {
+		t.Fatal("forgotten edit reported unchanged")
+	}
+}
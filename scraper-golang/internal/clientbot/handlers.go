@@ -1,12 +1,14 @@
 package clientbot
 
 import (
+	"errors"
 	"fmt"
 	"html"
 	"io"
 	"net/http"
 	"strconv"
 	"strings"
+	"sync"
 	"time"
 
 	tgbotapi "github.com/go-telegram-bot-api/telegram-bot-api/v5"
@@ -64,16 +66,18 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 	}
 
 	// Админ жмёт одобрить/отклонить в своём чате (как в Python — тот же клиент-бот может доставлять уведомление).
-	if strings.HasPrefix(data, "approve_") && chatID == b.cfg.AdminChatID {
-		b.handleAdminApprove(cb, true)
-		return
-	}
-	if strings.HasPrefix(data, "reject_") && chatID == b.cfg.AdminChatID {
-		b.handleAdminApprove(cb, false)
-		return
+	if chatID == b.cfg.AdminChatID {
+		if id, ok := strings.CutPrefix(data, "approve_"); ok {
+			b.handleAdminApprove(cb, id, true)
+			return
+		}
+		if id, ok := strings.CutPrefix(data, "reject_"); ok {
+			b.handleAdminApprove(cb, id, false)
+			return
+		}
 	}
 
-	if listingsdb.IsBlocked(b.db, fromID) {
+	if b.isBlocked(fromID) {
 		prettylog.Workerf("кнопка игнор · user=%d заблокирован · %q", fromID, data)
 		b.answerCallback(cb.ID, "")
 		return
@@ -83,126 +87,94 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 
 	switch {
 	case data == "shift_start":
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "🔒 Сначала дождитесь одобрения")
 			return
 		}
 		_ = listingsdb.SetShiftActive(b.db, fromID, true)
+		b.forgetAccess(fromID)
 		prettylog.OKf("смена СТАРТ · user=%d", fromID)
 		b.editMsgHTML(chatID, msgID,
 			"🟢 <b>Смена начата</b>\n\nВы будете получать уведомления о новых товарах (&lt; 3 ч).",
 			workerKB(true))
 		b.answerCallback(cb.ID, "🟢 Смена начата")
 	case data == "shift_stop":
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
 		_ = listingsdb.SetShiftActive(b.db, fromID, false)
+		b.forgetAccess(fromID)
 		prettylog.OKf("смена СТОП · user=%d", fromID)
 		b.editMsgHTML(chatID, msgID,
 			"⚪ <b>Смена закрыта</b>\n\nУведомления приостановлены.",
 			workerKB(false))
 		b.answerCallback(cb.ID, "⚪ Смена закрыта")
 	case data == "list_today":
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		items, err := listingsdb.WorkerListingsToday(b.db, fromID)
+		items, total, err := listingsdb.WorkerListingsToday(b.db, fromID, listTodayMax)
 		if err != nil || len(items) == 0 {
 			b.answerCallback(cb.ID, "📦 Сегодня товаров нет")
 			return
 		}
-		var lines []string
-		lines = append(lines, fmt.Sprintf("📦 <b>Товары сегодня (%d)</b>", len(items)))
-		for i, it := range items {
-			if i >= 25 {
-				break
-			}
-			price := "—"
-			if it.PriceCents.Valid {
-				price = fmt.Sprintf("€%.2f", float64(it.PriceCents.Int64)/100)
-			}
-			title := it.Title
-			if title == "" {
-				title = "?"
-			}
-			r := []rune(title)
-			if len(r) > 50 {
-				title = string(r[:50])
-			}
-			lines = append(lines, fmt.Sprintf("%d. %s — %s", i+1, html.EscapeString(title), price))
-			if it.ListingURL != "" {
-				lines = append(lines, "   "+html.EscapeString(it.ListingURL))
-			}
-		}
-		text := strings.Join(lines, "\n")
-		if len(text) > 4000 {
-			text = text[:3997] + "..."
-		}
-		prettylog.Workerf("товары сегодня · user=%d · строк %d", fromID, len(items))
+		text := listTodayHTML(items, total)
+		prettylog.Workerf("товары сегодня · user=%d · строк %d", fromID, total)
 		m := tgbotapi.NewMessage(chatID, text)
 		m.ParseMode = "HTML"
 		_, _ = b.api.Send(m)
 		b.answerCallback(cb.ID, "")
 	case data == "worker_emails":
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		b.clearDialog()
+		b.clearDialog(fromID)
 		n, _ := listingsdb.EmailsTotalCount(b.db, fromID)
 		b.editMsgHTML(chatID, msgID,
 			fmt.Sprintf("📧 <b>База почт</b>\n\nВсего: %d\n\n• Добавить — несколько строк\n• CSV — файл .csv\n• Список", n),
-			workerEmailsKB(b.db, fromID))
+			workerEmailsKB(n))
 		b.answerCallback(cb.ID, "")
 	case data == "worker_emails_add":
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		b.dlgMu.Lock()
-		b.dlgStep = "worker_emails"
-		b.dlgMu.Unlock()
+		b.updateDialog(fromID, func(d *dialog) {
+			d.step = "worker_emails"
+		})
 		prettylog.Workerf("диалог · ввод почт · user=%d", fromID)
-		b.editMsgHTML(chatID, msgID, workerEmailsAddHTML(),
-			tgbotapi.NewInlineKeyboardMarkup(tgbotapi.NewInlineKeyboardRow(
-				tgbotapi.NewInlineKeyboardButtonData("❌ Отмена", "worker_emails"),
-			)))
+		b.editMsgHTML(chatID, msgID, workerEmailsAddHTML(), kbCancelToEmails)
 		b.answerCallback(cb.ID, "")
 	case data == "worker_emails_upload":
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		b.clearDialog()
-		b.editMsgHTML(chatID, msgID, workerEmailsUploadHTML(),
-			tgbotapi.NewInlineKeyboardMarkup(tgbotapi.NewInlineKeyboardRow(
-				tgbotapi.NewInlineKeyboardButtonData("◀️ К меню почт", "worker_emails"),
-			)))
+		b.clearDialog(fromID)
+		b.editMsgHTML(chatID, msgID, workerEmailsUploadHTML(), kbToEmailsMenu)
 		b.answerCallback(cb.ID, "")
 	case strings.HasPrefix(data, "worker_emails_list_"):
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		page, _ := strconv.Atoi(strings.TrimPrefix(data, "worker_emails_list_"))
+		page, _ := strconv.Atoi(data[len("worker_emails_list_"):])
 		txt, kb := buildWorkerEmailsListPage(b.db, fromID, page)
 		b.editMsgHTML(chatID, msgID, txt, kb)
 		b.answerCallback(cb.ID, "")
 	case strings.HasPrefix(data, "worker_email_del_"):
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		parts := strings.Split(strings.TrimPrefix(data, "worker_email_del_"), "_")
-		if len(parts) < 2 {
+		page, idx, ok := parsePageIdx(data[len("worker_email_del_"):])
+		if !ok {
 			b.answerCallback(cb.ID, "Ошибка")
 			return
 		}
-		page, _ := strconv.Atoi(parts[0])
-		idx, _ := strconv.Atoi(parts[1])
 		offset := page * emailsPerPage
 		rows, _ := listingsdb.ListEmails(b.db, fromID, emailsPerPage, offset)
 		if idx < 0 || idx >= len(rows) {
@@ -210,10 +182,9 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 			return
 		}
 		em := rows[idx].Email
-		if ok, _ := listingsdb.DeleteEmail(b.db, fromID, em); ok {
+		if ok, total, _ := listingsdb.DeleteEmail(b.db, fromID, em); ok {
 			prettylog.Warnf("почта удалена · user=%d · %s", fromID, em)
 			b.answerCallback(cb.ID, "✅ Удалена")
-			total, _ := listingsdb.EmailsTotalCount(b.db, fromID)
 			newPage := page
 			if total > 0 {
 				maxP := (total - 1) / emailsPerPage
@@ -229,17 +200,15 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 			b.answerCallback(cb.ID, "Не удалось удалить")
 		}
 	case strings.HasPrefix(data, "worker_email_unblock_"):
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		parts := strings.Split(strings.TrimPrefix(data, "worker_email_unblock_"), "_")
-		if len(parts) < 2 {
+		page, idx, ok := parsePageIdx(data[len("worker_email_unblock_"):])
+		if !ok {
 			b.answerCallback(cb.ID, "Ошибка")
 			return
 		}
-		page, _ := strconv.Atoi(parts[0])
-		idx, _ := strconv.Atoi(parts[1])
 		offset := page * emailsPerPage
 		rows, _ := listingsdb.ListEmails(b.db, fromID, emailsPerPage, offset)
 		if idx < 0 || idx >= len(rows) {
@@ -256,51 +225,48 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 			b.answerCallback(cb.ID, "Не удалось разблокировать")
 		}
 	case data == "worker_main":
-		b.clearDialog()
-		if listingsdb.IsBlocked(b.db, fromID) {
+		b.clearDialog(fromID)
+		if b.isBlocked(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		if listingsdb.IsAuthorized(b.db, fromID) {
-			on := listingsdb.IsShiftActive(b.db, fromID)
+		if b.isAuthorized(fromID) {
+			on := b.isOnShift(fromID)
 			b.editMsgHTML(chatID, msgID,
 				"👋 Добро пожаловать!\n\nНачните смену, чтобы получать уведомления о новых товарах (&lt; 3 ч).",
 				workerKB(on))
 		} else {
-			b.editMsgHTML(chatID, msgID, pendingRegText(), tgbotapi.InlineKeyboardMarkup{InlineKeyboard: [][]tgbotapi.InlineKeyboardButton{}})
+			b.editMsgHTML(chatID, msgID, pendingRegText(), kbNone)
 		}
 		b.answerCallback(cb.ID, "")
 	case data == "worker_templates":
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		b.clearDialog()
+		b.clearDialog(fromID)
 		txt, kb := renderWorkerTemplates(b.db, fromID)
 		b.editMsgHTML(chatID, msgID, txt, kb)
 		b.answerCallback(cb.ID, "")
 	case data == "worker_tpl_add":
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		b.dlgMu.Lock()
-		b.dlgStep = "worker_tpl_name"
-		b.dlgTplEditID = 0
-		b.dlgTplName = ""
-		b.dlgTplSubject = ""
-		b.dlgMu.Unlock()
-		b.editMsgHTML(chatID, msgID, workerTplAddHTML(),
-			tgbotapi.NewInlineKeyboardMarkup(tgbotapi.NewInlineKeyboardRow(
-				tgbotapi.NewInlineKeyboardButtonData("❌ Отмена", "worker_templates"),
-			)))
+		b.updateDialog(fromID, func(d *dialog) {
+			d.step = "worker_tpl_name"
+			d.tplEditID = 0
+			d.tplName = ""
+			d.tplSubject = ""
+		})
+		b.editMsgHTML(chatID, msgID, workerTplAddHTML(), kbCancelToTemplates)
 		b.answerCallback(cb.ID, "")
 	case strings.HasPrefix(data, "worker_tpl_edit_"):
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		tid, _ := strconv.ParseInt(strings.TrimPrefix(data, "worker_tpl_edit_"), 10, 64)
+		tid, _ := strconv.ParseInt(data[len("worker_tpl_edit_"):], 10, 64)
 		name, _, _, ok := listingsdb.GetEmailTemplate(b.db, fromID, tid)
 		if !ok {
 			b.answerCallback(cb.ID, "Не найден")
@@ -313,67 +279,64 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 					tgbotapi.NewInlineKeyboardButtonData("Тема", fmt.Sprintf("worker_tpl_edsubj_%d", tid)),
 					tgbotapi.NewInlineKeyboardButtonData("Текст", fmt.Sprintf("worker_tpl_edbody_%d", tid)),
 				),
-				tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ К списку", "worker_templates")),
+				rowToTplList,
 			))
 		b.answerCallback(cb.ID, "")
 		return
 	case strings.HasPrefix(data, "worker_tpl_edsubj_"):
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		tid, _ := strconv.ParseInt(strings.TrimPrefix(data, "worker_tpl_edsubj_"), 10, 64)
+		tid, _ := strconv.ParseInt(data[len("worker_tpl_edsubj_"):], 10, 64)
 		name, subj, _, ok := listingsdb.GetEmailTemplate(b.db, fromID, tid)
 		if !ok {
 			b.answerCallback(cb.ID, "Не найден")
 			return
 		}
-		b.dlgMu.Lock()
-		b.dlgStep = "worker_tpl_editsubj"
-		b.dlgTplEditID = tid
-		b.dlgTplName = name
-		b.dlgMu.Unlock()
+		b.updateDialog(fromID, func(d *dialog) {
+			d.step = "worker_tpl_editsubj"
+			d.tplEditID = tid
+			d.tplName = name
+		})
 		b.editMsgHTML(chatID, msgID,
 			fmt.Sprintf("📝 <b>Тема</b> — «%s»\n\nНовая тема ({title} и др.). Пусто или <code>-</code> — только название товара.", html.EscapeString(name)),
-			tgbotapi.NewInlineKeyboardMarkup(tgbotapi.NewInlineKeyboardRow(
-				tgbotapi.NewInlineKeyboardButtonData("Отмена", "worker_templates"),
-			)))
+			kbAbortToTemplates)
 		b.sendHTML(chatID, "<pre>"+html.EscapeString(subj)+"</pre>")
 		b.answerCallback(cb.ID, "")
 		return
 	case strings.HasPrefix(data, "worker_tpl_edbody_"):
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		tid, _ := strconv.ParseInt(strings.TrimPrefix(data, "worker_tpl_edbody_"), 10, 64)
+		tid, _ := strconv.ParseInt(data[len("worker_tpl_edbody_"):], 10, 64)
 		name, subj, body, ok := listingsdb.GetEmailTemplate(b.db, fromID, tid)
 		if !ok {
 			b.answerCallback(cb.ID, "Не найден")
 			return
 		}
-		b.dlgMu.Lock()
-		b.dlgStep = "worker_tpl_body"
-		b.dlgTplEditID = tid
-		b.dlgTplName = name
-		b.dlgTplSubject = subj
-		b.dlgMu.Unlock()
+		b.updateDialog(fromID, func(d *dialog) {
+			d.step = "worker_tpl_body"
+			d.tplEditID = tid
+			d.tplName = name
+			d.tplSubject = subj
+		})
 		b.editMsgHTML(chatID, msgID,
 			fmt.Sprintf("✏️ <b>Текст</b> — «%s»\n\nНовый текст:", html.EscapeString(name)),
-			tgbotapi.NewInlineKeyboardMarkup(tgbotapi.NewInlineKeyboardRow(
-				tgbotapi.NewInlineKeyboardButtonData("Отмена", "worker_templates"),
-			)))
+			kbAbortToTemplates)
 		b.sendHTML(chatID, "<pre>"+html.EscapeString(body)+"</pre>")
 		b.answerCallback(cb.ID, "")
 		return
 	case strings.HasPrefix(data, "worker_tpl_del_"):
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		tid, _ := strconv.ParseInt(strings.TrimPrefix(data, "worker_tpl_del_"), 10, 64)
+		tid, _ := strconv.ParseInt(data[len("worker_tpl_del_"):], 10, 64)
 		_ = listingsdb.ClearActiveTemplateIf(b.db, fromID, tid)
 		if ok, _ := listingsdb.DeleteEmailTemplate(b.db, fromID, tid); ok {
+			adminbot.ForgetTemplateLine(tid)
 			prettylog.Warnf("шаблон удалён · user=%d · id=%d", fromID, tid)
 			txt, kb := renderWorkerTemplates(b.db, fromID)
 			b.editMsgHTML(chatID, msgID, txt, kb)
@@ -382,16 +345,16 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 			b.answerCallback(cb.ID, "Не найден")
 		}
 	case data == "worker_bulk_mail":
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		n, _ := listingsdb.EmailsTotalCount(b.db, fromID)
+		n, _, nTpl, _ := listingsdb.MailCounts(b.db, fromID)
 		if n == 0 {
 			b.answerCallback(cb.ID, "❌ Сначала добавьте почты")
 			return
 		}
-		if nTpl, _ := listingsdb.EmailTemplatesCount(b.db, fromID); nTpl == 0 {
+		if nTpl == 0 {
 			b.answerCallback(cb.ID, "❌ Добавьте хотя бы один шаблон")
 			return
 		}
@@ -400,28 +363,23 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 			workerBulkDelayKB())
 		b.answerCallback(cb.ID, "")
 	case strings.HasPrefix(data, "worker_bulk_delay_"):
-		if !listingsdb.IsAuthorized(b.db, fromID) {
+		if !b.isAuthorized(fromID) {
 			b.answerCallback(cb.ID, "")
 			return
 		}
-		sec, _ := strconv.Atoi(strings.TrimPrefix(data, "worker_bulk_delay_"))
-		b.dlgMu.Lock()
-		b.dlgStep = "worker_bulk_csv"
-		b.dlgBulkDelay = time.Duration(sec) * time.Second
-		b.dlgMu.Unlock()
-		label := "Без задержки"
-		for _, o := range bulkDelayOptions {
-			if o.Sec == sec {
-				label = o.Label
-				break
-			}
+		opt, ok := bulkDelayByCallback[data]
+		if !ok {
+			opt = bulkDelayOptions[0]
 		}
+		b.updateDialog(fromID, func(d *dialog) {
+			d.step = "worker_bulk_csv"
+			d.bulkDelay = time.Duration(opt.Sec) * time.Second
+		})
+		label := opt.Label
 		prettylog.Workerf("рассылка · выбрана задержка %s · user=%d", label, fromID)
 		b.editMsgHTML(chatID, msgID,
 			fmt.Sprintf("📤 <b>Рассылка по CSV</b> · задержка: <b>%s</b>\n\nЗагрузите .csv (продавец + ссылка marktplaats/2dehands).", html.EscapeString(label)),
-			tgbotapi.NewInlineKeyboardMarkup(tgbotapi.NewInlineKeyboardRow(
-				tgbotapi.NewInlineKeyboardButtonData("❌ Отмена", "worker_main"),
-			)))
+			kbCancelToMain)
 		b.answerCallback(cb.ID, "")
 	default:
 		prettylog.Workerf("кнопка без обработчика · %q", data)
@@ -429,13 +387,8 @@ func (b *Bot) onCallback(cb *tgbotapi.CallbackQuery) {
 	}
 }
 
-func (b *Bot) handleAdminApprove(cb *tgbotapi.CallbackQuery, approve bool) {
-	var uidStr string
-	if approve {
-		uidStr = strings.TrimPrefix(cb.Data, "approve_")
-	} else {
-		uidStr = strings.TrimPrefix(cb.Data, "reject_")
-	}
+// handleAdminApprove uidStr — хвост callback_data после approve_/reject_ (префикс уже отрезан в onCallback).
+func (b *Bot) handleAdminApprove(cb *tgbotapi.CallbackQuery, uidStr string, approve bool) {
 	workerID, err := strconv.ParseInt(uidStr, 10, 64)
 	if err != nil {
 		b.answerCallback(cb.ID, "Ошибка id")
@@ -446,6 +399,7 @@ func (b *Bot) handleAdminApprove(cb *tgbotapi.CallbackQuery, approve bool) {
 	old := cb.Message.Text
 	if approve {
 		_ = listingsdb.AuthorizeUser(b.db, workerID)
+		b.forgetAccess(workerID)
 		prettylog.OKf("админ одобрил воркера · user_id=%d", workerID)
 		txt := "✅ <b>Ваша заявка одобрена!</b>\n\nТеперь вы можете пользоваться ботом. Нажмите /start для начала."
 		m := tgbotapi.NewMessage(workerID, txt)
@@ -454,13 +408,14 @@ func (b *Bot) handleAdminApprove(cb *tgbotapi.CallbackQuery, approve bool) {
 			prettylog.Warnf("уведомление воркеру %d · %v", workerID, err)
 		}
 		newText := old + "\n\n✅ Одобрено"
-		b.editMsgHTML(chatID, msgID, newText, tgbotapi.InlineKeyboardMarkup{InlineKeyboard: [][]tgbotapi.InlineKeyboardButton{}})
+		b.editMsgHTML(chatID, msgID, newText, kbNone)
 		b.answerCallback(cb.ID, "✅ Воркер одобрен")
 	} else {
 		_ = listingsdb.BlockUser(b.db, workerID)
+		b.forgetAccess(workerID)
 		prettylog.Warnf("админ отклонил (блок) · user_id=%d", workerID)
 		newText := old + "\n\n❌ Отклонён и заблокирован"
-		b.editMsgHTML(chatID, msgID, newText, tgbotapi.InlineKeyboardMarkup{InlineKeyboard: [][]tgbotapi.InlineKeyboardButton{}})
+		b.editMsgHTML(chatID, msgID, newText, kbNone)
 		b.answerCallback(cb.ID, "❌ Отклонён")
 	}
 }
@@ -498,44 +453,47 @@ func (b *Bot) notifyAdminNewWorker(workerID int64, u *tgbotapi.User) {
 	}
 }
 
+func isCSVDocument(msg *tgbotapi.Message) bool {
+	return msg.Document != nil && len(msg.Document.FileName) >= len(".csv") &&
+		strings.EqualFold(msg.Document.FileName[len(msg.Document.FileName)-len(".csv"):], ".csv")
+}
+
 func (b *Bot) onMessage(msg *tgbotapi.Message) {
 	uid := int64(0)
 	if msg.From != nil {
 		uid = msg.From.ID
 	}
-	if listingsdb.IsBlocked(b.db, uid) {
+	// Обрабатываются только текст и .csv; фото, стикеры и прочие файлы отбрасываются до проверок доступа в БД.
+	csvDoc := isCSVDocument(msg)
+	if !csvDoc && msg.Text == "" {
+		return
+	}
+	if b.isBlocked(uid) {
 		prettylog.Workerf("игнор · user=%d в blocked_users", uid)
 		return
 	}
 
-	b.dlgMu.Lock()
-	step := b.dlgStep
-	bulkDelay := b.dlgBulkDelay
-	b.dlgMu.Unlock()
+	d := b.dialogOf(uid)
+	step := d.step
 
-	if msg.Document != nil && msg.Document.FileName != "" &&
-		strings.HasSuffix(strings.ToLower(msg.Document.FileName), ".csv") {
-		if step == "worker_bulk_csv" && listingsdb.IsAuthorized(b.db, uid) {
-			b.handleBulkMailCSV(msg, bulkDelay)
+	if csvDoc {
+		if !b.isAuthorized(uid) {
+			prettylog.Workerf("CSV игнор · user=%d не авторизован и не в режиме рассылки", uid)
 			return
 		}
-		if listingsdb.IsAuthorized(b.db, uid) {
-			b.handleWorkerEmailsCSV(msg)
+		if step == "worker_bulk_csv" {
+			b.handleBulkMailCSV(msg, d.bulkDelay)
 			return
 		}
-		prettylog.Workerf("CSV игнор · user=%d не авторизован и не в режиме рассылки", uid)
-		return
-	}
-
-	if msg.Text == "" {
+		b.handleWorkerEmailsCSV(msg)
 		return
 	}
 
 	prettylog.Workerf("текст · user=%d · шаг=%q · %s", uid, step, previewOneLine(msg.Text, 160))
 
 	if msg.IsCommand() && msg.Command() == "start" {
-		if listingsdb.IsAuthorized(b.db, uid) {
-			on := listingsdb.IsShiftActive(b.db, uid)
+		if b.isAuthorized(uid) {
+			on := b.isOnShift(uid)
 			prettylog.OKf("/start · авторизован · user=%d · смена=%v", uid, on)
 			m := tgbotapi.NewMessage(msg.Chat.ID,
 				"👋 Добро пожаловать!\n\nНачните смену, чтобы получать уведомления о новых товарах (&lt; 3 ч).")
@@ -545,148 +503,156 @@ func (b *Bot) onMessage(msg *tgbotapi.Message) {
 			return
 		}
 		_ = listingsdb.RegisterPendingUser(b.db, uid)
+		b.forgetAccess(uid)
 		prettylog.Workerf("регистрация · pending · user=%d", uid)
-		b.notifyAdminNewWorker(uid, msg.From)
+		// Уведомление админу и ответ воркеру — независимые запросы к Bot API: шлются параллельно.
+		var wg sync.WaitGroup
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			b.notifyAdminNewWorker(uid, msg.From)
+		}()
 		m := tgbotapi.NewMessage(msg.Chat.ID, pendingRegText())
 		m.ParseMode = "HTML"
 		_, _ = b.api.Send(m)
+		wg.Wait()
 		return
 	}
 
-	switch step {
-	case "worker_emails":
-		if !listingsdb.IsAuthorized(b.db, uid) {
-			return
+	// Шаги диалога — одним поиском по stepHandlers; все они только для авторизованных.
+	if h := stepHandlers[step]; h != nil {
+		if b.isAuthorized(uid) {
+			h(b, msg, uid, d)
 		}
-		pairs := adminbot.ParseEmailsText(msg.Text)
-		if len(pairs) == 0 {
-			b.sendPlain(msg.Chat.ID, "❌ Не найдено валидных строк. Формат: mail@gmail.com:apppassword")
-			return
-		}
-		added, skipped := listingsdb.AddEmailsBatch(b.db, uid, pairs)
-		total, _ := listingsdb.EmailsTotalCount(b.db, uid)
-		active, _ := listingsdb.ActiveEmailsCount(b.db, uid)
-		prettylog.OKf("почты текстом · user=%d · +%d пропуск %d · всего %d активн %d", uid, added, skipped, total, active)
-		b.clearDialog()
-		b.sendPlain(msg.Chat.ID, fmt.Sprintf("✅ Добавлено: %d, пропущено (дубли): %d\n📋 Всего: %d, активных: %d", added, skipped, total, active))
-		m := tgbotapi.NewMessage(msg.Chat.ID, "📧 База почт")
-		m.ReplyMarkup = workerEmailsKB(b.db, uid)
-		_, _ = b.api.Send(m)
-	case "worker_tpl_name":
-		if !listingsdb.IsAuthorized(b.db, uid) {
-			return
-		}
-		name := strings.TrimSpace(msg.Text)
-		if name == "" {
-			b.sendPlain(msg.Chat.ID, "Введите название")
-			return
-		}
-		b.dlgMu.Lock()
-		b.dlgTplName = name
-		b.dlgStep = "worker_tpl_subject"
-		b.dlgMu.Unlock()
-		var vars strings.Builder
-		for k := range adminbot.TemplateVarDescriptions {
-			if vars.Len() > 0 {
-				vars.WriteString(", ")
-			}
-			vars.WriteString("<code>{")
-			vars.WriteString(k)
-			vars.WriteString("}</code>")
-		}
-		b.sendHTML(msg.Chat.ID, "Шаг 2/3: <b>тема письма</b>.\n\nПусто или <code>-</code> — только название товара.\n\nПеременные: "+vars.String())
-	case "worker_tpl_subject":
-		if !listingsdb.IsAuthorized(b.db, uid) {
-			return
-		}
-		b.dlgMu.Lock()
-		b.dlgTplSubject = strings.TrimSpace(msg.Text)
-		b.dlgStep = "worker_tpl_body"
-		b.dlgMu.Unlock()
-		var vars strings.Builder
-		for k := range adminbot.TemplateVarDescriptions {
-			if vars.Len() > 0 {
-				vars.WriteString(", ")
-			}
-			vars.WriteString("<code>{")
-			vars.WriteString(k)
-			vars.WriteString("}</code>")
-		}
-		b.sendHTML(msg.Chat.ID, "Шаг 3/3: <b>текст шаблона</b>.\n\nПеременные: "+vars.String())
-	case "worker_tpl_editsubj":
-		if !listingsdb.IsAuthorized(b.db, uid) {
-			return
-		}
-		newSubj := strings.TrimSpace(msg.Text)
-		b.dlgMu.Lock()
-		name := b.dlgTplName
-		eid := b.dlgTplEditID
-		b.dlgMu.Unlock()
-		if eid <= 0 {
-			b.clearDialog()
-			return
-		}
-		_, _, body, ok := listingsdb.GetEmailTemplate(b.db, uid, eid)
-		if !ok {
-			b.clearDialog()
-			return
-		}
-		_, _ = listingsdb.UpdateEmailTemplate(b.db, uid, eid, name, newSubj, body)
-		b.sendPlain(msg.Chat.ID, fmt.Sprintf("Тема «%s» обновлена", name))
-		b.clearDialog()
-		txt, kb := renderWorkerTemplates(b.db, uid)
-		m := tgbotapi.NewMessage(msg.Chat.ID, txt)
-		m.ParseMode = "HTML"
-		m.ReplyMarkup = kb
+		return
+	}
+	if b.isAuthorized(uid) {
+		on := b.isOnShift(uid)
+		m := tgbotapi.NewMessage(msg.Chat.ID, "Выберите действие:")
+		m.ReplyMarkup = workerKB(on)
 		_, _ = b.api.Send(m)
-	case "worker_tpl_body":
-		if !listingsdb.IsAuthorized(b.db, uid) {
-			return
-		}
-		body := msg.Text
-		b.dlgMu.Lock()
-		name := b.dlgTplName
-		eid := b.dlgTplEditID
-		subj := b.dlgTplSubject
-		b.dlgMu.Unlock()
-		if eid > 0 {
-			if _, _, _, ok := listingsdb.GetEmailTemplate(b.db, uid, eid); !ok {
-				b.clearDialog()
-				return
-			}
-			_, _ = listingsdb.UpdateEmailTemplate(b.db, uid, eid, name, subj, body)
-			prettylog.OKf("шаблон обновлён · user=%d · id=%d", uid, eid)
-			b.sendPlain(msg.Chat.ID, fmt.Sprintf("✅ Шаблон «%s» обновлён", name))
-		} else {
-			_, _ = listingsdb.AddEmailTemplate(b.db, uid, name, subj, body)
-			prettylog.OKf("шаблон создан · user=%d · %q", uid, name)
-			b.sendPlain(msg.Chat.ID, fmt.Sprintf("✅ Шаблон «%s» добавлен", name))
-		}
-		b.clearDialog()
-		txt, kb := renderWorkerTemplates(b.db, uid)
-		m := tgbotapi.NewMessage(msg.Chat.ID, txt)
+	} else {
+		m := tgbotapi.NewMessage(msg.Chat.ID, pendingRegText())
 		m.ParseMode = "HTML"
-		m.ReplyMarkup = kb
 		_, _ = b.api.Send(m)
-	default:
-		if listingsdb.IsAuthorized(b.db, uid) {
-			on := listingsdb.IsShiftActive(b.db, uid)
-			m := tgbotapi.NewMessage(msg.Chat.ID, "Выберите действие:")
-			m.ReplyMarkup = workerKB(on)
-			_, _ = b.api.Send(m)
-		} else {
-			m := tgbotapi.NewMessage(msg.Chat.ID, pendingRegText())
-			m.ParseMode = "HTML"
-			_, _ = b.api.Send(m)
-		}
 	}
 }
 
+// stepHandlers шаг диалога → обработчик текста.
+var stepHandlers = map[string]func(b *Bot, msg *tgbotapi.Message, uid int64, d dialog){
+	"worker_emails":       (*Bot).stepWorkerEmails,
+	"worker_tpl_name":     (*Bot).stepTplName,
+	"worker_tpl_subject":  (*Bot).stepTplSubject,
+	"worker_tpl_editsubj": (*Bot).stepTplEditSubject,
+	"worker_tpl_body":     (*Bot).stepTplBody,
+}
+
+// stepWorkerEmails почты текстом (mail:apppassword построчно).
+func (b *Bot) stepWorkerEmails(msg *tgbotapi.Message, uid int64, _ dialog) {
+	pairs := adminbot.ParseEmailsText(msg.Text)
+	if len(pairs) == 0 {
+		b.sendPlain(msg.Chat.ID, "❌ Не найдено валидных строк. Формат: mail@gmail.com:apppassword")
+		return
+	}
+	added, skipped := listingsdb.AddEmailsBatch(b.db, uid, pairs)
+	total, active, _, _ := listingsdb.MailCounts(b.db, uid)
+	prettylog.OKf("почты текстом · user=%d · +%d пропуск %d · всего %d активн %d", uid, added, skipped, total, active)
+	b.clearDialog(uid)
+	b.sendPlain(msg.Chat.ID, fmt.Sprintf("✅ Добавлено: %d, пропущено (дубли): %d\n📋 Всего: %d, активных: %d", added, skipped, total, active))
+	m := tgbotapi.NewMessage(msg.Chat.ID, "📧 База почт")
+	m.ReplyMarkup = workerEmailsKB(total)
+	_, _ = b.api.Send(m)
+}
+
+// stepTplName шаг 1/3 нового шаблона — название.
+func (b *Bot) stepTplName(msg *tgbotapi.Message, uid int64, _ dialog) {
+	name := strings.TrimSpace(msg.Text)
+	if name == "" {
+		b.sendPlain(msg.Chat.ID, "Введите название")
+		return
+	}
+	b.updateDialog(uid, func(d *dialog) {
+		d.tplName = name
+		d.step = "worker_tpl_subject"
+	})
+	b.sendHTML(msg.Chat.ID, "Шаг 2/3: <b>тема письма</b>.\n\nПусто или <code>-</code> — только название товара.\n\nПеременные: "+adminbot.TemplateVarsInlineHTML)
+}
+
+// stepTplSubject шаг 2/3 — тема.
+func (b *Bot) stepTplSubject(msg *tgbotapi.Message, uid int64, _ dialog) {
+	b.updateDialog(uid, func(d *dialog) {
+		d.tplSubject = strings.TrimSpace(msg.Text)
+		d.step = "worker_tpl_body"
+	})
+	b.sendHTML(msg.Chat.ID, "Шаг 3/3: <b>текст шаблона</b>.\n\nПеременные: "+adminbot.TemplateVarsInlineHTML)
+}
+
+// stepTplEditSubject новая тема существующего шаблона.
+func (b *Bot) stepTplEditSubject(msg *tgbotapi.Message, uid int64, d dialog) {
+	newSubj := strings.TrimSpace(msg.Text)
+	name := d.tplName
+	eid := d.tplEditID
+	if eid <= 0 {
+		b.clearDialog(uid)
+		return
+	}
+	_, _, body, ok := listingsdb.GetEmailTemplate(b.db, uid, eid)
+	if !ok {
+		b.clearDialog(uid)
+		return
+	}
+	_, _ = listingsdb.UpdateEmailTemplate(b.db, uid, eid, name, newSubj, body)
+	b.sendPlain(msg.Chat.ID, fmt.Sprintf("Тема «%s» обновлена", name))
+	b.clearDialog(uid)
+	txt, kb := renderWorkerTemplates(b.db, uid)
+	m := tgbotapi.NewMessage(msg.Chat.ID, txt)
+	m.ParseMode = "HTML"
+	m.ReplyMarkup = kb
+	_, _ = b.api.Send(m)
+}
+
+// stepTplBody шаг 3/3 (или правка текста) — тело шаблона.
+func (b *Bot) stepTplBody(msg *tgbotapi.Message, uid int64, d dialog) {
+	body := msg.Text
+	name := d.tplName
+	eid := d.tplEditID
+	subj := d.tplSubject
+	if eid > 0 {
+		if _, _, _, ok := listingsdb.GetEmailTemplate(b.db, uid, eid); !ok {
+			b.clearDialog(uid)
+			return
+		}
+		_, _ = listingsdb.UpdateEmailTemplate(b.db, uid, eid, name, subj, body)
+		prettylog.OKf("шаблон обновлён · user=%d · id=%d", uid, eid)
+		b.sendPlain(msg.Chat.ID, fmt.Sprintf("✅ Шаблон «%s» обновлён", name))
+	} else {
+		_, _ = listingsdb.AddEmailTemplate(b.db, uid, name, subj, body)
+		prettylog.OKf("шаблон создан · user=%d · %q", uid, name)
+		b.sendPlain(msg.Chat.ID, fmt.Sprintf("✅ Шаблон «%s» добавлен", name))
+	}
+	b.clearDialog(uid)
+	txt, kb := renderWorkerTemplates(b.db, uid)
+	m := tgbotapi.NewMessage(msg.Chat.ID, txt)
+	m.ParseMode = "HTML"
+	m.ReplyMarkup = kb
+	_, _ = b.api.Send(m)
+}
+
 // downloadByHTTP — тот же клиент, что у Telegram API (в т.ч. прокси), для URL из file.Link().
+// NewBot всегда задаёт httpClient; ленивого создания здесь нет — при параллельных колбэках
+// это была бы гонка и лишний клиент без прокси.
 func (b *Bot) downloadByHTTP(urlStr string) ([]byte, error) {
-	if b.httpClient == nil {
-		b.httpClient = &http.Client{Timeout: 120 * time.Second}
+	body, err := b.openDownload(urlStr)
+	if err != nil {
+		return nil, err
 	}
+	defer body.Close()
+	return io.ReadAll(body)
+}
+
+// openDownload как downloadByHTTP, но отдаёт тело ответа для потокового чтения; закрывает вызывающий.
+// На не-2xx читает только первые 400 байт тела для текста ошибки.
+func (b *Bot) openDownload(urlStr string) (io.ReadCloser, error) {
 	req, err := http.NewRequest(http.MethodGet, urlStr, nil)
 	if err != nil {
 		return nil, err
@@ -695,12 +661,12 @@ func (b *Bot) downloadByHTTP(urlStr string) ([]byte, error) {
 	if err != nil {
 		return nil, err
 	}
-	defer resp.Body.Close()
 	if resp.StatusCode < 200 || resp.StatusCode >= 300 {
+		defer resp.Body.Close()
 		snippet, _ := io.ReadAll(io.LimitReader(resp.Body, 400))
 		return nil, fmt.Errorf("HTTP %d: %s", resp.StatusCode, strings.TrimSpace(string(snippet)))
 	}
-	return io.ReadAll(resp.Body)
+	return resp.Body, nil
 }
 
 func (b *Bot) handleWorkerEmailsCSV(msg *tgbotapi.Message) {
@@ -712,25 +678,30 @@ func (b *Bot) handleWorkerEmailsCSV(msg *tgbotapi.Message) {
 		return
 	}
 	urlStr := file.Link(b.api.Token)
-	data, err := b.downloadByHTTP(urlStr)
+	body, err := b.openDownload(urlStr)
 	if err != nil {
 		prettylog.Warnf("CSV почты · скачивание · %v", err)
 		b.sendPlain(msg.Chat.ID, "❌ Скачивание (нужен тот же прокси, что для Telegram): "+err.Error())
 		return
 	}
-	pairs := adminbot.ParseEmailsCSV(string(data))
-	if len(pairs) == 0 {
+	// Разбор прямо из тела ответа и вставка пачками: ни файл, ни список пар целиком в памяти не держатся.
+	seen, added, skipped, err := adminbot.ImportEmailsCSV(b.db, uid, body)
+	_ = body.Close()
+	if err != nil && !errors.Is(err, adminbot.ErrCSVNoEmailColumn) {
+		prettylog.Warnf("CSV почты · user=%d · импорт остановлен · +%d · %v", uid, added, err)
+		b.sendPlain(msg.Chat.ID, fmt.Sprintf("❌ CSV: импорт остановлен, %v\nДо этой строки добавлено %d, пропущено %d", err, added, skipped))
+		return
+	}
+	if seen == 0 {
 		b.sendPlain(msg.Chat.ID, "❌ В CSV не найдено email")
 		return
 	}
-	added, skipped := listingsdb.AddEmailsBatch(b.db, uid, pairs)
-	total, _ := listingsdb.EmailsTotalCount(b.db, uid)
-	active, _ := listingsdb.ActiveEmailsCount(b.db, uid)
+	total, active, _, _ := listingsdb.MailCounts(b.db, uid)
 	prettylog.OKf("CSV почты · user=%d · +%d · всего %d активн %d", uid, added, total, active)
-	b.clearDialog()
+	b.clearDialog(uid)
 	b.sendPlain(msg.Chat.ID, fmt.Sprintf("✅ Из CSV: добавлено %d, пропущено %d\n📋 Всего: %d, активных: %d", added, skipped, total, active))
 	m := tgbotapi.NewMessage(msg.Chat.ID, "📧 База почт")
-	m.ReplyMarkup = workerEmailsKB(b.db, uid)
+	m.ReplyMarkup = workerEmailsKB(total)
 	_, _ = b.api.Send(m)
 }
 
@@ -738,9 +709,9 @@ func (b *Bot) handleBulkMailCSV(msg *tgbotapi.Message, delay time.Duration) {
 	uid := msg.From.ID
 	chatID := msg.Chat.ID
 
-	activeBefore, _ := listingsdb.ActiveEmailsCount(b.db, uid)
-	if nTpl, _ := listingsdb.EmailTemplatesCount(b.db, uid); nTpl == 0 || activeBefore == 0 {
-		b.clearDialog()
+	_, activeBefore, nTpl, _ := listingsdb.MailCounts(b.db, uid)
+	if nTpl == 0 || activeBefore == 0 {
+		b.clearDialog(uid)
 		if activeBefore == 0 {
 			b.sendHTML(chatID, "❌ <b>Нет активных почт</b>")
 		} else {
@@ -751,14 +722,14 @@ func (b *Bot) handleBulkMailCSV(msg *tgbotapi.Message, delay time.Duration) {
 
 	file, err := b.api.GetFile(tgbotapi.FileConfig{FileID: msg.Document.FileID})
 	if err != nil {
-		b.clearDialog()
+		b.clearDialog(uid)
 		b.sendPlain(chatID, "❌ Файл: "+err.Error())
 		return
 	}
 	urlStr := file.Link(b.api.Token)
 	raw, err := b.downloadByHTTP(urlStr)
 	if err != nil {
-		b.clearDialog()
+		b.clearDialog(uid)
 		prettylog.Warnf("рассылка CSV · скачивание · %v", err)
 		b.sendPlain(chatID, "❌ Скачивание файла (используется тот же прокси, что для Telegram): "+err.Error())
 		return
@@ -766,37 +737,49 @@ func (b *Bot) handleBulkMailCSV(msg *tgbotapi.Message, delay time.Duration) {
 
 	listings := ParseListingsCSV(string(raw))
 	if len(listings) == 0 {
-		b.clearDialog()
-		b.sendHTML(chatID, "❌ Не удалось распарсить CSV. Нужны колонки: продавец + ссылка на объявление (marktplaats, 2dehands, poshmark).")
+		b.clearDialog(uid)
+		b.sendPlain(chatID, "❌ Не удалось распарсить CSV. Нужны колонки: продавец + ссылка на объявление (marktplaats, 2dehands, poshmark).")
 		return
 	}
 
 	prettylog.OKf("рассылка CSV · принято · user=%d · объявлений=%d · файл=%q", uid, len(listings), msg.Document.FileName)
-	confirmHTML := fmt.Sprintf("✅ <b>Файл принят</b>: %d объявлений.\n\n⏳ Отправляю письма…", len(listings))
+	confirmHTML := fmt.Sprintf("✅ <b>Файл принят</b>: %d %s.\n\n⏳ Отправляю письма…",
+		len(listings), pluralRu(len(listings), "объявление", "объявления", "объявлений"))
 	confirmMsg := tgbotapi.NewMessage(chatID, confirmHTML)
 	confirmMsg.ParseMode = "HTML"
 	status, err := b.api.Send(confirmMsg)
 	if err != nil {
 		prettylog.Warnf("рассылка · подтверждение в чат · %v", err)
-		b.sendPlain(chatID, fmt.Sprintf("✅ Файл принят, %d объявлений. Запускаю рассылку… (ошибка HTML-сообщения: %v)", len(listings), err))
-		status, err = b.api.Send(tgbotapi.NewMessage(chatID, fmt.Sprintf("⏳ Рассылка %d писем…", len(listings))))
+		b.sendPlain(chatID, fmt.Sprintf("✅ Файл принят, %d %s. Запускаю рассылку… (ошибка HTML-сообщения: %v)",
+			len(listings), pluralRu(len(listings), "объявление", "объявления", "объявлений"), err))
+		status, err = b.api.Send(tgbotapi.NewMessage(chatID, fmt.Sprintf("⏳ Рассылка %d %s…", len(listings), pluralRu(len(listings), "письма", "писем", "писем"))))
 		if err != nil {
 			prettylog.Warnf("рассылка · второе сообщение · %v", err)
-			b.clearDialog()
+			b.clearDialog(uid)
 			b.sendPlain(chatID, "⚠️ Не удалось отправить сообщение в Telegram. Рассылка всё равно запущена в фоне. Проверьте прокси.")
 			status = tgbotapi.Message{MessageID: 0}
 		}
 	}
 	statusID := status.MessageID
-	b.clearDialog()
+	b.clearDialog(uid)
 
 	go func() {
 		skipRCPT := mailer.DevEnvironment()
-		st := mailer.BulkSendListings(b.db, uid, listings, delay, skipRCPT)
+		// Статус правится по событиям отправки (без опроса) и не чаще bulkProgressEvery:
+		// длинная рассылка видна по ходу, а лимит Telegram на правки не расходуется впустую.
+		due := progressThrottle(len(listings), bulkProgressEvery, time.Now)
+		onProgress := func(st mailer.BulkSendStats, done int) {
+			if statusID == 0 || !due(done) {
+				return
+			}
+			txt := fmt.Sprintf(bulkProgressFmt, done, len(listings), st.OK, st.Fail, st.NotExists)
+			if _, err := b.api.Request(tgbotapi.NewEditMessageText(chatID, statusID, txt)); err != nil {
+				prettylog.Warnf("прогресс рассылки · %v", err)
+			}
+		}
+		st := mailer.BulkSendListingsProgress(b.db, uid, listings, delay, skipRCPT, onProgress)
 		var sb strings.Builder
-		sb.WriteString("✅ <b>Рассылка завершена</b>\n\n")
-		sb.WriteString(fmt.Sprintf("📧 Отправлено: %d\n❌ Ошибок: %d\n👻 Нет почты продавца: %d\n📋 Строк: %d",
-			st.OK, st.Fail, st.NotExists, len(listings)))
+		fmt.Fprintf(&sb, bulkDoneFmt, st.OK, st.Fail, st.NotExists, len(listings))
 		if st.Fail+st.NotExists == len(listings) && st.OK == 0 {
 			activeAfter, _ := listingsdb.ActiveEmailsCount(b.db, uid)
 			if activeAfter == 0 && activeBefore > 0 {
@@ -813,7 +796,7 @@ func (b *Bot) handleBulkMailCSV(msg *tgbotapi.Message, delay time.Duration) {
 		} else {
 			b.sendHTML(chatID, sb.String())
 		}
-		on := listingsdb.IsShiftActive(b.db, uid)
+		on := b.isOnShift(uid)
 		m2 := tgbotapi.NewMessage(chatID, "Главное меню")
 		m2.ReplyMarkup = workerKB(on)
 		if _, err := b.api.Send(m2); err != nil {
@@ -823,18 +806,52 @@ func (b *Bot) handleBulkMailCSV(msg *tgbotapi.Message, delay time.Duration) {
 	}()
 }
 
+// bulkProgressEvery — минимальный интервал между правками статуса рассылки.
+const bulkProgressEvery = 5 * time.Second
+
+// progressThrottle решает, править ли статус после done-го объявления из total: первое — сразу, дальше
+// не чаще every. Последнее не правится — сразу следует итоговое сообщение.
+func progressThrottle(total int, every time.Duration, now func() time.Time) func(done int) bool {
+	var last time.Time
+	return func(done int) bool {
+		t := now()
+		if done >= total || (!last.IsZero() && t.Sub(last) < every) {
+			return false
+		}
+		last = t
+		return true
+	}
+}
+
+// Тексты статуса рассылки: постоянная часть собрана в константы, на каждом шаге подставляются только числа.
+const (
+	bulkStatsFmt    = "📧 Отправлено: %d\n❌ Ошибок: %d\n👻 Нет почты продавца: %d"
+	bulkProgressFmt = "⏳ Рассылка: %d / %d\n\n" + bulkStatsFmt
+	bulkDoneFmt     = "✅ <b>Рассылка завершена</b>\n\n" + bulkStatsFmt + "\n📋 Строк: %d"
+)
+
 func (b *Bot) editMsgHTML(chatID int64, msgID int, text string, kb tgbotapi.InlineKeyboardMarkup) {
+	k := editKey{chatID, msgID}
+	if b.lastEdits.unchanged(k, sentEdit{text: text, html: true, kb: kb}) {
+		return
+	}
 	prettylog.Workerf("→ editMessage HTML · chat=%d msg=%d · %s", chatID, msgID, previewOneLine(text, 90))
 	edit := tgbotapi.NewEditMessageTextAndMarkup(chatID, msgID, text, kb)
 	edit.ParseMode = "HTML"
 	if _, err := b.api.Send(edit); err != nil {
+		b.lastEdits.forget(k)
 		prettylog.Warnf("editMessage · %v", err)
 	}
 }
 
 func (b *Bot) editMsgPlain(chatID int64, msgID int, text string, kb tgbotapi.InlineKeyboardMarkup) {
+	k := editKey{chatID, msgID}
+	if b.lastEdits.unchanged(k, sentEdit{text: text, kb: kb}) {
+		return
+	}
 	edit := tgbotapi.NewEditMessageTextAndMarkup(chatID, msgID, text, kb)
 	if _, err := b.api.Send(edit); err != nil {
+		b.lastEdits.forget(k)
 		prettylog.Warnf("editMessage · %v", err)
 	}
 }
@@ -850,3 +867,14 @@ func (b *Bot) sendPlain(chatID int64, text string) {
 	m := tgbotapi.NewMessage(chatID, text)
 	_, _ = b.api.Send(m)
 }
+
+// parsePageIdx разбирает хвост «<page>_<idx>» кнопок почт воркера без промежуточного []string.
+func parsePageIdx(rest string) (page, idx int, ok bool) {
+	p, i, ok := strings.Cut(rest, "_")
+	if !ok {
+		return 0, 0, false
+	}
+	page, _ = strconv.Atoi(p)
+	idx, _ = strconv.Atoi(i)
+	return page, idx, true
+}
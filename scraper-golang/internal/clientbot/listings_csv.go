@@ -2,9 +2,11 @@ package clientbot
 
 import (
 	"encoding/csv"
+	"io"
 	"regexp"
 	"strconv"
 	"strings"
+	"sync"
 
 	"github.com/marktplaats-scraper/scraper-golang/internal/marktplaats"
 )
@@ -27,18 +29,22 @@ var listingURLBlacklist = []string{"продавца", "магазин", "фот
 
 var listingURLDomains = []string{"marktplaats", "2dehands", "poshmark"}
 
-var reItemID = regexp.MustCompile(`/m(\d+)(?:-|$|/)`)
-var rePoshmarkListingID = regexp.MustCompile(`(?i)-([0-9a-f]{24})(?:\?.*)?$`)
+// Регэкспы ссылок компилируются при первом разборе CSV, а не при старте бота: большинство
+// запусков (авторизация, меню, почты) до них не доходит.
+var (
+	reItemID            = sync.OnceValue(func() *regexp.Regexp { return regexp.MustCompile(`/m(\d+)(?:-|$|/)`) })
+	rePoshmarkListingID = sync.OnceValue(func() *regexp.Regexp { return regexp.MustCompile(`(?i)-([0-9a-f]{24})(?:\?.*)?$`) })
+)
 
 func itemIDFromURL(url string) string {
 	if url == "" {
 		return ""
 	}
-	if m := reItemID.FindStringSubmatch(url); len(m) >= 2 {
+	if m := reItemID().FindStringSubmatch(url); len(m) >= 2 {
 		return "m" + m[1]
 	}
 	if strings.Contains(strings.ToLower(url), "poshmark.com") {
-		if m := rePoshmarkListingID.FindStringSubmatch(strings.TrimSpace(url)); len(m) >= 2 {
+		if m := rePoshmarkListingID().FindStringSubmatch(strings.TrimSpace(url)); len(m) >= 2 {
 			return "p" + strings.ToLower(m[1])
 		}
 	}
@@ -144,82 +150,97 @@ func ParseListingsCSV(content string) []marktplaats.Listing {
 		return nil
 	}
 	for _, delim := range []rune{',', ';'} {
-		r := csv.NewReader(strings.NewReader(content))
-		r.Comma = delim
-		r.TrimLeadingSpace = true
-		rows, err := r.ReadAll()
-		if err != nil || len(rows) < 2 {
-			continue
+		if out := parseListingsCSVDelim(content, delim); len(out) > 0 {
+			return out
+		}
+	}
+	return nil
+}
+
+// parseListingsCSVDelim читает CSV построчно (без ReadAll в [][]string): шапка проверяется первой,
+// так что файл с другим разделителем отбрасывается сразу, а строки переводятся в Listing по мере чтения.
+// Ошибка разбора любой строки, как и раньше с ReadAll, отбрасывает весь вариант разделителя.
+func parseListingsCSVDelim(content string, delim rune) []marktplaats.Listing {
+	r := csv.NewReader(strings.NewReader(content))
+	r.Comma = delim
+	r.TrimLeadingSpace = true
+	r.ReuseRecord = true
+	first, err := r.Read()
+	if err != nil {
+		return nil
+	}
+	header := make([]string, len(first))
+	for i, h := range first {
+		header[i] = strings.ToLower(strings.TrimSpace(strings.TrimPrefix(h, "\ufeff")))
+	}
+	colIdx := matchListingColumns(header)
+	if _, ok := colIdx["seller_name"]; !ok {
+		return nil
+	}
+	if _, ok := colIdx["listing_url"]; !ok {
+		return nil
+	}
+	maxIdx := 0
+	for _, idx := range colIdx {
+		if idx > maxIdx {
+			maxIdx = idx
+		}
+	}
+	var out []marktplaats.Listing
+	for {
+		row, err := r.Read()
+		if err == io.EOF {
+			break
 		}
-		header := make([]string, len(rows[0]))
-		for i, h := range rows[0] {
-			header[i] = strings.ToLower(strings.TrimSpace(strings.TrimPrefix(h, "\ufeff")))
+		if err != nil {
+			return nil
 		}
-		colIdx := matchListingColumns(header)
-		if _, ok := colIdx["seller_name"]; !ok {
+		if len(row) <= maxIdx {
 			continue
 		}
-		if _, ok := colIdx["listing_url"]; !ok {
+		seller := strings.TrimSpace(row[colIdx["seller_name"]])
+		url := strings.TrimSpace(row[colIdx["listing_url"]])
+		if seller == "" || url == "" {
 			continue
 		}
-		maxIdx := 0
-		for _, idx := range colIdx {
-			if idx > maxIdx {
-				maxIdx = idx
+		low := strings.ToLower(url)
+		okDomain := false
+		for _, d := range listingURLDomains {
+			if strings.Contains(low, d) {
+				okDomain = true
+				break
 			}
 		}
-		var out []marktplaats.Listing
-		for _, row := range rows[1:] {
-			if len(row) <= maxIdx {
-				continue
-			}
-			seller := strings.TrimSpace(row[colIdx["seller_name"]])
-			url := strings.TrimSpace(row[colIdx["listing_url"]])
-			if seller == "" || url == "" {
-				continue
-			}
-			low := strings.ToLower(url)
-			okDomain := false
-			for _, d := range listingURLDomains {
-				if strings.Contains(low, d) {
-					okDomain = true
-					break
-				}
-			}
-			if !okDomain {
-				continue
-			}
-			title := "Товар"
-			if i, ok := colIdx["title"]; ok {
-				if t := strings.TrimSpace(row[i]); t != "" {
-					title = t
-				}
-			}
-			priceStr := ""
-			if i, ok := colIdx["price"]; ok {
-				priceStr = strings.TrimSpace(row[i])
-			}
-			city := ""
-			if i, ok := colIdx["city_name"]; ok {
-				city = strings.TrimSpace(row[i])
-			}
-			desc := ""
-			if i, ok := colIdx["description"]; ok {
-				desc = strings.TrimSpace(row[i])
+		if !okDomain {
+			continue
+		}
+		title := "Товар"
+		if i, ok := colIdx["title"]; ok {
+			if t := strings.TrimSpace(row[i]); t != "" {
+				title = t
 			}
-			out = append(out, marktplaats.Listing{
-				ItemID:      itemIDFromURL(url),
-				Title:       title,
-				SellerName:  seller,
-				ListingURL:  url,
-				PriceCents:  parsePriceToCents(priceStr),
-				CityName:    city,
-				Description: desc,
-			})
-		}
-		if len(out) > 0 {
-			return out
 		}
+		priceStr := ""
+		if i, ok := colIdx["price"]; ok {
+			priceStr = strings.TrimSpace(row[i])
+		}
+		city := ""
+		if i, ok := colIdx["city_name"]; ok {
+			city = strings.TrimSpace(row[i])
+		}
+		desc := ""
+		if i, ok := colIdx["description"]; ok {
+			desc = strings.TrimSpace(row[i])
+		}
+		out = append(out, marktplaats.Listing{
+			ItemID:      itemIDFromURL(url),
+			Title:       title,
+			SellerName:  seller,
+			ListingURL:  url,
+			PriceCents:  parsePriceToCents(priceStr),
+			CityName:    city,
+			Description: desc,
+		})
 	}
-	return nil
+	return out
 }
@@ -2,7 +2,6 @@ package clientbot
 
 import (
 	"strings"
-	"unicode/utf8"
 )
 
 func previewRunes(s string, max int) string {
@@ -13,15 +12,33 @@ func previewRunes(s string, max int) string {
 	if max <= 0 {
 		max = 80
 	}
-	if utf8.RuneCountInString(s) <= max {
+	if _, cut := headRunes(s, max); !cut {
 		return s
 	}
-	r := []rune(s)
-	return string(r[:max-1]) + "…"
+	head, _ := headRunes(s, max-1)
+	return head + "…"
 }
 
 func previewOneLine(s string, max int) string {
+	// Переводы строк заменяются только в начале текста, которое попадёт в превью: тело письма
+	// или экран на 4000 символов не копируется целиком ради первых max рун.
+	lead := len(s) - len(strings.TrimLeft(s, " \t\r\n"))
+	if head, cut := headRunes(s[lead:], 2*max); cut {
+		s = s[:lead+len(head)] + "…"
+	}
 	s = strings.ReplaceAll(s, "\r", " ")
 	s = strings.ReplaceAll(s, "\n", " ↵ ")
 	return previewRunes(s, max)
 }
+
+// headRunes первые n рун s без копии строки в []rune; cut — была ли строка длиннее.
+func headRunes(s string, n int) (head string, cut bool) {
+	i := 0
+	for pos := range s {
+		if i == n {
+			return s[:pos], true
+		}
+		i++
+	}
+	return s, false
+}
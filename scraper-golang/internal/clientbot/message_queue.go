@@ -0,0 +1,70 @@
+package clientbot
+
+import (
+	"sync"
+
+	tgbotapi "github.com/go-telegram-bot-api/telegram-bot-api/v5"
+)
+
+// messageQueues — очередь сообщений на каждого отправителя: у каждого воркера своя горутина, порядок
+// его сообщений сохраняется (от них зависят шаги диалога), а долгая загрузка CSV одного воркера не
+// задерживает ввод остальных. push не ждёт и ничего не отбрасывает; горутина воркера завершается и
+// удаляет очередь, как только та опустела.
+type messageQueues struct {
+	handle func(tgbotapi.Update)
+
+	mu sync.Mutex
+	m  map[int64][]tgbotapi.Update
+	wg sync.WaitGroup
+}
+
+// push ставит сообщение в очередь отправителя (без отправителя — чата).
+func (q *messageQueues) push(up tgbotapi.Update) {
+	key := messageKey(up)
+	q.mu.Lock()
+	defer q.mu.Unlock()
+	if q.m == nil {
+		q.m = make(map[int64][]tgbotapi.Update)
+	}
+	pending, running := q.m[key]
+	q.m[key] = append(pending, up)
+	if !running {
+		q.wg.Add(1)
+		go q.drain(key)
+	}
+}
+
+// drain обрабатывает очередь key по порядку; пустую очередь удаляет под тем же мьютексом, что и push.
+func (q *messageQueues) drain(key int64) {
+	defer q.wg.Done()
+	for {
+		q.mu.Lock()
+		pending := q.m[key]
+		if len(pending) == 0 {
+			delete(q.m, key)
+			q.mu.Unlock()
+			return
+		}
+		up := pending[0]
+		pending[0] = tgbotapi.Update{}
+		q.m[key] = pending[1:]
+		q.mu.Unlock()
+		q.handle(up)
+	}
+}
+
+// wait ждёт, пока обработаются все поставленные сообщения.
+func (q *messageQueues) wait() { q.wg.Wait() }
+
+// messageKey отправитель сообщения (без отправителя — чат).
+func messageKey(up tgbotapi.Update) int64 {
+	if m := up.Message; m != nil {
+		if m.From != nil {
+			return m.From.ID
+		}
+		if m.Chat != nil {
+			return m.Chat.ID
+		}
+	}
+	return 0
+}
@@ -5,6 +5,7 @@ import (
 	"fmt"
 	"html"
 	"strings"
+	"sync"
 	"unicode/utf8"
 
 	tgbotapi "github.com/go-telegram-bot-api/telegram-bot-api/v5"
@@ -15,6 +16,12 @@ import (
 
 const emailsPerPage = 15
 
+// listTodayMax сколько товаров показывает «Товары сегодня» (остальные только в счётчике заголовка).
+const listTodayMax = 25
+
+// listTodayTextMax запас под лимит Telegram 4096 символов.
+const listTodayTextMax = 3900
+
 func pendingRegText() string {
 	return "📩 <b>Заявка на регистрацию отправлена администратору</b>\n\n" +
 		"────────────────────────────────\n" +
@@ -24,28 +31,63 @@ func pendingRegText() string {
 		"Если заявка отклонена — бот больше не будет отвечать."
 }
 
+// Статические клавиатуры собираются один раз: markup только читается (сериализация в JSON),
+// поэтому одно значение безопасно отдавать во все обработчики.
+var (
+	rowBackWorkerMain = tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ Назад", "worker_main"))
+	rowToEmailsMenu   = tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ К меню почт", "worker_emails"))
+	rowTplAdd         = tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("➕ Добавить", "worker_tpl_add"))
+	rowToTplList      = tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ К списку", "worker_templates"))
+
+	// kbNone убирает клавиатуру у сообщения (заявка обработана, доступа нет).
+	kbNone = tgbotapi.InlineKeyboardMarkup{InlineKeyboard: [][]tgbotapi.InlineKeyboardButton{}}
+
+	kbWorkerOnShift  = buildWorkerKB(true)
+	kbWorkerOffShift = buildWorkerKB(false)
+
+	kbToEmailsMenu      = tgbotapi.NewInlineKeyboardMarkup(rowToEmailsMenu)
+	kbCancelToEmails    = tgbotapi.NewInlineKeyboardMarkup(tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("❌ Отмена", "worker_emails")))
+	kbCancelToTemplates = tgbotapi.NewInlineKeyboardMarkup(tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("❌ Отмена", "worker_templates")))
+	kbAbortToTemplates  = tgbotapi.NewInlineKeyboardMarkup(tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("Отмена", "worker_templates")))
+	kbCancelToMain      = tgbotapi.NewInlineKeyboardMarkup(tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("❌ Отмена", "worker_main")))
+	kbTemplatesEmpty    = tgbotapi.NewInlineKeyboardMarkup(rowTplAdd, rowBackWorkerMain)
+	kbBulkDelay         = buildWorkerBulkDelayKB()
+)
+
 func workerKB(onShift bool) tgbotapi.InlineKeyboardMarkup {
-	base := [][]tgbotapi.InlineKeyboardButton{
+	if onShift {
+		return kbWorkerOnShift
+	}
+	return kbWorkerOffShift
+}
+
+func buildWorkerKB(onShift bool) tgbotapi.InlineKeyboardMarkup {
+	top := tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("▶️ Начать смену", "shift_start"))
+	if onShift {
+		top = tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("🛑 Закрыть смену", "shift_stop"))
+	}
+	return tgbotapi.NewInlineKeyboardMarkup(
+		top,
 		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("📦 Товары сегодня", "list_today")),
 		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("📧 Почты", "worker_emails")),
 		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("📝 Шаблоны", "worker_templates")),
 		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("📤 Рассылка", "worker_bulk_mail")),
-	}
-	if onShift {
-		top := tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("🛑 Закрыть смену", "shift_stop"))
-		return tgbotapi.NewInlineKeyboardMarkup(append([][]tgbotapi.InlineKeyboardButton{top}, base...)...)
-	}
-	top := tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("▶️ Начать смену", "shift_start"))
-	return tgbotapi.NewInlineKeyboardMarkup(append([][]tgbotapi.InlineKeyboardButton{top}, base...)...)
+	)
 }
 
-func workerEmailsKB(db *sql.DB, userID int64) tgbotapi.InlineKeyboardMarkup {
-	n, _ := listingsdb.EmailsTotalCount(db, userID)
+var (
+	rowEmailsAdd    = tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("➕ Добавить (mail:apppassword)", "worker_emails_add"))
+	rowEmailsUpload = tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("📤 Загрузить CSV", "worker_emails_upload"))
+)
+
+// workerEmailsKB меню почт; n — число почт воркера: вызывающий его уже знает (меню показывает «Всего»,
+// добавление считает итог), поэтому отдельный COUNT ради кнопки не делается.
+func workerEmailsKB(n int) tgbotapi.InlineKeyboardMarkup {
 	return tgbotapi.NewInlineKeyboardMarkup(
-		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("➕ Добавить (mail:apppassword)", "worker_emails_add")),
-		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("📤 Загрузить CSV", "worker_emails_upload")),
+		rowEmailsAdd,
+		rowEmailsUpload,
 		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData(fmt.Sprintf("📋 Список (%d)", n), "worker_emails_list_0")),
-		tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ Назад", "worker_main")),
+		rowBackWorkerMain,
 	)
 }
 
@@ -59,11 +101,25 @@ func workerEmailsUploadHTML() string {
 	return "📤 <b>Загрузить CSV</b>\n\nКолонки: email, apppassword (или почта / пароль)\n\nПришлите файл .csv"
 }
 
+var (
+	workerTplAddOnce sync.Once
+	workerTplAddText string
+)
+
+// workerTplAddHTML справка первого шага «Добавить шаблон» — зависит только от констант adminbot,
+// собирается (подстановка примеров, экранирование) один раз, как tplAddStep1HTML в админ-боте.
 func workerTplAddHTML() string {
+	workerTplAddOnce.Do(func() {
+		workerTplAddText = buildWorkerTplAddHTML()
+	})
+	return workerTplAddText
+}
+
+func buildWorkerTplAddHTML() string {
 	var help strings.Builder
 	help.WriteString("<b>Доступные переменные:</b>\n")
-	for k, desc := range adminbot.TemplateVarDescriptions {
-		help.WriteString(fmt.Sprintf("• <code>{%s}</code> — %s\n", k, html.EscapeString(desc)))
+	for _, k := range adminbot.TemplateVarKeys {
+		fmt.Fprintf(&help, "• <code>{%s}</code> — %s\n", k, html.EscapeString(adminbot.TemplateVarDescriptions[k]))
 	}
 	ex := adminbot.TemplateExampleBody()
 	filled := adminbot.FormatTemplateExampleBody(ex)
@@ -76,32 +132,55 @@ func workerTplAddHTML() string {
 		"<b>Текст с подстановкой:</b>\n<pre>" + html.EscapeString(filled) + "</pre>"
 }
 
+// listTodayHTML сообщение «Товары сегодня»: строки добавляются, пока текст влезает в listTodayTextMax,
+// — без обрезки готового текста посреди HTML-сущности или UTF-8 символа.
+func listTodayHTML(items []listingsdb.WorkerListingToday, total int) string {
+	var sb strings.Builder
+	sb.Grow(listTodayTextMax)
+	fmt.Fprintf(&sb, "📦 <b>Товары сегодня (%d)</b>", total)
+	for i, it := range items {
+		price := "—"
+		if it.PriceCents.Valid {
+			price = fmt.Sprintf("€%.2f", float64(it.PriceCents.Int64)/100)
+		}
+		title := it.Title
+		if title == "" {
+			title = "?"
+		}
+		if utf8.RuneCountInString(title) > 50 {
+			title = string([]rune(title)[:50])
+		}
+		row := fmt.Sprintf("\n%d. %s — %s", i+1, html.EscapeString(title), price)
+		if it.ListingURL != "" {
+			row += "\n   " + html.EscapeString(it.ListingURL)
+		}
+		if sb.Len()+len(row) > listTodayTextMax-len("\n…") {
+			sb.WriteString("\n…")
+			break
+		}
+		sb.WriteString(row)
+	}
+	return sb.String()
+}
+
 func renderWorkerTemplates(db *sql.DB, userID int64) (string, tgbotapi.InlineKeyboardMarkup) {
 	tpls, err := listingsdb.ListEmailTemplates(db, userID)
 	if err != nil || len(tpls) == 0 {
-		kb := tgbotapi.NewInlineKeyboardMarkup(
-			tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("➕ Добавить", "worker_tpl_add")),
-			tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ Назад", "worker_main")),
-		)
-		return "📝 <b>Шаблоны сообщений</b>\n\nНет шаблонов.", kb
+		return "📝 <b>Шаблоны сообщений</b>\n\nНет шаблонов.", kbTemplatesEmpty
 	}
 	var lines []string
 	lines = append(lines, "📝 <b>Шаблоны</b>")
 	lines = append(lines, "<i>При рассылке по кругу: 1‑е письмо — 1‑й шаблон, 2‑е — 2‑й…</i>")
 	var rows [][]tgbotapi.InlineKeyboardButton
 	for _, t := range tpls {
-		prev := t.Body
-		if utf8.RuneCountInString(prev) > 50 {
-			prev = string([]rune(prev)[:50]) + "…"
-		}
-		lines = append(lines, fmt.Sprintf("• <b>%s</b>\n  <i>%s</i>", html.EscapeString(t.Name), html.EscapeString(prev)))
+		// Экранированная строка берётся из кеша adminbot — escape заново только после правки шаблона.
+		lines = append(lines, adminbot.TemplateListLine(t.ID, t.Name, t.Body))
 		rows = append(rows, tgbotapi.NewInlineKeyboardRow(
 			tgbotapi.NewInlineKeyboardButtonData("✏️ Правка", fmt.Sprintf("worker_tpl_edit_%d", t.ID)),
 			tgbotapi.NewInlineKeyboardButtonData("🗑", fmt.Sprintf("worker_tpl_del_%d", t.ID)),
 		))
 	}
-	rows = append(rows, tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("➕ Добавить", "worker_tpl_add")))
-	rows = append(rows, tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ Назад", "worker_main")))
+	rows = append(rows, rowTplAdd, rowBackWorkerMain)
 	text := strings.Join(lines, "\n")
 	if len(text) > 4000 {
 		text = text[:3997] + "..."
@@ -111,17 +190,12 @@ func renderWorkerTemplates(db *sql.DB, userID int64) (string, tgbotapi.InlineKey
 
 func buildWorkerEmailsListPage(db *sql.DB, userID int64, page int) (string, tgbotapi.InlineKeyboardMarkup) {
 	offset := page * emailsPerPage
-	rows, err := listingsdb.ListEmails(db, userID, emailsPerPage, offset)
+	rows, total, activeN, err := listingsdb.EmailsPageActive(db, userID, emailsPerPage, offset)
 	if err != nil {
 		rows = nil
 	}
-	total, _ := listingsdb.EmailsTotalCount(db, userID)
-	activeN, _ := listingsdb.ActiveEmailsCount(db, userID)
 	if len(rows) == 0 {
-		kb := tgbotapi.NewInlineKeyboardMarkup(
-			tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ К меню почт", "worker_emails")),
-		)
-		return "📋 <b>Список почт</b>\n\nПусто.", kb
+		return "📋 <b>Список почт</b>\n\nПусто.", kbToEmailsMenu
 	}
 	blockedCount := total - activeN
 	var lines []string
@@ -153,7 +227,7 @@ func buildWorkerEmailsListPage(db *sql.DB, userID int64, page int) (string, tgbo
 	if len(nav) > 0 {
 		kbRows = append(kbRows, nav)
 	}
-	kbRows = append(kbRows, tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("◀️ К меню почт", "worker_emails")))
+	kbRows = append(kbRows, rowToEmailsMenu)
 	text := strings.Join(lines, "\n")
 	if len(text) > 4000 {
 		text = text[:3997] + "..."
@@ -161,10 +235,12 @@ func buildWorkerEmailsListPage(db *sql.DB, userID int64, page int) (string, tgbo
 	return text, tgbotapi.InlineKeyboardMarkup{InlineKeyboard: kbRows}
 }
 
-var bulkDelayOptions = []struct {
+type bulkDelayOption struct {
 	Sec   int
 	Label string
-}{
+}
+
+var bulkDelayOptions = []bulkDelayOption{
 	{0, "Без задержки"},
 	{1, "1 с"},
 	{5, "5 с"},
@@ -179,16 +255,54 @@ var bulkDelayOptions = []struct {
 	{1800, "30 мин"},
 }
 
-func workerBulkDelayKB() tgbotapi.InlineKeyboardMarkup {
+// bulkDelayByCallback callback_data кнопки задержки → вариант; набор кнопок фиксирован,
+// поэтому разбор клика — один поиск по map вместо Atoi и перебора bulkDelayOptions.
+var bulkDelayByCallback = func() map[string]bulkDelayOption {
+	m := make(map[string]bulkDelayOption, len(bulkDelayOptions))
+	for _, o := range bulkDelayOptions {
+		m[bulkDelayCallback(o.Sec)] = o
+	}
+	return m
+}()
+
+func bulkDelayCallback(sec int) string { return fmt.Sprintf("worker_bulk_delay_%d", sec) }
+
+func workerBulkDelayKB() tgbotapi.InlineKeyboardMarkup { return kbBulkDelay }
+
+func buildWorkerBulkDelayKB() tgbotapi.InlineKeyboardMarkup {
 	var rows [][]tgbotapi.InlineKeyboardButton
 	for i := 0; i < len(bulkDelayOptions); i += 2 {
 		var row []tgbotapi.InlineKeyboardButton
 		for j := i; j < i+2 && j < len(bulkDelayOptions); j++ {
 			o := bulkDelayOptions[j]
-			row = append(row, tgbotapi.NewInlineKeyboardButtonData(o.Label, fmt.Sprintf("worker_bulk_delay_%d", o.Sec)))
+			row = append(row, tgbotapi.NewInlineKeyboardButtonData(o.Label, bulkDelayCallback(o.Sec)))
 		}
 		rows = append(rows, row)
 	}
 	rows = append(rows, tgbotapi.NewInlineKeyboardRow(tgbotapi.NewInlineKeyboardButtonData("❌ Отмена", "worker_main")))
 	return tgbotapi.InlineKeyboardMarkup{InlineKeyboard: rows}
 }
+
+// pluralIdx форма слова по n%100: 0 — «объявление», 1 — «объявления», 2 — «объявлений».
+// Таблица считается один раз; pluralRu — один индекс без цепочки сравнений.
+var pluralIdx = func() (t [100]uint8) {
+	for i := range t {
+		switch {
+		case i%10 == 1 && i != 11:
+			t[i] = 0
+		case i%10 >= 2 && i%10 <= 4 && (i < 12 || i > 14):
+			t[i] = 1
+		default:
+			t[i] = 2
+		}
+	}
+	return t
+}()
+
+// pluralRu русская форма для числа n: pluralRu(5, "письмо", "письма", "писем") == "писем".
+func pluralRu(n int, one, few, many string) string {
+	if n < 0 {
+		n = -n
+	}
+	return [3]string{one, few, many}[pluralIdx[n%100]]
+}
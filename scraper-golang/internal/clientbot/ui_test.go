@@ -0,0 +1,87 @@
+package clientbot
+
+import (
+	"database/sql"
+	"strings"
+	"testing"
+	"unicode/utf8"
+
+	"github.com/marktplaats-scraper/scraper-golang/internal/listingsdb"
+)
+
+func TestWorkerKBShiftVariants(t *testing.T) {
+	t.Parallel()
+	on, off := workerKB(true), workerKB(false)
+	if got := *on.InlineKeyboard[0][0].CallbackData; got != "shift_stop" {
+		t.Fatalf("on shift top = %q", got)
+	}
+	if got := *off.InlineKeyboard[0][0].CallbackData; got != "shift_start" {
+		t.Fatalf("off shift top = %q", got)
+	}
+	if len(on.InlineKeyboard) != 5 || len(off.InlineKeyboard) != 5 {
+		t.Fatalf("rows %d / %d", len(on.InlineKeyboard), len(off.InlineKeyboard))
+	}
+}
+
+func TestBulkDelayByCallbackMatchesKB(t *testing.T) {
+	t.Parallel()
+	n := 0
+	for _, row := range workerBulkDelayKB().InlineKeyboard {
+		for _, btn := range row {
+			o, ok := bulkDelayByCallback[*btn.CallbackData]
+			if !ok {
+				continue
+			}
+			if o.Label != btn.Text {
+				t.Fatalf("%s → %q, button %q", *btn.CallbackData, o.Label, btn.Text)
+			}
+			n++
+		}
+	}
+	if n != len(bulkDelayOptions) {
+		t.Fatalf("matched %d of %d options", n, len(bulkDelayOptions))
+	}
+}
+
+func TestPluralRu(t *testing.T) {
+	t.Parallel()
+	cases := map[int]string{0: "c", 1: "a", 2: "b", 4: "b", 5: "c", 11: "c", 12: "c", 14: "c", 21: "a", 22: "b", 101: "a", 111: "c", 1004: "b"}
+	for n, want := range cases {
+		if got := pluralRu(n, "a", "b", "c"); got != want {
+			t.Errorf("pluralRu(%d) = %q, want %q", n, got, want)
+		}
+	}
+}
+
+func TestWorkerTplAddHTMLStable(t *testing.T) {
+	t.Parallel()
+	want := buildWorkerTplAddHTML()
+	if got := workerTplAddHTML(); got != want || got != buildWorkerTplAddHTML() {
+		t.Fatal("template help differs between builds")
+	}
+	if !strings.Contains(want, "<code>{title}</code>") {
+		t.Fatalf("no {title} in help:\n%s", want)
+	}
+}
+
+func TestListTodayHTMLFitsTelegram(t *testing.T) {
+	t.Parallel()
+	items := make([]listingsdb.WorkerListingToday, listTodayMax)
+	for i := range items {
+		items[i] = listingsdb.WorkerListingToday{
+			Title:      strings.Repeat("Ж&", 40),
+			PriceCents: sql.NullInt64{Int64: 89900, Valid: true},
+			ListingURL: "https://www.marktplaats.nl/v/" + strings.Repeat("x", 150),
+		}
+	}
+	out := listTodayHTML(items, 100)
+	if len(out) > listTodayTextMax || !utf8.ValidString(out) {
+		t.Fatalf("len=%d valid=%v", len(out), utf8.ValidString(out))
+	}
+	if !strings.HasPrefix(out, "📦 <b>Товары сегодня (100)</b>\n1. ") || !strings.HasSuffix(out, "\n…") {
+		t.Fatalf("unexpected text:\n%s", out)
+	}
+	if short := listTodayHTML(items[:1], 1); strings.HasSuffix(short, "…") || !strings.Contains(short, "€899.00") {
+		t.Fatalf("short list:\n%s", short)
+	}
+}
@@ -2,7 +2,6 @@
 package envload
 
 import (
-	"bufio"
 	"os"
 	"path/filepath"
 	"strings"
@@ -36,42 +35,34 @@ func LoadDefaults() {
 	}
 }
 
+// loadFile читает .env целиком (один ReadFile вместо Stat+Open+Scanner) и разбирает строки одним проходом.
 func loadFile(path string) error {
-	st, err := os.Stat(path)
-	if err != nil || st.IsDir() {
-		return err
-	}
-	f, err := os.Open(path)
+	data, err := os.ReadFile(path)
 	if err != nil {
 		return err
 	}
-	defer f.Close()
-
-	sc := bufio.NewScanner(f)
-	for sc.Scan() {
-		line := strings.TrimSpace(sc.Text())
-		if line == "" || strings.HasPrefix(line, "#") {
+	rest := string(data)
+	for rest != "" {
+		var line string
+		line, rest, _ = strings.Cut(rest, "\n")
+		line = strings.TrimSpace(line)
+		if line == "" || line[0] == '#' {
 			continue
 		}
-		if strings.HasPrefix(line, "export ") {
-			line = strings.TrimSpace(strings.TrimPrefix(line, "export "))
-		}
-		i := strings.IndexByte(line, '=')
-		if i <= 0 {
-			continue
+		if after, ok := strings.CutPrefix(line, "export "); ok {
+			line = strings.TrimSpace(after)
 		}
-		key := strings.TrimSpace(line[:i])
-		val := strings.TrimSpace(line[i+1:])
-		val = unquote(val)
-		if key == "" {
+		key, val, ok := strings.Cut(line, "=")
+		key = strings.TrimSpace(key)
+		if !ok || key == "" {
 			continue
 		}
 		if os.Getenv(key) != "" {
 			continue
 		}
-		_ = os.Setenv(key, val)
+		_ = os.Setenv(key, unquote(strings.TrimSpace(val)))
 	}
-	return sc.Err()
+	return nil
 }
 
 func unquote(s string) string {
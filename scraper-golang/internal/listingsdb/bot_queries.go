@@ -3,6 +3,7 @@ package listingsdb
 import (
 	"database/sql"
 	"fmt"
+	"math/rand"
 	"strconv"
 	"strings"
 	"time"
@@ -72,26 +73,50 @@ func UnblockUser(db *sql.DB, userID int64) error {
 
 // DeleteUser удаляет воркера из users, blocked, worker_listings.
 func DeleteUser(db *sql.DB, userID int64) (deleted bool, err error) {
+	n, err := DeleteUsers(db, []int64{userID})
+	return n > 0, err
+}
+
+// DeleteUsers удаляет нескольких воркеров одной транзакцией: три подготовленных DELETE на всю пачку
+// и один коммит вместо трёх операторов и коммита на каждого. deleted — сколько было в users.
+func DeleteUsers(db *sql.DB, userIDs []int64) (deleted int, err error) {
+	if len(userIDs) == 0 {
+		return 0, nil
+	}
 	tx, err := db.Begin()
 	if err != nil {
-		return false, err
+		return 0, err
 	}
 	defer func() { _ = tx.Rollback() }()
-	if _, err := tx.Exec(`DELETE FROM blocked_users WHERE user_id = ?`, userID); err != nil {
-		return false, err
-	}
-	if _, err := tx.Exec(`DELETE FROM worker_listings WHERE user_id = ?`, userID); err != nil {
-		return false, err
+	var stmts [3]*sql.Stmt
+	for i, q := range []string{
+		`DELETE FROM blocked_users WHERE user_id = ?`,
+		`DELETE FROM worker_listings WHERE user_id = ?`,
+		`DELETE FROM users WHERE user_id = ?`,
+	} {
+		if stmts[i], err = tx.Prepare(q); err != nil {
+			return 0, err
+		}
+		defer stmts[i].Close()
 	}
-	res, err := tx.Exec(`DELETE FROM users WHERE user_id = ?`, userID)
-	if err != nil {
-		return false, err
+	for _, uid := range userIDs {
+		if _, err := stmts[0].Exec(uid); err != nil {
+			return 0, err
+		}
+		if _, err := stmts[1].Exec(uid); err != nil {
+			return 0, err
+		}
+		res, err := stmts[2].Exec(uid)
+		if err != nil {
+			return 0, err
+		}
+		n, _ := res.RowsAffected()
+		deleted += int(n)
 	}
-	n, _ := res.RowsAffected()
 	if err := tx.Commit(); err != nil {
-		return false, err
+		return 0, err
 	}
-	return n > 0, nil
+	return deleted, nil
 }
 
 // WorkerRow авторизованный воркер (без blocked).
@@ -135,61 +160,40 @@ type WorkerStat struct {
 
 // WorkersWithStats список воркеров с подсчётом объявлений за сегодня (UTC, SQLite date('now')).
 func WorkersWithStats(db *sql.DB) ([]WorkerStat, error) {
-	ws, err := AllWorkers(db)
+	// Один запрос: воркеры LEFT JOIN их объявления (по idx_worker_listings_user) с агрегатами —
+	// вместо списка воркеров и отдельного GROUP BY по всей worker_listings со склейкой в map.
+	rows, err := db.Query(`
+		SELECT u.user_id, COALESCE(u.created_at,''), COALESCE(u.shift_active,0),
+			COUNT(CASE WHEN wl.received_at >= date('now') AND wl.received_at < date('now', '+1 day') THEN 1 END),
+			MAX(wl.received_at)
+		FROM users u LEFT JOIN worker_listings wl ON wl.user_id = u.user_id
+		WHERE u.authorized = 1 AND u.user_id NOT IN (SELECT user_id FROM blocked_users)
+		GROUP BY u.user_id
+		ORDER BY u.created_at DESC`)
 	if err != nil {
 		return nil, err
 	}
-	today := map[int64]int{}
-	lastAt := map[int64]string{}
-	rows, err := db.Query(`
-		SELECT user_id, COUNT(*) FROM worker_listings
-		WHERE date(received_at) = date('now') GROUP BY user_id`)
-	if err == nil {
-		for rows.Next() {
-			var uid int64
-			var c int
-			if err := rows.Scan(&uid, &c); err != nil {
-				rows.Close()
-				return nil, err
-			}
-			today[uid] = c
+	defer rows.Close()
+	var out []WorkerStat
+	for rows.Next() {
+		var w WorkerStat
+		var shift int
+		var ts sql.NullString
+		if err := rows.Scan(&w.UserID, &w.CreatedAt, &shift, &w.ListingsToday, &ts); err != nil {
+			return nil, err
 		}
-		rows.Close()
-	}
-	rows2, err := db.Query(`SELECT user_id, MAX(received_at) FROM worker_listings GROUP BY user_id`)
-	if err == nil {
-		for rows2.Next() {
-			var uid int64
-			var ts sql.NullString
-			if err := rows2.Scan(&uid, &ts); err != nil {
-				rows2.Close()
-				return nil, err
-			}
-			if ts.Valid && ts.String != "" {
-				s := ts.String
-				if len(s) > 16 {
-					s = s[:16]
-				}
-				lastAt[uid] = strings.ReplaceAll(s, "T", " ")
+		w.ShiftActive = shift != 0
+		w.LastListingAt = "—"
+		if ts.Valid && ts.String != "" {
+			s := ts.String
+			if len(s) > 16 {
+				s = s[:16]
 			}
+			w.LastListingAt = strings.ReplaceAll(s, "T", " ")
 		}
-		rows2.Close()
-	}
-	out := make([]WorkerStat, 0, len(ws))
-	for _, w := range ws {
-		la := lastAt[w.UserID]
-		if la == "" {
-			la = "—"
-		}
-		out = append(out, WorkerStat{
-			UserID:        w.UserID,
-			CreatedAt:     w.CreatedAt,
-			ShiftActive:   w.ShiftActive,
-			ListingsToday: today[w.UserID],
-			LastListingAt: la,
-		})
+		out = append(out, w)
 	}
-	return out, nil
+	return out, rows.Err()
 }
 
 // BlockedUser запись blocked_users.
@@ -224,33 +228,58 @@ type EmailAccount struct {
 	Blocked   bool
 }
 
+// emailInsertRows — строк в одном многострочном INSERT пачки почт (4 параметра на строку, далеко до лимита SQLite).
+const emailInsertRows = 500
+
 // AddEmailsBatch вставка пачки; только строки с @ в email.
+// Строки сначала отфильтровываются, затем вставляются многострочными INSERT по emailInsertRows в одной
+// транзакции (BEGIN IMMEDIATE из DSN): один оператор на сотни строк вместо одного на строку.
+// Дубликаты (в БД и внутри пачки) отсекает ON CONFLICT DO NOTHING; skipped = валидные минус вставленные.
 func AddEmailsBatch(db *sql.DB, ownerUserID int64, pairs [][2]string) (added, skipped int) {
+	valid := make([][2]string, 0, len(pairs))
 	for _, p := range pairs {
 		email := strings.TrimSpace(strings.ToLower(p[0]))
-		pass := strings.TrimSpace(p[1])
 		if email == "" || !strings.Contains(email, "@") {
 			continue
 		}
-		_, err := db.Exec(
-			`INSERT INTO emails (user_id, email, password, created_at, blocked) VALUES (?, ?, ?, ?, 0)`,
-			ownerUserID, email, pass, nowISO())
+		valid = append(valid, [2]string{email, strings.TrimSpace(p[1])})
+	}
+	if len(valid) == 0 {
+		return 0, 0
+	}
+	tx, err := db.Begin()
+	if err != nil {
+		return 0, 0
+	}
+	defer func() { _ = tx.Rollback() }()
+	now := nowISO()
+	args := make([]any, 0, 4*min(len(valid), emailInsertRows))
+	for start := 0; start < len(valid); start += emailInsertRows {
+		chunk := valid[start:min(start+emailInsertRows, len(valid))]
+		args = args[:0]
+		for _, p := range chunk {
+			args = append(args, ownerUserID, p[0], p[1], now)
+		}
+		res, err := tx.Exec(`INSERT INTO emails (user_id, email, password, created_at, blocked) VALUES `+
+			strings.Repeat("(?, ?, ?, ?, 0), ", len(chunk)-1)+`(?, ?, ?, ?, 0)
+			ON CONFLICT(user_id, email) DO NOTHING`, args...)
 		if err != nil {
-			if strings.Contains(strings.ToLower(err.Error()), "unique") {
-				skipped++
-			}
-			continue
+			return 0, 0
 		}
-		added++
+		n, _ := res.RowsAffected()
+		added += int(n)
 	}
-	return added, skipped
+	if err := tx.Commit(); err != nil {
+		return 0, 0
+	}
+	return added, len(valid) - added
 }
 
 // ListEmails страница почт воркера.
 func ListEmails(db *sql.DB, ownerUserID int64, limit, offset int) ([]EmailAccount, error) {
 	rows, err := db.Query(`
 		SELECT email, COALESCE(password,''), COALESCE(created_at,''), COALESCE(blocked,0)
-		FROM emails WHERE user_id = ? ORDER BY created_at DESC LIMIT ? OFFSET ?`,
+		FROM emails WHERE user_id = ? ORDER BY created_at DESC, email DESC LIMIT ? OFFSET ?`,
 		ownerUserID, limit, offset)
 	if err != nil {
 		return nil, err
@@ -269,6 +298,134 @@ func ListEmails(db *sql.DB, ownerUserID int64, limit, offset int) ([]EmailAccoun
 	return out, rows.Err()
 }
 
+// Запросы ListEmailsAfter. Курсор — отдельной строкой SQL: под OR с проверкой «первая страница» SQLite
+// не выносит (created_at, email) < (?, ?) в диапазон индекса и идёт по idx_emails_user_created от начала.
+const (
+	listEmailsFirstSQL = `
+		SELECT email, COALESCE(password,''), COALESCE(created_at,''), COALESCE(blocked,0)
+		FROM emails WHERE user_id = ?
+		ORDER BY created_at DESC, email DESC LIMIT ?`
+	listEmailsAfterSQL = `
+		SELECT email, COALESCE(password,''), COALESCE(created_at,''), COALESCE(blocked,0)
+		FROM emails WHERE user_id = ? AND (created_at, email) < (?, ?)
+		ORDER BY created_at DESC, email DESC LIMIT ?`
+)
+
+// ListEmailsAfter страница почт воркера после курсора (created_at, email) последней строки предыдущей
+// страницы; пустой afterCreatedAt — первая страница. В отличие от OFFSET, SQLite не проходит заново
+// все предыдущие строки: курсор — диапазон по idx_emails_user_created.
+func ListEmailsAfter(db *sql.DB, ownerUserID int64, afterCreatedAt, afterEmail string, limit int) ([]EmailAccount, error) {
+	var rows *sql.Rows
+	var err error
+	if afterCreatedAt == "" {
+		rows, err = db.Query(listEmailsFirstSQL, ownerUserID, limit)
+	} else {
+		rows, err = db.Query(listEmailsAfterSQL, ownerUserID, afterCreatedAt, afterEmail, limit)
+	}
+	if err != nil {
+		return nil, err
+	}
+	defer rows.Close()
+	out := make([]EmailAccount, 0, limit)
+	for rows.Next() {
+		var e EmailAccount
+		var bl int
+		if err := rows.Scan(&e.Email, &e.Password, &e.CreatedAt, &bl); err != nil {
+			return nil, err
+		}
+		e.Blocked = bl != 0
+		out = append(out, e)
+	}
+	return out, rows.Err()
+}
+
+// EachEmail отдаёт fn почты владельца (новые первыми, не больше limit) прямо из курсора, без среза в памяти.
+// Ошибка fn прерывает обход и возвращается.
+func EachEmail(db *sql.DB, ownerUserID int64, limit int, fn func(email, password string) error) error {
+	rows, err := db.Query(`
+		SELECT email, COALESCE(password,'') FROM emails WHERE user_id = ? ORDER BY created_at DESC, email DESC LIMIT ?`,
+		ownerUserID, limit)
+	if err != nil {
+		return err
+	}
+	defer rows.Close()
+	var email, pass string
+	for rows.Next() {
+		if err := rows.Scan(&email, &pass); err != nil {
+			return err
+		}
+		if err := fn(email, pass); err != nil {
+			return err
+		}
+	}
+	return rows.Err()
+}
+
+// EmailsPage страница почт вместе с общим числом и последней использованной почтой — один запрос
+// вместо ListEmails + EmailsTotalCount + LastUsedEmail (COUNT(*) OVER () считается до LIMIT).
+func EmailsPage(db *sql.DB, ownerUserID int64, limit, offset int) (page []EmailAccount, total int, lastUsed string, err error) {
+	key := fmt.Sprintf("last_used_email_%d", ownerUserID)
+	rows, err := db.Query(`
+		SELECT email, COALESCE(password,''), COALESCE(created_at,''), COALESCE(blocked,0),
+			COUNT(*) OVER (),
+			COALESCE((SELECT value FROM rotation_state WHERE key = ?), '')
+		FROM emails WHERE user_id = ? ORDER BY created_at DESC, email DESC LIMIT ? OFFSET ?`,
+		key, ownerUserID, limit, offset)
+	if err != nil {
+		return nil, 0, "", err
+	}
+	defer rows.Close()
+	for rows.Next() {
+		var e EmailAccount
+		var bl int
+		if err := rows.Scan(&e.Email, &e.Password, &e.CreatedAt, &bl, &total, &lastUsed); err != nil {
+			return nil, 0, "", err
+		}
+		e.Blocked = bl != 0
+		page = append(page, e)
+	}
+	if err := rows.Err(); err != nil {
+		return nil, 0, "", err
+	}
+	if len(page) == 0 {
+		// Пустая страница (offset за концом) — итог и last_used отдельными запросами.
+		total, _ = EmailsTotalCount(db, ownerUserID)
+		lastUsed = LastUsedEmail(db, ownerUserID)
+	}
+	return page, total, lastUsed, nil
+}
+
+// EmailsPageActive страница почт с общим числом и числом активных (не blocked) — один запрос вместо
+// ListEmails + EmailsTotalCount + ActiveEmailsCount; оба счётчика — оконные функции по всем почтам владельца.
+func EmailsPageActive(db *sql.DB, ownerUserID int64, limit, offset int) (page []EmailAccount, total, active int, err error) {
+	rows, err := db.Query(`
+		SELECT email, COALESCE(password,''), COALESCE(created_at,''), COALESCE(blocked,0),
+			COUNT(*) OVER (), SUM(COALESCE(blocked,0) = 0) OVER ()
+		FROM emails WHERE user_id = ? ORDER BY created_at DESC, email DESC LIMIT ? OFFSET ?`,
+		ownerUserID, limit, offset)
+	if err != nil {
+		return nil, 0, 0, err
+	}
+	defer rows.Close()
+	for rows.Next() {
+		var e EmailAccount
+		var bl int
+		if err := rows.Scan(&e.Email, &e.Password, &e.CreatedAt, &bl, &total, &active); err != nil {
+			return nil, 0, 0, err
+		}
+		e.Blocked = bl != 0
+		page = append(page, e)
+	}
+	if err := rows.Err(); err != nil {
+		return nil, 0, 0, err
+	}
+	if len(page) == 0 {
+		total, _ = EmailsTotalCount(db, ownerUserID)
+		active, _ = ActiveEmailsCount(db, ownerUserID)
+	}
+	return page, total, active, nil
+}
+
 // EmailsTotalCount все почты воркера (включая blocked).
 func EmailsTotalCount(db *sql.DB, ownerUserID int64) (int, error) {
 	var n int
@@ -276,15 +433,37 @@ func EmailsTotalCount(db *sql.DB, ownerUserID int64) (int, error) {
 	return n, err
 }
 
-// DeleteEmail удаляет строку; true если была удалена.
-func DeleteEmail(db *sql.DB, ownerUserID int64, email string) (bool, error) {
+// MailCounts все почты, активные почты и шаблоны воркера одним запросом — для экранов и проверок,
+// которым нужны два-три счётчика сразу (вместо EmailsTotalCount + ActiveEmailsCount + EmailTemplatesCount).
+func MailCounts(db *sql.DB, ownerUserID int64) (total, active, templates int, err error) {
+	err = db.QueryRow(`
+		SELECT COUNT(*), COALESCE(SUM(COALESCE(blocked,0) = 0), 0),
+			(SELECT COUNT(*) FROM email_templates WHERE user_id = ?1)
+		FROM emails WHERE user_id = ?1`, ownerUserID).Scan(&total, &active, &templates)
+	return total, active, templates, err
+}
+
+// DeleteEmail удаляет строку; deleted — была ли она, remaining — сколько почт владельца осталось.
+// DELETE и COUNT идут в одной транзакции: вызывающим не нужен отдельный EmailsTotalCount для выбора страницы.
+func DeleteEmail(db *sql.DB, ownerUserID int64, email string) (deleted bool, remaining int, err error) {
 	email = strings.TrimSpace(strings.ToLower(email))
-	res, err := db.Exec(`DELETE FROM emails WHERE email = ? AND user_id = ?`, email, ownerUserID)
+	tx, err := db.Begin()
 	if err != nil {
-		return false, err
+		return false, 0, err
+	}
+	defer func() { _ = tx.Rollback() }()
+	res, err := tx.Exec(`DELETE FROM emails WHERE email = ? AND user_id = ?`, email, ownerUserID)
+	if err != nil {
+		return false, 0, err
 	}
 	n, _ := res.RowsAffected()
-	return n > 0, nil
+	if err := tx.QueryRow(`SELECT COUNT(*) FROM emails WHERE user_id = ?`, ownerUserID).Scan(&remaining); err != nil {
+		return false, 0, err
+	}
+	if err := tx.Commit(); err != nil {
+		return false, 0, err
+	}
+	return n > 0, remaining, nil
 }
 
 // UnblockEmail снять blocked.
@@ -310,19 +489,31 @@ func LastUsedEmail(db *sql.DB, ownerUserID int64) string {
 }
 
 // RandomActiveEmail случайная незаблокированная почта воркера.
+// Вместо ORDER BY RANDOM() (случайный ключ и сортировка всех почт) — число активных почт и одна строка
+// по случайному OFFSET в порядке первичного ключа (user_id, email): читаются только почты этого воркера,
+// выбор равномерный. Если между запросами почты удалили и OFFSET оказался за концом — ещё одна попытка.
 func RandomActiveEmail(db *sql.DB, ownerUserID int64) (email, password string, ok bool) {
-	err := db.QueryRow(`
-		SELECT email, COALESCE(password,'') FROM emails
-		WHERE user_id = ? AND COALESCE(blocked,0) = 0 ORDER BY RANDOM() LIMIT 1`, ownerUserID).Scan(&email, &password)
-	if err != nil {
-		return "", "", false
+	for try := 0; try < 2; try++ {
+		n, err := ActiveEmailsCount(db, ownerUserID)
+		if err != nil || n == 0 {
+			return "", "", false
+		}
+		err = db.QueryRow(`SELECT email, COALESCE(password,'') FROM emails
+			WHERE user_id = ? AND COALESCE(blocked,0) = 0 ORDER BY email LIMIT 1 OFFSET ?`,
+			ownerUserID, rand.Intn(n)).Scan(&email, &password)
+		if err == nil {
+			return email, password, true
+		}
+		if err != sql.ErrNoRows {
+			return "", "", false
+		}
 	}
-	return email, password, true
+	return "", "", false
 }
 
 // AllEmailsForTest все почты воркера для прогона теста (включая blocked).
 func AllEmailsForTest(db *sql.DB, ownerUserID int64) ([]struct{ Email, Password string }, error) {
-	rows, err := db.Query(`SELECT email, COALESCE(password,'') FROM emails WHERE user_id = ? ORDER BY created_at DESC`, ownerUserID)
+	rows, err := db.Query(`SELECT email, COALESCE(password,'') FROM emails WHERE user_id = ? ORDER BY created_at DESC, email DESC`, ownerUserID)
 	if err != nil {
 		return nil, err
 	}
@@ -2,16 +2,58 @@
 package listingsdb
 
 import (
+	"context"
 	"database/sql"
 	"os"
 	"path/filepath"
+	"strconv"
 	"strings"
+	"unicode/utf8"
 
 	_ "modernc.org/sqlite"
 
 	"github.com/marktplaats-scraper/scraper-golang/internal/marktplaats"
 )
 
+// connPragmas применяются к каждому соединению: файл общий для скрапера, админ- и клиент-бота,
+// WAL не даёт писателю блокировать читателей, busy_timeout ждёт блокировку вместо «database is locked».
+// _txlock=immediate: транзакция сразу берёт блокировку записи и ждёт по busy_timeout,
+// а не падает с SQLITE_BUSY при апгрейде чтения до записи.
+// temp_store и cache_size (~20 МБ на соединение) — сортировки выдачи и страницы почт без временных файлов
+// и повторного чтения страниц с диска. mmap_size (128 МБ): чтения идут из отображённого файла через
+// кеш страниц ОС, общий для всех соединений и процессов, без копирования в буфер каждого соединения.
+const connPragmas = "&_pragma=journal_mode(WAL)&_pragma=synchronous(NORMAL)&_pragma=busy_timeout(5000)" +
+	"&_pragma=temp_store(MEMORY)&_pragma=cache_size(-20000)&_pragma=mmap_size(134217728)&_txlock=immediate"
+
+// defaultPoolSize — пул долгоживущих соединений: в WAL читатели не ждут друг друга и писателя,
+// так что параллельные колбэки ботов не выстраиваются в очередь за одним соединением.
+// SQLITE_POOL_SIZE переопределяет (1 — старое поведение с одним соединением).
+const defaultPoolSize = 4
+
+func poolSize() int {
+	if n, err := strconv.Atoi(strings.TrimSpace(os.Getenv("SQLITE_POOL_SIZE"))); err == nil && n > 0 {
+		return min(n, 32)
+	}
+	return defaultPoolSize
+}
+
+// warmPool открывает все соединения пула сразу: первая пачка колбэков не платит за open и
+// прагмы, а кеш страниц каждого соединения живёт до закрытия процесса (idle-таймаута нет).
+func warmPool(db *sql.DB, n int) {
+	ctx := context.Background()
+	conns := make([]*sql.Conn, 0, n)
+	for i := 0; i < n; i++ {
+		c, err := db.Conn(ctx)
+		if err != nil {
+			break
+		}
+		conns = append(conns, c)
+	}
+	for _, c := range conns {
+		_ = c.Close()
+	}
+}
+
 // Open открывает БД, создаёт каталог и схему при необходимости.
 func Open(path string) (*sql.DB, error) {
 	path, err := filepath.Abs(path)
@@ -24,11 +66,17 @@ func Open(path string) (*sql.DB, error) {
 			return nil, err
 		}
 	}
-	db, err := sql.Open("sqlite", "file:"+filepath.ToSlash(path)+"?mode=rwc")
+	db, err := sql.Open("sqlite", "file:"+filepath.ToSlash(path)+"?mode=rwc"+connPragmas)
 	if err != nil {
 		return nil, err
 	}
-	db.SetMaxOpenConns(1)
+	n := poolSize()
+	db.SetMaxOpenConns(n)
+	db.SetMaxIdleConns(n)
+	// *sql.DB — один на процесс (боты и скрапер открывают его один раз при старте): соединения не
+	// пересоздаются по времени, чтобы прогретый кеш страниц и разобранная схема жили до выхода.
+	db.SetConnMaxLifetime(0)
+	db.SetConnMaxIdleTime(0)
 	if err := db.Ping(); err != nil {
 		_ = db.Close()
 		return nil, err
@@ -37,6 +85,11 @@ func Open(path string) (*sql.DB, error) {
 		_ = db.Close()
 		return nil, err
 	}
+	// Статистика для планировщика (аналог ANALYZE, но только там, где её нет или она устарела):
+	// без sqlite_stat1 выбор между idx_worker_listings_user и прочими индексами идёт вслепую.
+	// 0x10002 — режим «при открытии соединения» с ограничением работы, на большой базе это миллисекунды.
+	_, _ = db.Exec(`PRAGMA optimize=0x10002`)
+	warmPool(db, n)
 	return db, nil
 }
 
@@ -88,26 +141,23 @@ func initSchema(db *sql.DB) error {
 		}
 	}
 	// Миграции как в Python: ADD COLUMN, если таблица старая.
-	alters := []string{
-		`ALTER TABLE listings ADD COLUMN seller_name TEXT`,
-		`ALTER TABLE listings ADD COLUMN latitude REAL`,
-		`ALTER TABLE listings ADD COLUMN longitude REAL`,
-		`ALTER TABLE listings ADD COLUMN distance_meters INTEGER`,
-		`ALTER TABLE listings ADD COLUMN country_name TEXT`,
-		`ALTER TABLE listings ADD COLUMN priority_product TEXT`,
-		`ALTER TABLE listings ADD COLUMN traits TEXT`,
-		`ALTER TABLE listings ADD COLUMN category_specific_description TEXT`,
-		`ALTER TABLE listings ADD COLUMN reserved INTEGER`,
-		`ALTER TABLE listings ADD COLUMN nap_available INTEGER`,
-		`ALTER TABLE listings ADD COLUMN urgency_feature_active INTEGER`,
-		`ALTER TABLE listings ADD COLUMN is_verified INTEGER`,
-		`ALTER TABLE listings ADD COLUMN seller_website_url TEXT`,
-		`ALTER TABLE listings ADD COLUMN attributes_json TEXT`,
-	}
-	for _, q := range alters {
-		if _, err := db.Exec(q); err != nil && !isDupColumn(err) {
-			return err
-		}
+	if err := addMissingColumns(db, "listings", [][2]string{
+		{"seller_name", "TEXT"},
+		{"latitude", "REAL"},
+		{"longitude", "REAL"},
+		{"distance_meters", "INTEGER"},
+		{"country_name", "TEXT"},
+		{"priority_product", "TEXT"},
+		{"traits", "TEXT"},
+		{"category_specific_description", "TEXT"},
+		{"reserved", "INTEGER"},
+		{"nap_available", "INTEGER"},
+		{"urgency_feature_active", "INTEGER"},
+		{"is_verified", "INTEGER"},
+		{"seller_website_url", "TEXT"},
+		{"attributes_json", "TEXT"},
+	}); err != nil {
+		return err
 	}
 	return initMailSchema(db)
 }
@@ -119,6 +169,38 @@ func ClearListings(db *sql.DB) error {
 	return err
 }
 
+// addMissingColumns ALTER TABLE … ADD COLUMN только для колонок (имя, тип), которых нет в table:
+// один запрос pragma_table_info вместо ALTER на каждую колонку с ошибкой «duplicate column» на свежей схеме.
+// isDupColumn остаётся на случай, если колонку между чтением схемы и ALTER добавил другой процесс.
+func addMissingColumns(db *sql.DB, table string, cols [][2]string) error {
+	rows, err := db.Query(`SELECT name FROM pragma_table_info(?)`, table)
+	if err != nil {
+		return err
+	}
+	have := make(map[string]bool)
+	for rows.Next() {
+		var name string
+		if err := rows.Scan(&name); err != nil {
+			rows.Close()
+			return err
+		}
+		have[strings.ToLower(name)] = true
+	}
+	rows.Close()
+	if err := rows.Err(); err != nil {
+		return err
+	}
+	for _, c := range cols {
+		if have[c[0]] {
+			continue
+		}
+		if _, err := db.Exec(`ALTER TABLE ` + table + ` ADD COLUMN ` + c[0] + ` ` + c[1]); err != nil && !isDupColumn(err) {
+			return err
+		}
+	}
+	return nil
+}
+
 func isDupColumn(err error) bool {
 	if err == nil {
 		return false
@@ -127,6 +209,9 @@ func isDupColumn(err error) bool {
 	return strings.Contains(msg, "duplicate column")
 }
 
+// joinPipe списки (verticals, types, services, image_urls, traits) хранятся через «|», как их пишет
+// Python save_listing_to_db: в существующих базах уже лежат такие строки, и JSON в тех же колонках дал бы
+// два формата вперемешку. strings.Join — один проход и одна аллокация, без промежуточных значений.
 func joinPipe(ss []string) string {
 	if len(ss) == 0 {
 		return ""
@@ -141,59 +226,147 @@ func boolInt(b bool) int {
 	return 0
 }
 
+// sanitize убирает битые UTF-8 последовательности, в том числе закодированные половинки суррогатных пар
+// (\xed\xa0\x80…), которые в Python давали UnicodeEncodeError. Почти все поля валидны: utf8.ValidString
+// проверяет ASCII по 8 байт за шаг, и строка возвращается как есть — без копии и аллокаций.
 func sanitize(s string) string {
+	if utf8.ValidString(s) {
+		return s
+	}
 	return strings.ToValidUTF8(s, "")
 }
 
-// Upsert вставляет или заменяет объявление (INSERT OR REPLACE), как save_listing_to_db в fetch_listings.py.
+// listingColumns колонки listings в порядке аргументов listingArgs.
+var listingColumns = []string{
+	"item_id", "seller_id", "parent_category_id", "child_category_id", "category_verticals", "ad_type",
+	"title", "description", "price_type", "price_cents", "types", "services", "listing_url", "image_urls",
+	"city_name", "country_code", "listed_timestamp", "crawled_timestamp", "view_count", "favorited_count",
+	"seller_name", "latitude", "longitude", "distance_meters", "country_name", "priority_product", "traits",
+	"category_specific_description", "reserved", "nap_available", "urgency_feature_active", "is_verified",
+	"seller_website_url", "attributes_json",
+}
+
+// upsertListingSQL настоящий UPSERT по item_id: в отличие от INSERT OR REPLACE строка не удаляется
+// и не вставляется заново (rowid и индексы не перестраиваются), обновляются только её поля.
+var upsertListingSQL = func() string {
+	var sb strings.Builder
+	sb.WriteString("INSERT INTO listings (")
+	sb.WriteString(strings.Join(listingColumns, ", "))
+	sb.WriteString(") VALUES (")
+	sb.WriteString(strings.TrimSuffix(strings.Repeat("?, ", len(listingColumns)), ", "))
+	sb.WriteString(") ON CONFLICT(item_id) DO UPDATE SET ")
+	for i, c := range listingColumns[1:] {
+		if i > 0 {
+			sb.WriteString(", ")
+		}
+		sb.WriteString(c)
+		sb.WriteString(" = excluded.")
+		sb.WriteString(c)
+	}
+	return sb.String()
+}()
+
+func listingArgs(l marktplaats.Listing) []any {
+	return fillListingArgs(make([]any, len(listingColumns)), l)
+}
+
+// fillListingArgs пишет аргументы UPSERT в переданный срез (len(listingColumns)) — пачка переиспользует
+// один срез на все строки вместо нового на каждое объявление.
+func fillListingArgs(args []any, l marktplaats.Listing) []any {
+	args[0] = sanitize(l.ItemID)
+	args[1] = nullIfEmpty(sanitize(l.SellerID))
+	args[2] = l.ParentCatID
+	args[3] = l.ChildCatID
+	args[4] = nullIfEmpty(sanitize(joinPipe(l.Verticals)))
+	args[5] = nullIfEmpty(sanitize(l.AdType))
+	args[6] = nullIfEmpty(sanitize(l.Title))
+	args[7] = nullIfEmpty(sanitize(l.Description))
+	args[8] = nullIfEmpty(sanitize(l.PriceType))
+	args[9] = l.PriceCents
+	args[10] = nullIfEmpty(sanitize(joinPipe(l.Types)))
+	args[11] = nullIfEmpty(sanitize(joinPipe(l.Services)))
+	args[12] = nullIfEmpty(sanitize(l.ListingURL))
+	args[13] = nullIfEmpty(sanitize(joinPipe(l.ImageURLs)))
+	args[14] = nullIfEmpty(sanitize(l.CityName))
+	args[15] = nullIfEmpty(sanitize(l.CountryCode))
+	args[16] = nullIfEmpty(sanitize(l.ListedTS))
+	args[17] = nullIfEmpty(sanitize(l.CrawledTS))
+	args[18] = l.ViewCount
+	args[19] = l.Favorited
+	args[20] = nullIfEmpty(sanitize(l.SellerName))
+	args[21] = l.Latitude
+	args[22] = l.Longitude
+	args[23] = l.DistanceM
+	args[24] = nullIfEmpty(sanitize(l.CountryName))
+	args[25] = nullIfEmpty(sanitize(l.PriorityProd))
+	args[26] = nullIfEmpty(sanitize(joinPipe(l.Traits)))
+	args[27] = nullIfEmpty(sanitize(l.CatSpecDesc))
+	args[28] = boolInt(l.Reserved)
+	args[29] = boolInt(l.NapAvail)
+	args[30] = boolInt(l.Urgency)
+	args[31] = boolInt(l.Verified)
+	args[32] = nullIfEmpty(sanitize(l.SellerWebURL))
+	args[33] = nullIfEmpty(sanitize(l.AttributesJSON))
+	return args
+}
+
+// Upsert вставляет объявление или обновляет существующее по item_id (как save_listing_to_db в fetch_listings.py).
 func Upsert(db *sql.DB, l marktplaats.Listing) error {
-	_, err := db.Exec(`
-INSERT OR REPLACE INTO listings (
-	item_id, seller_id, parent_category_id, child_category_id, category_verticals, ad_type,
-	title, description, price_type, price_cents, types, services, listing_url, image_urls,
-	city_name, country_code, listed_timestamp, crawled_timestamp, view_count, favorited_count,
-	seller_name, latitude, longitude, distance_meters, country_name, priority_product, traits,
-	category_specific_description, reserved, nap_available, urgency_feature_active, is_verified,
-	seller_website_url, attributes_json
-) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
-		sanitize(l.ItemID),
-		nullIfEmpty(sanitize(l.SellerID)),
-		l.ParentCatID,
-		l.ChildCatID,
-		nullIfEmpty(sanitize(joinPipe(l.Verticals))),
-		nullIfEmpty(sanitize(l.AdType)),
-		nullIfEmpty(sanitize(l.Title)),
-		nullIfEmpty(sanitize(l.Description)),
-		nullIfEmpty(sanitize(l.PriceType)),
-		l.PriceCents,
-		nullIfEmpty(sanitize(joinPipe(l.Types))),
-		nullIfEmpty(sanitize(joinPipe(l.Services))),
-		nullIfEmpty(sanitize(l.ListingURL)),
-		nullIfEmpty(sanitize(joinPipe(l.ImageURLs))),
-		nullIfEmpty(sanitize(l.CityName)),
-		nullIfEmpty(sanitize(l.CountryCode)),
-		nullIfEmpty(sanitize(l.ListedTS)),
-		nullIfEmpty(sanitize(l.CrawledTS)),
-		l.ViewCount,
-		l.Favorited,
-		nullIfEmpty(sanitize(l.SellerName)),
-		l.Latitude,
-		l.Longitude,
-		l.DistanceM,
-		nullIfEmpty(sanitize(l.CountryName)),
-		nullIfEmpty(sanitize(l.PriorityProd)),
-		nullIfEmpty(sanitize(joinPipe(l.Traits))),
-		nullIfEmpty(sanitize(l.CatSpecDesc)),
-		boolInt(l.Reserved),
-		boolInt(l.NapAvail),
-		boolInt(l.Urgency),
-		boolInt(l.Verified),
-		nullIfEmpty(sanitize(l.SellerWebURL)),
-		nullIfEmpty(sanitize(l.AttributesJSON)),
-	)
+	_, err := db.Exec(upsertListingSQL, listingArgs(l)...)
 	return err
 }
 
+// upsertChunk — сколько объявлений пишется одной транзакцией: крупные пачки дают один fsync на тысячи строк,
+// но WAL и время удержания блокировки записи (боты ждут по busy_timeout) остаются ограниченными.
+const upsertChunk = 10_000
+
+// UpsertBatch пачка объявлений транзакциями по upsertChunk строк с подготовленным UPSERT — один fsync на чанк
+// вместо одного на объявление. Ошибка отдельной строки передаётся в onErr (может быть nil) и не прерывает пачку;
+// err — если не удалось начать или закоммитить транзакцию (saved — строки уже закоммиченных чанков).
+func UpsertBatch(db *sql.DB, items []marktplaats.Listing, onErr func(itemID string, err error)) (saved int, err error) {
+	return upsertBatch(db, items, upsertChunk, onErr)
+}
+
+func upsertBatch(db *sql.DB, items []marktplaats.Listing, chunk int, onErr func(itemID string, err error)) (saved int, err error) {
+	for len(items) > 0 {
+		n := min(chunk, len(items))
+		done, err := upsertTx(db, items[:n], onErr)
+		if err != nil {
+			return saved, err
+		}
+		saved += done
+		items = items[n:]
+	}
+	return saved, nil
+}
+
+func upsertTx(db *sql.DB, items []marktplaats.Listing, onErr func(itemID string, err error)) (saved int, err error) {
+	tx, err := db.Begin()
+	if err != nil {
+		return 0, err
+	}
+	defer func() { _ = tx.Rollback() }()
+	stmt, err := tx.Prepare(upsertListingSQL)
+	if err != nil {
+		return 0, err
+	}
+	defer stmt.Close()
+	args := make([]any, len(listingColumns))
+	for _, l := range items {
+		if _, err := stmt.Exec(fillListingArgs(args, l)...); err != nil {
+			if onErr != nil {
+				onErr(l.ItemID, err)
+			}
+			continue
+		}
+		saved++
+	}
+	if err := tx.Commit(); err != nil {
+		return 0, err
+	}
+	return saved, nil
+}
+
 func nullIfEmpty(s string) any {
 	if s == "" {
 		return nil
@@ -201,22 +374,46 @@ func nullIfEmpty(s string) any {
 	return s
 }
 
-// LoadItemIDs все item_id из listings (для пропуска уже сохранённых).
-func LoadItemIDs(db *sql.DB) (map[string]struct{}, error) {
-	rows, err := db.Query(`SELECT item_id FROM listings`)
-	if err != nil {
-		return nil, err
+// filterNewChunk — кандидатов в одном IN (...) FilterNewItemIDs.
+const filterNewChunk = 500
+
+// FilterNewItemIDs из candidates те, которых ещё нет в listings (порядок сохраняется).
+// Поиск по первичному ключу только для кандидатов: стоимость зависит от размера страницы выдачи,
+// а не от размера базы: множество всех id в память не загружается.
+func FilterNewItemIDs(db *sql.DB, candidates []string) ([]string, error) {
+	if len(candidates) == 0 {
+		return nil, nil
 	}
-	defer rows.Close()
-	out := make(map[string]struct{})
-	for rows.Next() {
-		var id string
-		if err := rows.Scan(&id); err != nil {
+	known := make(map[string]struct{})
+	args := make([]any, 0, min(len(candidates), filterNewChunk))
+	for start := 0; start < len(candidates); start += filterNewChunk {
+		chunk := candidates[start:min(start+filterNewChunk, len(candidates))]
+		args = args[:0]
+		for _, id := range chunk {
+			args = append(args, id)
+		}
+		rows, err := db.Query(`SELECT item_id FROM listings WHERE item_id IN (?`+strings.Repeat(", ?", len(chunk)-1)+`)`, args...)
+		if err != nil {
 			return nil, err
 		}
-		if id != "" {
-			out[id] = struct{}{}
+		for rows.Next() {
+			var id string
+			if err := rows.Scan(&id); err != nil {
+				rows.Close()
+				return nil, err
+			}
+			known[id] = struct{}{}
+		}
+		rows.Close()
+		if err := rows.Err(); err != nil {
+			return nil, err
+		}
+	}
+	out := make([]string, 0, len(candidates)-len(known))
+	for _, id := range candidates {
+		if _, ok := known[id]; !ok {
+			out = append(out, id)
 		}
 	}
-	return out, rows.Err()
+	return out, nil
 }
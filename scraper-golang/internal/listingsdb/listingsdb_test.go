@@ -0,0 +1,632 @@
+package listingsdb
+
+import (
+	"fmt"
+	"path/filepath"
+	"strings"
+	"testing"
+
+	"github.com/marktplaats-scraper/scraper-golang/internal/marktplaats"
+)
+
+func TestOpenUsesWAL(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "wal.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	var mode string
+	if err := db.QueryRow(`PRAGMA journal_mode`).Scan(&mode); err != nil {
+		t.Fatal(err)
+	}
+	if !strings.EqualFold(mode, "wal") {
+		t.Fatalf("journal_mode=%q, want wal", mode)
+	}
+	var timeout int
+	if err := db.QueryRow(`PRAGMA busy_timeout`).Scan(&timeout); err != nil {
+		t.Fatal(err)
+	}
+	if timeout != 5000 {
+		t.Fatalf("busy_timeout=%d", timeout)
+	}
+	var cache, temp int
+	if err := db.QueryRow(`PRAGMA cache_size`).Scan(&cache); err != nil {
+		t.Fatal(err)
+	}
+	if err := db.QueryRow(`PRAGMA temp_store`).Scan(&temp); err != nil {
+		t.Fatal(err)
+	}
+	if cache != -20000 || temp != 2 {
+		t.Fatalf("cache_size=%d temp_store=%d", cache, temp)
+	}
+}
+
+func TestReadDuringOpenTx(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "pool.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	tx, err := db.Begin()
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer tx.Rollback()
+	if _, err := tx.Exec(`INSERT INTO listings (item_id) VALUES ('m1')`); err != nil {
+		t.Fatal(err)
+	}
+	// Чтение идёт через другое соединение пула и видит снимок до коммита.
+	var n int
+	if err := db.QueryRow(`SELECT COUNT(*) FROM listings`).Scan(&n); err != nil {
+		t.Fatal(err)
+	}
+	if n != 0 {
+		t.Fatalf("count during tx = %d", n)
+	}
+}
+
+func TestEmailsPageMatchesSeparateQueries(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "page.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	_, _ = AddEmailsBatch(db, 5, [][2]string{{"a@gmail.com", "1"}, {"b@gmail.com", "2"}, {"c@gmail.com", "3"}})
+	_ = SetLastUsedEmail(db, 5, "b@gmail.com")
+
+	page, total, last, err := EmailsPage(db, 5, 2, 0)
+	if err != nil {
+		t.Fatal(err)
+	}
+	if len(page) != 2 || total != 3 || last != "b@gmail.com" {
+		t.Fatalf("page=%d total=%d last=%q", len(page), total, last)
+	}
+	page, total, last, err = EmailsPage(db, 5, 2, 10)
+	if err != nil {
+		t.Fatal(err)
+	}
+	if len(page) != 0 || total != 3 || last != "b@gmail.com" {
+		t.Fatalf("past end: page=%d total=%d last=%q", len(page), total, last)
+	}
+}
+
+func TestEmailsPageActive(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "page.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	_, _ = AddEmailsBatch(db, 5, [][2]string{{"a@gmail.com", "1"}, {"b@gmail.com", "2"}, {"c@gmail.com", "3"}})
+	_ = MarkEmailBlocked(db, 5, "b@gmail.com")
+
+	for _, offset := range []int{0, 10} {
+		page, total, active, err := EmailsPageActive(db, 5, 2, offset)
+		if err != nil {
+			t.Fatal(err)
+		}
+		wantTotal, _ := EmailsTotalCount(db, 5)
+		wantActive, _ := ActiveEmailsCount(db, 5)
+		if total != wantTotal || active != wantActive || active != 2 {
+			t.Fatalf("offset %d: total=%d/%d active=%d/%d", offset, total, wantTotal, active, wantActive)
+		}
+		if offset == 0 && len(page) != 2 {
+			t.Fatalf("page=%d", len(page))
+		}
+	}
+}
+
+func TestDeleteEmailReturnsRemaining(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	if added, _ := AddEmailsBatch(db, 3, [][2]string{{"a@x.com", "1"}, {"b@x.com", "2"}}); added != 2 {
+		t.Fatalf("added %d", added)
+	}
+	ok, n, err := DeleteEmail(db, 3, " A@x.com ")
+	if err != nil || !ok || n != 1 {
+		t.Fatalf("ok=%v n=%d err=%v", ok, n, err)
+	}
+	ok, n, err = DeleteEmail(db, 3, "missing@x.com")
+	if err != nil || ok || n != 1 {
+		t.Fatalf("ok=%v n=%d err=%v", ok, n, err)
+	}
+}
+
+func TestUserState(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	if a, bl, on, err := UserState(db, 5); err != nil || a || bl || on {
+		t.Fatalf("unknown user: %v %v %v %v", a, bl, on, err)
+	}
+	if err := AuthorizeUser(db, 5); err != nil {
+		t.Fatal(err)
+	}
+	if a, bl, on, _ := UserState(db, 5); a != IsAuthorized(db, 5) || bl != IsBlocked(db, 5) || on || !a {
+		t.Fatalf("authorized: %v %v %v", a, bl, on)
+	}
+	if err := SetShiftActive(db, 5, true); err != nil {
+		t.Fatal(err)
+	}
+	if _, _, on, _ := UserState(db, 5); on != IsShiftActive(db, 5) || !on {
+		t.Fatalf("shift: %v", on)
+	}
+	if err := BlockUser(db, 5); err != nil {
+		t.Fatal(err)
+	}
+	if a, bl, _, _ := UserState(db, 5); a != IsAuthorized(db, 5) || bl != IsBlocked(db, 5) || !bl {
+		t.Fatalf("blocked: %v %v", a, bl)
+	}
+}
+
+func TestWorkersWithStats(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	for _, uid := range []int64{1, 2} {
+		if err := AuthorizeUser(db, uid); err != nil {
+			t.Fatal(err)
+		}
+	}
+	if _, err := db.Exec(`INSERT INTO worker_listings (item_id, user_id, received_at) VALUES
+		('a', 1, strftime('%Y-%m-%dT%H:%M:%S', 'now')),
+		('b', 1, '2020-01-02T03:04:05'),
+		('c', 1, strftime('%Y-%m-%dT%H:%M:%S', 'now'))`); err != nil {
+		t.Fatal(err)
+	}
+	ws, err := WorkersWithStats(db)
+	if err != nil {
+		t.Fatal(err)
+	}
+	got := map[int64]WorkerStat{}
+	for _, w := range ws {
+		got[w.UserID] = w
+	}
+	if w := got[1]; w.ListingsToday != 2 || strings.Contains(w.LastListingAt, "T") || w.LastListingAt == "—" {
+		t.Fatalf("worker 1: %+v", w)
+	}
+	if w := got[2]; w.ListingsToday != 0 || w.LastListingAt != "—" {
+		t.Fatalf("worker 2: %+v", w)
+	}
+}
+
+func TestOpenWarmsPool(t *testing.T) {
+	t.Setenv("SQLITE_POOL_SIZE", "3")
+	db, err := Open(filepath.Join(t.TempDir(), "warm.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	if st := db.Stats(); st.MaxOpenConnections != 3 || st.Idle != 3 {
+		t.Fatalf("max=%d idle=%d", st.MaxOpenConnections, st.Idle)
+	}
+}
+
+func TestAddEmailsBatchCountsDuplicates(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	added, skipped := AddEmailsBatch(db, 3, [][2]string{{"a@x.com", "1"}, {"A@x.com ", "2"}, {"bad", "3"}, {"b@x.com", "4"}})
+	if added != 2 || skipped != 1 {
+		t.Fatalf("added=%d skipped=%d", added, skipped)
+	}
+	if added, skipped = AddEmailsBatch(db, 3, [][2]string{{"b@x.com", "5"}, {"c@x.com", "6"}}); added != 1 || skipped != 1 {
+		t.Fatalf("second batch: added=%d skipped=%d", added, skipped)
+	}
+	if n, _ := EmailsTotalCount(db, 3); n != 3 {
+		t.Fatalf("total=%d", n)
+	}
+}
+
+func TestAddEmailsBatchAcrossInsertChunks(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	pairs := make([][2]string, 0, emailInsertRows+10)
+	for i := 0; i < emailInsertRows+5; i++ {
+		pairs = append(pairs, [2]string{fmt.Sprintf("u%d@x.com", i), "p"})
+	}
+	pairs = append(pairs, [2]string{"u0@x.com", "dup"})
+	if added, skipped := AddEmailsBatch(db, 4, pairs); added != emailInsertRows+5 || skipped != 1 {
+		t.Fatalf("added=%d skipped=%d", added, skipped)
+	}
+}
+
+func TestWorkerListingsTodayLimit(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	if _, err := db.Exec(`INSERT INTO worker_listings (item_id, user_id, received_at) VALUES
+		('a', 1, strftime('%Y-%m-%dT%H:%M:%S', 'now')),
+		('b', 1, strftime('%Y-%m-%dT%H:%M:%S', 'now')),
+		('c', 1, strftime('%Y-%m-%dT%H:%M:%S', 'now')),
+		('d', 1, '2020-01-02T03:04:05'),
+		('e', 2, strftime('%Y-%m-%dT%H:%M:%S', 'now'))`); err != nil {
+		t.Fatal(err)
+	}
+	items, total, err := WorkerListingsToday(db, 1, 2)
+	if err != nil {
+		t.Fatal(err)
+	}
+	if len(items) != 2 || total != 3 {
+		t.Fatalf("items=%d total=%d", len(items), total)
+	}
+	if items, total, err = WorkerListingsToday(db, 3, 2); err != nil || len(items) != 0 || total != 0 {
+		t.Fatalf("empty: items=%d total=%d err=%v", len(items), total, err)
+	}
+}
+
+func TestUpsertBatchUpdatesInPlace(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	saved, err := UpsertBatch(db, []marktplaats.Listing{{ItemID: "m1", Title: "a"}, {ItemID: "m2", Title: "b"}}, nil)
+	if err != nil || saved != 2 {
+		t.Fatalf("saved=%d err=%v", saved, err)
+	}
+	var rowid int64
+	if err := db.QueryRow(`SELECT rowid FROM listings WHERE item_id = 'm1'`).Scan(&rowid); err != nil {
+		t.Fatal(err)
+	}
+	if err := Upsert(db, marktplaats.Listing{ItemID: "m1", Title: "a2"}); err != nil {
+		t.Fatal(err)
+	}
+	var n int
+	var title string
+	var rowid2 int64
+	if err := db.QueryRow(`SELECT COUNT(*) FROM listings`).Scan(&n); err != nil {
+		t.Fatal(err)
+	}
+	if err := db.QueryRow(`SELECT rowid, title FROM listings WHERE item_id = 'm1'`).Scan(&rowid2, &title); err != nil {
+		t.Fatal(err)
+	}
+	if n != 2 || title != "a2" || rowid2 != rowid {
+		t.Fatalf("n=%d title=%q rowid %d -> %d", n, title, rowid, rowid2)
+	}
+}
+
+func TestUpsertBatchChunks(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	items := []marktplaats.Listing{{ItemID: "a"}, {ItemID: "b"}, {ItemID: "c"}, {ItemID: "a", Title: "dup"}, {ItemID: "d"}}
+	saved, err := upsertBatch(db, items, 2, nil)
+	if err != nil || saved != len(items) {
+		t.Fatalf("saved=%d err=%v", saved, err)
+	}
+	var n int
+	if err := db.QueryRow(`SELECT COUNT(*) FROM listings`).Scan(&n); err != nil || n != 4 {
+		t.Fatalf("rows=%d err=%v", n, err)
+	}
+}
+
+func TestPreparedReusedAcrossCalls(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	s1, err := prepared(db, sqlRotationGet)
+	if err != nil {
+		t.Fatal(err)
+	}
+	if s2, _ := prepared(db, sqlRotationGet); s2 != s1 {
+		t.Fatal("statement prepared twice")
+	}
+	_, _ = AddEmailsBatch(db, 7, [][2]string{{"a@x.com", "1"}, {"b@x.com", "2"}})
+	for _, want := range []string{"a@x.com", "b@x.com", "a@x.com"} {
+		e, _, err := NextEmailForListing(db, 7)
+		if err != nil || e != want {
+			t.Fatalf("next=%q err=%v, want %q", e, err, want)
+		}
+		if err := SetLastEmailForListing(db, 7, e); err != nil {
+			t.Fatal(err)
+		}
+	}
+}
+
+func TestSanitize(t *testing.T) {
+	for in, want := range map[string]string{"": "", "iPhone 14": "iPhone 14", "Fiets €50": "Fiets €50", "a\xffb\xc3": "ab",
+		"x\xed\xa0\x80y": "xy"} {
+		if got := sanitize(in); got != want {
+			t.Errorf("sanitize(%q) = %q, want %q", in, got, want)
+		}
+	}
+	clean := strings.Repeat("Fiets €50 in Utrecht ", 20)
+	if n := testing.AllocsPerRun(100, func() { _ = sanitize(clean) }); n != 0 {
+		t.Fatalf("sanitize of valid text allocates: %v", n)
+	}
+}
+
+func TestListingArgsMatchColumns(t *testing.T) {
+	args := listingArgs(marktplaats.Listing{ItemID: "m1"})
+	if len(args) != len(listingColumns) || strings.Count(upsertListingSQL, "?") != len(args) {
+		t.Fatalf("args=%d columns=%d placeholders=%d", len(args), len(listingColumns), strings.Count(upsertListingSQL, "?"))
+	}
+	for i, a := range fillListingArgs(args, marktplaats.Listing{ItemID: "m2"}) {
+		if i == 0 && a != "m2" {
+			t.Fatalf("item_id arg = %v", a)
+		}
+	}
+}
+
+func TestWorkerListingsTodayUsesIndexRange(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	rows, err := db.Query(`EXPLAIN QUERY PLAN SELECT item_id FROM worker_listings
+		WHERE user_id = 1 AND received_at >= date('now') AND received_at < date('now', '+1 day')`)
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer rows.Close()
+	var plan strings.Builder
+	for rows.Next() {
+		var id, parent, notused int
+		var detail string
+		if err := rows.Scan(&id, &parent, &notused, &detail); err != nil {
+			t.Fatal(err)
+		}
+		plan.WriteString(detail)
+	}
+	if p := plan.String(); !strings.Contains(p, "idx_worker_listings_user") || !strings.Contains(p, "received_at>") {
+		t.Fatalf("plan: %s", p)
+	}
+}
+
+func TestRandomActiveEmail(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	if _, _, ok := RandomActiveEmail(db, 1); ok {
+		t.Fatal("empty table")
+	}
+	_, _ = AddEmailsBatch(db, 2, [][2]string{{"other@x.com", "0"}})
+	_, _ = AddEmailsBatch(db, 1, [][2]string{{"a@x.com", "1"}, {"b@x.com", "2"}, {"c@x.com", "3"}})
+	_ = MarkEmailBlocked(db, 1, "b@x.com")
+	seen := map[string]bool{}
+	for i := 0; i < 200; i++ {
+		e, _, ok := RandomActiveEmail(db, 1)
+		if !ok || e == "b@x.com" || e == "other@x.com" {
+			t.Fatalf("got %q ok=%v", e, ok)
+		}
+		seen[e] = true
+	}
+	if !seen["a@x.com"] || !seen["c@x.com"] {
+		t.Fatalf("not all active emails picked: %v", seen)
+	}
+}
+
+func TestRandomActiveEmailUniformAmongOtherUsers(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	// Почты воркера — сплошной блок rowid посреди чужих строк.
+	fill := func(uid int64, prefix string, n int) {
+		pairs := make([][2]string, 0, n)
+		for i := 0; i < n; i++ {
+			pairs = append(pairs, [2]string{fmt.Sprintf("%s%d@x.com", prefix, i), "p"})
+		}
+		_, _ = AddEmailsBatch(db, uid, pairs)
+	}
+	fill(2, "before", 2000)
+	fill(1, "mine", 5)
+	fill(3, "after", 2000)
+	counts := map[string]int{}
+	const draws = 1000
+	for i := 0; i < draws; i++ {
+		e, _, ok := RandomActiveEmail(db, 1)
+		if !ok || !strings.HasPrefix(e, "mine") {
+			t.Fatalf("got %q ok=%v", e, ok)
+		}
+		counts[e]++
+	}
+	for i := 0; i < 5; i++ {
+		// Ожидание 200 на почту; 100 — далеко за пределами случайного разброса.
+		if c := counts[fmt.Sprintf("mine%d@x.com", i)]; c < 100 {
+			t.Fatalf("skewed pick: %v", counts)
+		}
+	}
+}
+
+func TestEmailRotationContinuesAfterLast(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	_, _ = AddEmailsBatch(db, 1, [][2]string{{"a@x.com", "1"}, {"b@x.com", "2"}, {"c@x.com", "3"}})
+	_ = SetLastEmailForListing(db, 1, "b@x.com")
+	list, next, err := EmailRotation(db, 1)
+	if err != nil || len(list) != 3 || list[next].Email != "c@x.com" {
+		t.Fatalf("list=%v next=%d err=%v", list, next, err)
+	}
+	if e, _, _ := NextEmailForListing(db, 1); e != "c@x.com" {
+		t.Fatalf("next email %q", e)
+	}
+	_ = SetLastEmailForListing(db, 1, "c@x.com")
+	if _, next, _ := EmailRotation(db, 1); next != 0 {
+		t.Fatalf("wrap: next=%d", next)
+	}
+}
+
+func TestFormatTemplate(t *testing.T) {
+	vars := map[string]string{"name": "Bob", "price": "{name}"}
+	for in, want := range map[string]string{
+		"":                 "",
+		"plain":            "plain",
+		"Hi {name}!":       "Hi Bob!",
+		"{name}{name}":     "BobBob",
+		"{unknown} {name}": "{unknown} Bob",
+		"{{name}}":         "{Bob}",
+		"€ {price} {name":  "€ {name} {name",
+		"} {name} {":       "} Bob {",
+	} {
+		if got := FormatTemplate(in, vars); got != want {
+			t.Errorf("FormatTemplate(%q) = %q want %q", in, got, want)
+		}
+	}
+}
+
+func TestOpenMigratesOldListingsTable(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "db.sqlite")
+	db, err := Open(path)
+	if err != nil {
+		t.Fatal(err)
+	}
+	if _, err := db.Exec(`ALTER TABLE listings DROP COLUMN attributes_json`); err != nil {
+		t.Fatal(err)
+	}
+	db.Close()
+	if db, err = Open(path); err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	if err := Upsert(db, marktplaats.Listing{ItemID: "m1"}); err != nil {
+		t.Fatalf("upsert after migration: %v", err)
+	}
+}
+
+func TestDeleteUsers(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	for _, uid := range []int64{1, 2, 3} {
+		if err := AuthorizeUser(db, uid); err != nil {
+			t.Fatal(err)
+		}
+	}
+	_ = BlockUser(db, 2)
+	if _, err := db.Exec(`INSERT INTO worker_listings (item_id, user_id, received_at) VALUES ('a', 1, ''), ('b', 3, '')`); err != nil {
+		t.Fatal(err)
+	}
+	n, err := DeleteUsers(db, []int64{1, 2, 99})
+	if err != nil || n != 2 {
+		t.Fatalf("deleted=%d err=%v", n, err)
+	}
+	if IsAuthorized(db, 1) || IsBlocked(db, 2) || !IsAuthorized(db, 3) {
+		t.Fatal("wrong users removed")
+	}
+	var left int
+	_ = db.QueryRow(`SELECT COUNT(*) FROM worker_listings`).Scan(&left)
+	if left != 1 {
+		t.Fatalf("worker_listings left=%d", left)
+	}
+}
+
+func TestFilterNewItemIDs(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	if _, err := UpsertBatch(db, []marktplaats.Listing{{ItemID: "m1"}, {ItemID: "m3"}}, nil); err != nil {
+		t.Fatal(err)
+	}
+	got, err := FilterNewItemIDs(db, []string{"m4", "m1", "m2", "m3"})
+	if err != nil || strings.Join(got, ",") != "m4,m2" {
+		t.Fatalf("got=%v err=%v", got, err)
+	}
+}
+
+func TestListEmailsAfterWalksAllPages(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	// Одна пачка — один created_at у всех строк: страницы держатся на email как втором ключе.
+	_, _ = AddEmailsBatch(db, 7, [][2]string{{"a@x.com", "1"}, {"b@x.com", "2"}, {"c@x.com", "3"}, {"d@x.com", "4"}, {"e@x.com", "5"}})
+	var got []string
+	afterAt, afterEmail := "", ""
+	for {
+		page, err := ListEmailsAfter(db, 7, afterAt, afterEmail, 2)
+		if err != nil {
+			t.Fatal(err)
+		}
+		if len(page) == 0 {
+			break
+		}
+		for _, e := range page {
+			got = append(got, e.Email)
+		}
+		last := page[len(page)-1]
+		afterAt, afterEmail = last.CreatedAt, last.Email
+	}
+	if strings.Join(got, ",") != "e@x.com,d@x.com,c@x.com,b@x.com,a@x.com" {
+		t.Fatalf("got %v", got)
+	}
+	off, _ := ListEmails(db, 7, 2, 2)
+	if len(off) != 2 || off[0].Email != "c@x.com" {
+		t.Fatalf("offset page %v", off)
+	}
+}
+
+func TestListEmailsAfterUsesIndexRange(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	rows, err := db.Query("EXPLAIN QUERY PLAN "+listEmailsAfterSQL, 7, "2024-01-01 00:00:00", "a@x.com", 15)
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer rows.Close()
+	var plan strings.Builder
+	for rows.Next() {
+		var id, parent, notused int
+		var detail string
+		if err := rows.Scan(&id, &parent, &notused, &detail); err != nil {
+			t.Fatal(err)
+		}
+		plan.WriteString(detail)
+	}
+	if p := plan.String(); !strings.Contains(p, "idx_emails_user_created") || !strings.Contains(p, "(created_at,email)<") ||
+		strings.Contains(p, "TEMP B-TREE") {
+		t.Fatalf("plan: %s", p)
+	}
+}
+
+func TestMailCounts(t *testing.T) {
+	db, err := Open(filepath.Join(t.TempDir(), "db.sqlite"))
+	if err != nil {
+		t.Fatal(err)
+	}
+	defer db.Close()
+	if total, active, tpl, err := MailCounts(db, 8); err != nil || total != 0 || active != 0 || tpl != 0 {
+		t.Fatalf("empty: %d %d %d %v", total, active, tpl, err)
+	}
+	_, _ = AddEmailsBatch(db, 8, [][2]string{{"a@x.com", "1"}, {"b@x.com", "2"}})
+	_ = MarkEmailBlocked(db, 8, "a@x.com")
+	if _, err := AddEmailTemplate(db, 8, "t", "s", "body"); err != nil {
+		t.Fatal(err)
+	}
+	if total, active, tpl, err := MailCounts(db, 8); err != nil || total != 2 || active != 1 || tpl != 1 {
+		t.Fatalf("got %d %d %d %v", total, active, tpl, err)
+	}
+}
@@ -2,26 +2,50 @@ package listingsdb
 
 import (
 	"database/sql"
-	"fmt"
 	"strconv"
 	"strings"
 )
 
 // FormatTemplate подставляет {key} как в Python format_template.
+// Один проход по body: каждая {…} ищется в vars, неизвестные остаются как есть. В отличие от
+// ReplaceAll на каждую переменную, подставленные значения повторно не сканируются.
 func FormatTemplate(body string, vars map[string]string) string {
-	out := body
-	for k, v := range vars {
-		out = strings.ReplaceAll(out, "{"+k+"}", v)
+	i := strings.IndexByte(body, '{')
+	if i < 0 {
+		return body
 	}
-	return out
+	var sb strings.Builder
+	sb.Grow(len(body))
+	for i >= 0 {
+		end := strings.IndexByte(body[i+1:], '}')
+		if end < 0 {
+			break
+		}
+		end += i + 1
+		// Ближайшая «{» перед «}»: в «{{name}» подставляется только {name}.
+		if j := strings.LastIndexByte(body[i:end], '{'); j > 0 {
+			i += j
+		}
+		if v, ok := vars[body[i+1:end]]; ok {
+			sb.WriteString(body[:i])
+			sb.WriteString(v)
+		} else {
+			sb.WriteString(body[:end+1])
+		}
+		body = body[end+1:]
+		i = strings.IndexByte(body, '{')
+	}
+	sb.WriteString(body)
+	return sb.String()
 }
 
 // ActiveEmails возвращает активные почты воркера, ORDER BY email.
 func ActiveEmails(db *sql.DB, userID int64) ([]struct{ Email, Password string }, error) {
-	rows, err := db.Query(
-		`SELECT email, COALESCE(password,'') FROM emails WHERE user_id = ? AND COALESCE(blocked,0) = 0 ORDER BY email`,
-		userID,
-	)
+	st, err := prepared(db, sqlActiveEmails)
+	if err != nil {
+		return nil, err
+	}
+	rows, err := st.Query(userID)
 	if err != nil {
 		return nil, err
 	}
@@ -39,36 +63,40 @@ func ActiveEmails(db *sql.DB, userID int64) ([]struct{ Email, Password string },
 
 // NextEmailForListing round-robin по активным почтам (как get_next_email_for_listing).
 func NextEmailForListing(db *sql.DB, userID int64) (email, password string, err error) {
-	list, err := ActiveEmails(db, userID)
+	list, next, err := EmailRotation(db, userID)
 	if err != nil || len(list) == 0 {
 		return "", "", err
 	}
-	key := fmt.Sprintf("last_email_for_listing_%d", userID)
+	return list[next].Email, list[next].Password, nil
+}
+
+// EmailRotation активные почты и индекс следующей по кругу (после last_email_for_listing) —
+// для рассылки пачкой, которая дальше крутит почты в памяти.
+func EmailRotation(db *sql.DB, userID int64) (list []struct{ Email, Password string }, next int, err error) {
+	list, err = ActiveEmails(db, userID)
+	if err != nil || len(list) == 0 {
+		return nil, 0, err
+	}
 	var last string
-	_ = db.QueryRow(`SELECT value FROM rotation_state WHERE key = ?`, key).Scan(&last)
+	_ = rotationGet(db, "last_email_for_listing_", userID, &last)
 	last = strings.TrimSpace(strings.ToLower(last))
-	nextIdx := 0
 	for i, pair := range list {
 		if pair.Email == last {
-			nextIdx = (i + 1) % len(list)
-			break
+			return list, (i + 1) % len(list), nil
 		}
 	}
-	return list[nextIdx].Email, list[nextIdx].Password, nil
+	return list, 0, nil
 }
 
 // SetLastEmailForListing записывает последнюю почту для round-robin.
 func SetLastEmailForListing(db *sql.DB, userID int64, email string) error {
-	key := fmt.Sprintf("last_email_for_listing_%d", userID)
-	_, err := db.Exec(`INSERT OR REPLACE INTO rotation_state (key, value) VALUES (?, ?)`, key, strings.TrimSpace(strings.ToLower(email)))
-	return err
+	return rotationSet(db, "last_email_for_listing_", userID, strings.TrimSpace(strings.ToLower(email)))
 }
 
 // ActiveTemplateID ID активного шаблона воркера из rotation_state (устарело: рассылка крутит шаблоны по кругу).
 func ActiveTemplateID(db *sql.DB, userID int64) (int64, bool) {
-	key := fmt.Sprintf("active_template_id_%d", userID)
 	var v sql.NullString
-	if err := db.QueryRow(`SELECT value FROM rotation_state WHERE key = ?`, key).Scan(&v); err != nil || !v.Valid || v.String == "" {
+	if err := rotationGet(db, "active_template_id_", userID, &v); err != nil || !v.Valid || v.String == "" {
 		return 0, false
 	}
 	id, err := strconv.ParseInt(strings.TrimSpace(v.String), 10, 64)
@@ -80,7 +108,11 @@ func ActiveTemplateID(db *sql.DB, userID int64) (int64, bool) {
 
 // OrderedTemplateIDs id шаблонов воркера по возрастанию (порядок round-robin).
 func OrderedTemplateIDs(db *sql.DB, userID int64) ([]int64, error) {
-	rows, err := db.Query(`SELECT id FROM email_templates WHERE user_id = ? ORDER BY id`, userID)
+	st, err := prepared(db, sqlTemplateIDs)
+	if err != nil {
+		return nil, err
+	}
+	rows, err := st.Query(userID)
 	if err != nil {
 		return nil, err
 	}
@@ -98,39 +130,44 @@ func OrderedTemplateIDs(db *sql.DB, userID int64) ([]int64, error) {
 
 // NextTemplateForListing — следующий шаблон по кругу для рассылки (как NextEmailForListing).
 func NextTemplateForListing(db *sql.DB, userID int64) (templateID int64, ok bool) {
-	ids, err := OrderedTemplateIDs(db, userID)
+	ids, next, err := TemplateRotation(db, userID)
 	if err != nil || len(ids) == 0 {
 		return 0, false
 	}
-	key := fmt.Sprintf("last_template_for_listing_%d", userID)
+	return ids[next], true
+}
+
+// TemplateRotation id шаблонов воркера и индекс следующего по кругу (после last_template_for_listing).
+func TemplateRotation(db *sql.DB, userID int64) (ids []int64, next int, err error) {
+	ids, err = OrderedTemplateIDs(db, userID)
+	if err != nil || len(ids) == 0 {
+		return nil, 0, err
+	}
 	var lastStr sql.NullString
-	_ = db.QueryRow(`SELECT value FROM rotation_state WHERE key = ?`, key).Scan(&lastStr)
+	_ = rotationGet(db, "last_template_for_listing_", userID, &lastStr)
 	lastID, _ := strconv.ParseInt(strings.TrimSpace(lastStr.String), 10, 64)
-	nextIdx := 0
 	if lastID > 0 {
 		for i, id := range ids {
 			if id == lastID {
-				nextIdx = (i + 1) % len(ids)
-				break
+				return ids, (i + 1) % len(ids), nil
 			}
 		}
 	}
-	return ids[nextIdx], true
+	return ids, 0, nil
 }
 
 // SetLastTemplateForListing записывает последний использованный шаблон для round-robin.
 func SetLastTemplateForListing(db *sql.DB, userID, templateID int64) error {
-	key := fmt.Sprintf("last_template_for_listing_%d", userID)
-	_, err := db.Exec(`INSERT OR REPLACE INTO rotation_state (key, value) VALUES (?, ?)`, key, strconv.FormatInt(templateID, 10))
-	return err
+	return rotationSet(db, "last_template_for_listing_", userID, strconv.FormatInt(templateID, 10))
 }
 
 // Template возвращает (name, subject_template, body) шаблона воркера.
 func Template(db *sql.DB, templateID, userID int64) (name, subject, body string, err error) {
-	err = db.QueryRow(
-		`SELECT name, COALESCE(subject_template,''), body FROM email_templates WHERE id = ? AND user_id = ?`,
-		templateID, userID,
-	).Scan(&name, &subject, &body)
+	st, err := prepared(db, sqlTemplateByID)
+	if err != nil {
+		return "", "", "", err
+	}
+	err = st.QueryRow(templateID, userID).Scan(&name, &subject, &body)
 	if err == sql.ErrNoRows {
 		return "", "", "", nil
 	}
@@ -146,9 +183,7 @@ func EmailTemplatesCount(db *sql.DB, userID int64) (int, error) {
 
 // SetLastUsedEmail rotation_state last_used_email_{userID}.
 func SetLastUsedEmail(db *sql.DB, userID int64, email string) error {
-	key := fmt.Sprintf("last_used_email_%d", userID)
-	_, err := db.Exec(`INSERT OR REPLACE INTO rotation_state (key, value) VALUES (?, ?)`, key, strings.TrimSpace(strings.ToLower(email)))
-	return err
+	return rotationSet(db, "last_used_email_", userID, strings.TrimSpace(strings.ToLower(email)))
 }
 
 // MarkEmailBlocked blocked=1 для пары user_id + email.
@@ -159,7 +194,30 @@ func MarkEmailBlocked(db *sql.DB, userID int64, email string) error {
 
 // ActiveEmailsCount число незаблокированных почт воркера.
 func ActiveEmailsCount(db *sql.DB, userID int64) (int, error) {
+	st, err := prepared(db, sqlActiveEmailsCnt)
+	if err != nil {
+		return 0, err
+	}
 	var n int
-	err := db.QueryRow(`SELECT COUNT(*) FROM emails WHERE user_id = ? AND COALESCE(blocked,0) = 0`, userID).Scan(&n)
+	err = st.QueryRow(userID).Scan(&n)
 	return n, err
 }
+
+// rotationGet значение rotation_state по ключу prefix+userID (подготовленным запросом).
+func rotationGet(db *sql.DB, prefix string, userID int64, dest any) error {
+	st, err := prepared(db, sqlRotationGet)
+	if err != nil {
+		return err
+	}
+	return st.QueryRow(prefix + strconv.FormatInt(userID, 10)).Scan(dest)
+}
+
+// rotationSet записывает rotation_state prefix+userID = value.
+func rotationSet(db *sql.DB, prefix string, userID int64, value string) error {
+	st, err := prepared(db, sqlRotationSet)
+	if err != nil {
+		return err
+	}
+	_, err = st.Exec(prefix+strconv.FormatInt(userID, 10), value)
+	return err
+}
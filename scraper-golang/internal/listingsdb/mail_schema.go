@@ -24,17 +24,19 @@ func initMailSchema(db *sql.DB) error {
 			blocked INTEGER DEFAULT 0,
 			PRIMARY KEY (user_id, email)
 		)`,
+		// Страницы почт «новые первыми»: ORDER BY created_at DESC, email DESC без сортировки во временном B-дереве.
+		`CREATE INDEX IF NOT EXISTS idx_emails_user_created ON emails(user_id, created_at, email)`,
 	}
 	for _, q := range stmts {
 		if _, err := db.Exec(q); err != nil {
 			return err
 		}
 	}
-	// Миграция: user_id у шаблонов (старые БД)
-	if _, err := db.Exec(`ALTER TABLE email_templates ADD COLUMN user_id INTEGER`); err != nil && !isDupColumn(err) {
-		return err
-	}
-	if _, err := db.Exec(`ALTER TABLE email_templates ADD COLUMN subject_template TEXT DEFAULT ''`); err != nil && !isDupColumn(err) {
+	// Миграция шаблонов старых БД: user_id, subject_template
+	if err := addMissingColumns(db, "email_templates", [][2]string{
+		{"user_id", "INTEGER"},
+		{"subject_template", "TEXT DEFAULT ''"},
+	}); err != nil {
 		return err
 	}
 	// --- Telegram-боты (как telegram_bot/database.init_db) ---
@@ -61,8 +63,5 @@ func initMailSchema(db *sql.DB) error {
 			return err
 		}
 	}
-	if _, err := db.Exec(`ALTER TABLE users ADD COLUMN shift_active INTEGER DEFAULT 0`); err != nil && !isDupColumn(err) {
-		return err
-	}
-	return nil
+	return addMissingColumns(db, "users", [][2]string{{"shift_active", "INTEGER DEFAULT 0"}})
 }
@@ -0,0 +1,42 @@
+package listingsdb
+
+import (
+	"database/sql"
+	"sync"
+)
+
+// Запросы горячего пути рассылки (ротация почт и шаблонов) — на каждое письмо; текст SQL общий.
+const (
+	sqlRotationGet     = `SELECT value FROM rotation_state WHERE key = ?`
+	sqlRotationSet     = `INSERT OR REPLACE INTO rotation_state (key, value) VALUES (?, ?)`
+	sqlActiveEmails    = `SELECT email, COALESCE(password,'') FROM emails WHERE user_id = ? AND COALESCE(blocked,0) = 0 ORDER BY email`
+	sqlTemplateIDs     = `SELECT id FROM email_templates WHERE user_id = ? ORDER BY id`
+	sqlTemplateByID    = `SELECT name, COALESCE(subject_template,''), body FROM email_templates WHERE id = ? AND user_id = ?`
+	sqlActiveEmailsCnt = `SELECT COUNT(*) FROM emails WHERE user_id = ? AND COALESCE(blocked,0) = 0`
+)
+
+type stmtKey struct {
+	db    *sql.DB
+	query string
+}
+
+// stmts подготовленные запросы по (db, SQL): database/sql держит их подготовленными на каждом соединении пула,
+// так что повторный вызов не разбирает SQL заново. *sql.DB в процессе один и живёт до выхода — кеш не чистится.
+var stmts sync.Map // stmtKey → *sql.Stmt
+
+// prepared подготовленный запрос из кеша; при гонке лишняя копия закрывается.
+func prepared(db *sql.DB, query string) (*sql.Stmt, error) {
+	k := stmtKey{db, query}
+	if s, ok := stmts.Load(k); ok {
+		return s.(*sql.Stmt), nil
+	}
+	s, err := db.Prepare(query)
+	if err != nil {
+		return nil, err
+	}
+	if prev, loaded := stmts.LoadOrStore(k, s); loaded {
+		_ = s.Close()
+		return prev.(*sql.Stmt), nil
+	}
+	return s, nil
+}
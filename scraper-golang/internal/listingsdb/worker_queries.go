@@ -22,6 +22,20 @@ func IsAuthorized(db *sql.DB, userID int64) bool {
 	return auth == 1
 }
 
+// UserState authorized, blocked и shift_active одним запросом — вместо IsAuthorized + IsBlocked + IsShiftActive
+// на каждый апдейт бота. Неизвестный пользователь — все false.
+func UserState(db *sql.DB, userID int64) (authorized, blocked, onShift bool, err error) {
+	var auth, bl, shift int
+	err = db.QueryRow(`
+		SELECT COALESCE(u.authorized, 0), COALESCE(u.shift_active, 0),
+			EXISTS(SELECT 1 FROM blocked_users WHERE user_id = ?)
+		FROM (SELECT 1) LEFT JOIN users u ON u.user_id = ?`, userID, userID).Scan(&auth, &shift, &bl)
+	if err != nil {
+		return false, false, false, err
+	}
+	return auth == 1, bl != 0, shift != 0, nil
+}
+
 // IsBlocked пользователь в blocked_users.
 func IsBlocked(db *sql.DB, userID int64) bool {
 	var one int
@@ -49,37 +63,39 @@ func IsShiftActive(db *sql.DB, userID int64) bool {
 	return v.Int64 != 0
 }
 
-// WorkerListingToday строка для «товары сегодня».
+// WorkerListingToday строка для «товары сегодня» — только то, что выводится в сообщении.
 type WorkerListingToday struct {
-	ItemID      string
-	ReceivedAt  string
-	Title       string
-	PriceCents  sql.NullInt64
-	ListingURL  string
-	CityName    string
+	ItemID     string
+	Title      string
+	PriceCents sql.NullInt64
+	ListingURL string
 }
 
-// WorkerListingsToday товары из worker_listings за сегодня (UTC date) с JOIN listings.
-func WorkerListingsToday(db *sql.DB, userID int64) ([]WorkerListingToday, error) {
+// WorkerListingsToday первые limit товаров из worker_listings за сегодня (UTC date) с JOIN listings
+// и общее число за день (COUNT(*) OVER()) — для заголовка «Товары сегодня (N)» не нужно тянуть все строки.
+// «Сегодня» — диапазон строк ISO [date('now'), date('now','+1 day')): без date() над колонкой
+// поиск идёт по idx_worker_listings_user(user_id, received_at), а не перебором всех строк воркера.
+func WorkerListingsToday(db *sql.DB, userID int64, limit int) ([]WorkerListingToday, int, error) {
 	rows, err := db.Query(`
-		SELECT wl.item_id, COALESCE(wl.received_at,''), COALESCE(l.title,''), l.price_cents,
-		       COALESCE(l.listing_url,''), COALESCE(l.city_name,'')
+		SELECT wl.item_id, COALESCE(l.title,''), l.price_cents, COALESCE(l.listing_url,''), COUNT(*) OVER()
 		FROM worker_listings wl
 		LEFT JOIN listings l ON l.item_id = wl.item_id
-		WHERE wl.user_id = ? AND date(wl.received_at) = date('now')
-		ORDER BY wl.received_at DESC`,
-		userID)
+		WHERE wl.user_id = ? AND wl.received_at >= date('now') AND wl.received_at < date('now', '+1 day')
+		ORDER BY wl.received_at DESC
+		LIMIT ?`,
+		userID, limit)
 	if err != nil {
-		return nil, err
+		return nil, 0, err
 	}
 	defer rows.Close()
-	var out []WorkerListingToday
+	out := make([]WorkerListingToday, 0, limit)
+	var total int
 	for rows.Next() {
 		var r WorkerListingToday
-		if err := rows.Scan(&r.ItemID, &r.ReceivedAt, &r.Title, &r.PriceCents, &r.ListingURL, &r.CityName); err != nil {
-			return nil, err
+		if err := rows.Scan(&r.ItemID, &r.Title, &r.PriceCents, &r.ListingURL, &total); err != nil {
+			return nil, 0, err
 		}
 		out = append(out, r)
 	}
-	return out, rows.Err()
+	return out, total, rows.Err()
 }
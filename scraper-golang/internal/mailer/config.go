@@ -3,7 +3,9 @@ package mailer
 import (
 	"fmt"
 	"os"
+	"strconv"
 	"strings"
+	"sync"
 )
 
 // DevEnvironment: ENVIRONMENT=dev (или MP_ENVIRONMENT=dev) — как в Python: письма только на TEST_MAIL.
@@ -38,9 +40,12 @@ func testRecipient() string {
 // TestRecipient адрес для тестовых писем (dev / кнопки админ-бота).
 func TestRecipient() string { return testRecipient() }
 
-func adminChatID() string {
-	return strings.TrimSpace(os.Getenv("ADMIN_CHAT_ID"))
-}
+// adminChatID ADMIN_CHAT_ID числом; разбирается один раз (env к моменту первого уведомления уже загружен).
+// Нечисловое значение — как незаданное: Telegram всё равно отклонил бы такой chat_id.
+var adminChatID = sync.OnceValues(func() (int64, bool) {
+	id, err := strconv.ParseInt(strings.TrimSpace(os.Getenv("ADMIN_CHAT_ID")), 10, 64)
+	return id, err == nil && id != 0
+})
 
 func adminBotToken() string {
 	t := strings.TrimSpace(os.Getenv("ADMIN_BOT_TOKEN"))
@@ -4,37 +4,119 @@ import (
 	"bytes"
 	"encoding/json"
 	"fmt"
+	"html"
+	"io"
 	"net/http"
 	"strings"
+	"sync"
 	"time"
 )
 
-// NotifyAdminBlocked уведомление в Telegram как _notify_admin_email_blocked.
+// Уведомления о блокировке копятся notifyBatchWindow и уходят одним сообщением: при массовом тесте
+// или рассылке почты блокируются пачкой, и по сообщению на каждую админ-чат упирался бы в лимит Telegram.
+const (
+	notifyBatchWindow = 500 * time.Millisecond
+	notifyBatchMax    = 10
+)
+
+type blockedNote struct{ email, reason string }
+
+// noteBatcher копит уведомления и отдаёт их send одним текстом: по таймеру через notifyBatchWindow
+// после первого, сразу на notifyBatchMax или по flush.
+type noteBatcher struct {
+	mu    sync.Mutex
+	items []blockedNote
+	stop  func() bool // таймер текущей пачки; nil — таймер не заведён
+
+	send func(text string)
+	// afterFunc — таймер; nil — time.AfterFunc (тест подставляет свой).
+	afterFunc func(d time.Duration, f func()) (stop func() bool)
+}
+
+var blockedNotes = &noteBatcher{send: sendAdminHTML}
+
+// notifyClient один на процесс: соединение с api.telegram.org переиспользуется между уведомлениями.
+var notifyClient = &http.Client{Timeout: 10 * time.Second}
+
+// NotifyAdminBlocked уведомление в Telegram как _notify_admin_email_blocked (с группировкой, см. notifyBatchWindow).
 func NotifyAdminBlocked(blockedEmail, reason string) {
-	chat := adminChatID()
-	token := adminBotToken()
-	if chat == "" || token == "" {
+	if _, ok := adminChatID(); !ok || adminBotToken() == "" {
+		return
+	}
+	blockedNotes.add(blockedNote{blockedEmail, reason})
+}
+
+// flushBlockedNotes отправляет накопленное сразу; пакетные операции зовут её в конце, чтобы CLI не вышел раньше таймера.
+func flushBlockedNotes() { blockedNotes.flush() }
+
+func (nb *noteBatcher) add(n blockedNote) {
+	nb.mu.Lock()
+	nb.items = append(nb.items, n)
+	if len(nb.items) >= notifyBatchMax {
+		nb.mu.Unlock()
+		nb.flush()
 		return
 	}
-	text := fmt.Sprintf("🚫 <b>Почта заблокирована</b>\n\n%s\n\nПричина: %s", blockedEmail, reason)
-	payload := map[string]string{
-		"chat_id":    chat,
+	if nb.stop == nil {
+		if nb.afterFunc != nil {
+			nb.stop = nb.afterFunc(notifyBatchWindow, nb.flush)
+		} else {
+			nb.stop = time.AfterFunc(notifyBatchWindow, nb.flush).Stop
+		}
+	}
+	nb.mu.Unlock()
+}
+
+func (nb *noteBatcher) flush() {
+	nb.mu.Lock()
+	items := nb.items
+	nb.items = nil
+	if nb.stop != nil {
+		nb.stop()
+		nb.stop = nil
+	}
+	nb.mu.Unlock()
+	if len(items) == 0 {
+		return
+	}
+	nb.send(blockedNotesText(items))
+}
+
+func blockedNotesText(items []blockedNote) string {
+	if len(items) == 1 {
+		return fmt.Sprintf("🚫 <b>Почта заблокирована</b>\n\n%s\n\nПричина: %s",
+			html.EscapeString(items[0].email), html.EscapeString(items[0].reason))
+	}
+	var sb strings.Builder
+	fmt.Fprintf(&sb, "🚫 <b>Почты заблокированы</b> (%d)", len(items))
+	for _, it := range items {
+		fmt.Fprintf(&sb, "\n\n• %s\nПричина: %s", html.EscapeString(it.email), html.EscapeString(it.reason))
+	}
+	return sb.String()
+}
+
+func sendAdminHTML(text string) {
+	chatID, _ := adminChatID()
+	payload := map[string]any{
+		"chat_id":    chatID,
 		"text":       text,
 		"parse_mode": "HTML",
 	}
 	body, _ := json.Marshal(payload)
-	url := fmt.Sprintf("https://api.telegram.org/bot%s/sendMessage", token)
+	url := fmt.Sprintf("https://api.telegram.org/bot%s/sendMessage", adminBotToken())
 	req, err := http.NewRequest(http.MethodPost, url, bytes.NewReader(body))
 	if err != nil {
 		return
 	}
 	req.Header.Set("Content-Type", "application/json")
-	client := &http.Client{Timeout: 10 * time.Second}
-	resp, err := client.Do(req)
+	resp, err := notifyClient.Do(req)
 	if err != nil {
 		return
 	}
-	defer resp.Body.Close()
+	// Тело дочитывается: иначе keep-alive соединение не вернётся в пул и следующее
+	// уведомление снова пройдёт TCP+TLS до api.telegram.org.
+	_, _ = io.Copy(io.Discard, io.LimitReader(resp.Body, 64<<10))
+	_ = resp.Body.Close()
 }
 
 func isNetworkLikeError(err error) bool {
@@ -0,0 +1,68 @@
+package mailer
+
+import (
+	"strings"
+	"testing"
+	"time"
+)
+
+// fakeNoteTimer один ручной таймер noteBatcher: fire вызывает функцию, если таймер не остановлен.
+type fakeNoteTimer struct {
+	d       time.Duration
+	f       func()
+	stopped bool
+}
+
+func newTestBatcher() (*noteBatcher, *[]string, *[]*fakeNoteTimer) {
+	var sent []string
+	var timers []*fakeNoteTimer
+	nb := &noteBatcher{
+		send: func(text string) { sent = append(sent, text) },
+		afterFunc: func(d time.Duration, f func()) func() bool {
+			t := &fakeNoteTimer{d: d, f: f}
+			timers = append(timers, t)
+			return func() bool { was := !t.stopped; t.stopped = true; return was }
+		},
+	}
+	return nb, &sent, &timers
+}
+
+func TestNoteBatcherWindow(t *testing.T) {
+	t.Parallel()
+	nb, sent, timers := newTestBatcher()
+	for _, e := range []string{"a@x.com", "b@x.com", "c@x.com"} {
+		nb.add(blockedNote{e, "535"})
+	}
+	if len(*sent) != 0 {
+		t.Fatalf("sent before window: %v", *sent)
+	}
+	if len(*timers) != 1 || (*timers)[0].d != notifyBatchWindow {
+		t.Fatalf("timers: %d", len(*timers))
+	}
+	(*timers)[0].f() // окно истекло
+	if len(*sent) != 1 || !strings.Contains((*sent)[0], "(3)") ||
+		!strings.Contains((*sent)[0], "a@x.com") || !strings.Contains((*sent)[0], "c@x.com") {
+		t.Fatalf("sent %q", *sent)
+	}
+	// Следующая пачка заводит новый таймер; пустой flush ничего не шлёт.
+	nb.add(blockedNote{"d@x.com", "auth failed"})
+	if len(*timers) != 2 {
+		t.Fatalf("timers: %d", len(*timers))
+	}
+	nb.flush()
+	nb.flush()
+	if len(*sent) != 2 || !strings.Contains((*sent)[1], "Почта заблокирована") || !(*timers)[1].stopped {
+		t.Fatalf("sent %q", *sent)
+	}
+}
+
+func TestNoteBatcherMax(t *testing.T) {
+	t.Parallel()
+	nb, sent, timers := newTestBatcher()
+	for i := 0; i < notifyBatchMax; i++ {
+		nb.add(blockedNote{"a@x.com", "535"})
+	}
+	if len(*sent) != 1 || !(*timers)[0].stopped {
+		t.Fatalf("sent %d, timer stopped %v", len(*sent), (*timers)[0].stopped)
+	}
+}
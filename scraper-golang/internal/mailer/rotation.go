@@ -0,0 +1,68 @@
+package mailer
+
+import (
+	"database/sql"
+
+	"github.com/marktplaats-scraper/scraper-golang/internal/listingsdb"
+	"github.com/marktplaats-scraper/scraper-golang/internal/marktplaats"
+)
+
+// listingRotation round-robin почт и шаблонов одной пачки в памяти. TrySendListingEmail на каждое письмо
+// заново читает все активные почты, все id шаблонов и две записи rotation_state; пачка читает их один раз
+// и дальше только сдвигает индексы. rotation_state по-прежнему пишется после каждой удачной отправки,
+// так что следующая пачка или другой процесс продолжат с того же места.
+type listingRotation struct {
+	db     *sql.DB
+	userID int64
+
+	emails []struct{ Email, Password string }
+	ei     int
+	tplIDs []int64
+	ti     int
+}
+
+func newListingRotation(db *sql.DB, userID int64) *listingRotation {
+	r := &listingRotation{db: db, userID: userID}
+	r.reload()
+	return r
+}
+
+// reload списки и позиции из БД — как их вычислили бы NextEmailForListing / NextTemplateForListing.
+func (r *listingRotation) reload() {
+	r.emails, r.ei, _ = listingsdb.EmailRotation(r.db, r.userID)
+	r.tplIDs, r.ti, _ = listingsdb.TemplateRotation(r.db, r.userID)
+}
+
+func (r *listingRotation) template() (int64, bool) {
+	if len(r.tplIDs) == 0 {
+		return 0, false
+	}
+	return r.tplIDs[r.ti], true
+}
+
+// send как TrySendListingEmail, но почта и шаблон берутся из памяти. Удача сдвигает обе позиции;
+// NotExists и сетевые ошибки ничего не меняют — следующее объявление пойдёт с той же почтой и шаблоном,
+// как и при чтении rotation_state на каждое письмо. Заблокированная почта убирается из списка,
+// проблема с шаблоном (удалён, пуст) перечитывает шаблоны из БД.
+func (r *listingRotation) send(l marktplaats.Listing, skipRCPTVerify bool) SendResult {
+	if len(r.emails) == 0 {
+		return SendResult{SkipReason: "нет активных почт у воркера в БД"}
+	}
+	e := r.emails[r.ei]
+	res := sendSellerEmail(r.db, l, e.Email, e.Password, r.userID, skipRCPTVerify, r.template)
+	switch {
+	case res.OK:
+		r.ei = (r.ei + 1) % len(r.emails)
+		if len(r.tplIDs) > 0 {
+			r.ti = (r.ti + 1) % len(r.tplIDs)
+		}
+	case res.senderBlocked:
+		r.emails = append(r.emails[:r.ei], r.emails[r.ei+1:]...)
+		if r.ei >= len(r.emails) {
+			r.ei = 0
+		}
+	case res.templateBad:
+		r.tplIDs, r.ti, _ = listingsdb.TemplateRotation(r.db, r.userID)
+	}
+	return res
+}
@@ -0,0 +1,72 @@
+package mailer
+
+import (
+	"crypto/tls"
+	"errors"
+	"net"
+	"net/smtp"
+	"time"
+)
+
+const (
+	gmailSMTPHost = "smtp.gmail.com"
+	gmailSMTPAddr = "smtp.gmail.com:587"
+	// smtpTimeout — предел на всю SMTP-сессию (connect, STARTTLS, AUTH, DATA).
+	smtpTimeout = 15 * time.Second
+)
+
+// sendMail как smtp.SendMail, но с дедлайном на соединение: у smtp.SendMail таймаута нет, и зависший
+// connect/handshake держал кнопку бота (или воркер рассылки) сколько угодно. Ошибка по дедлайну —
+// «i/o timeout», её isNetworkLikeError считает сетевой и почту не блокирует.
+func sendMail(addr, host string, auth smtp.Auth, from string, to []string, msg []byte) error {
+	conn, err := net.DialTimeout("tcp", addr, smtpTimeout)
+	if err != nil {
+		return err
+	}
+	_ = conn.SetDeadline(time.Now().Add(smtpTimeout))
+	c, err := smtp.NewClient(conn, host)
+	if err != nil {
+		_ = conn.Close()
+		return err
+	}
+	defer c.Close()
+	if ok, _ := c.Extension("STARTTLS"); ok {
+		if err := c.StartTLS(&tls.Config{ServerName: host}); err != nil {
+			return err
+		}
+	}
+	if auth != nil {
+		// как smtp.SendMail: без AUTH письмо ушло бы неавторизованным (или молча отвергнуто позже).
+		if ok, _ := c.Extension("AUTH"); !ok {
+			return errors.New("smtp: server doesn't support AUTH")
+		}
+		if err := c.Auth(auth); err != nil {
+			return err
+		}
+	}
+	if err := c.Mail(from); err != nil {
+		return err
+	}
+	for _, rcpt := range to {
+		if err := c.Rcpt(rcpt); err != nil {
+			return err
+		}
+	}
+	w, err := c.Data()
+	if err != nil {
+		return err
+	}
+	if _, err := w.Write(msg); err != nil {
+		return err
+	}
+	if err := w.Close(); err != nil {
+		return err
+	}
+	return c.Quit()
+}
+
+// sendGmail — письмо через smtp.gmail.com:587 с app password отправителя.
+func sendGmail(senderEmail, senderPassword string, to []string, msg []byte) error {
+	auth := smtp.PlainAuth("", senderEmail, senderPassword, gmailSMTPHost)
+	return sendMail(gmailSMTPAddr, gmailSMTPHost, auth, senderEmail, to, msg)
+}
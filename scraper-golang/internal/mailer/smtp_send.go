@@ -1,13 +1,12 @@
 package mailer
 
 import (
+	"context"
 	"database/sql"
 	"fmt"
 	"mime"
-	"net/smtp"
 	"strings"
 	"time"
-	"unicode/utf8"
 
 	"github.com/marktplaats-scraper/scraper-golang/internal/listingsdb"
 	"github.com/marktplaats-scraper/scraper-golang/internal/marktplaats"
@@ -20,13 +19,21 @@ type SendResult struct {
 	Recipient  string
 	NotExists  bool
 	SkipReason string
+
+	senderBlocked bool // почта отправителя помечена blocked (ротация пачки убирает её из списка)
+	templateBad   bool // шаблона нет, он удалён или пуст (ротация пачки перечитывает шаблоны)
 }
 
+// truncateRunes первые max рун; идёт только по префиксу (описание объявления бывает на десятки КБ).
 func truncateRunes(s string, max int) string {
-	if utf8.RuneCountInString(s) <= max {
-		return s
+	n := 0
+	for pos := range s {
+		if n == max {
+			return s[:pos]
+		}
+		n++
 	}
-	return string([]rune(s)[:max])
+	return s
 }
 
 func categoryLine(l marktplaats.Listing) string {
@@ -41,11 +48,7 @@ func templateVars(l marktplaats.Listing, senderEmail string) map[string]string {
 	if i := strings.Index(senderEmail, "@"); i > 0 {
 		userName = senderEmail[:i]
 	}
-	desc := l.Description
-	r := []rune(desc)
-	if len(r) > 500 {
-		desc = string(r[:500])
-	}
+	desc := truncateRunes(l.Description, 500)
 	return map[string]string{
 		"url":         l.ListingURL,
 		"title":       l.Title,
@@ -85,6 +88,14 @@ func encodePhrase(s string) string {
 
 // SendSellerEmail одно письмо (как send_seller_email в email_sender.py).
 func SendSellerEmail(db *sql.DB, l marktplaats.Listing, senderEmail, senderPassword string, userID int64, skipRCPTVerify bool) SendResult {
+	return sendSellerEmail(db, l, senderEmail, senderPassword, userID, skipRCPTVerify, func() (int64, bool) {
+		return listingsdb.NextTemplateForListing(db, userID)
+	})
+}
+
+// sendSellerEmail nextTemplate выбирает шаблон (из rotation_state или из ротации пачки в памяти).
+func sendSellerEmail(db *sql.DB, l marktplaats.Listing, senderEmail, senderPassword string, userID int64, skipRCPTVerify bool,
+	nextTemplate func() (int64, bool)) SendResult {
 	senderEmail = strings.TrimSpace(strings.ToLower(senderEmail))
 	recipientReal := BuildSellerRecipient(l.SellerName)
 	recipient := recipientReal
@@ -98,16 +109,16 @@ func SendSellerEmail(db *sql.DB, l marktplaats.Listing, senderEmail, senderPassw
 		}
 	}
 
-	tplID, ok := listingsdb.NextTemplateForListing(db, userID)
+	tplID, ok := nextTemplate()
 	if !ok {
-		return SendResult{SkipReason: "нет шаблонов писем (добавьте хотя бы один в боте)"}
+		return SendResult{SkipReason: "нет шаблонов писем (добавьте хотя бы один в боте)", templateBad: true}
 	}
 	_, subjectTpl, bodyTpl, err := listingsdb.Template(db, tplID, userID)
 	if err != nil {
-		return SendResult{SkipReason: fmt.Sprintf("шаблон: %v", err)}
+		return SendResult{SkipReason: fmt.Sprintf("шаблон: %v", err), templateBad: true}
 	}
 	if strings.TrimSpace(bodyTpl) == "" {
-		return SendResult{SkipReason: "тело шаблона пусто"}
+		return SendResult{SkipReason: "тело шаблона пусто", templateBad: true}
 	}
 
 	vars := templateVars(l, senderEmail)
@@ -126,9 +137,7 @@ func SendSellerEmail(db *sql.DB, l marktplaats.Listing, senderEmail, senderPassw
 	msg.WriteString("\r\nMIME-Version: 1.0\r\nContent-Type: text/plain; charset=UTF-8\r\nContent-Transfer-Encoding: 8bit\r\n\r\n")
 	msg.WriteString(body)
 
-	addr := "smtp.gmail.com:587"
-	auth := smtp.PlainAuth("", senderEmail, senderPassword, "smtp.gmail.com")
-	err = smtp.SendMail(addr, auth, senderEmail, []string{recipient}, []byte(msg.String()))
+	err = sendGmail(senderEmail, senderPassword, []string{recipient}, []byte(msg.String()))
 	if err != nil {
 		s := err.Error()
 		low := strings.ToLower(s)
@@ -136,14 +145,14 @@ func SendSellerEmail(db *sql.DB, l marktplaats.Listing, senderEmail, senderPassw
 			(strings.Contains(low, "auth") && strings.Contains(low, "failed")) {
 			_ = listingsdb.MarkEmailBlocked(db, userID, senderEmail)
 			NotifyAdminBlocked(senderEmail, s)
-			return SendResult{SkipReason: "SMTP авторизация: " + s}
+			return SendResult{SkipReason: "SMTP авторизация: " + s, senderBlocked: true}
 		}
 		if isNetworkLikeError(err) {
 			return SendResult{SkipReason: "сеть (почта не блокировалась): " + s}
 		}
 		_ = listingsdb.MarkEmailBlocked(db, userID, senderEmail)
 		NotifyAdminBlocked(senderEmail, s)
-		return SendResult{SkipReason: "SMTP: " + s}
+		return SendResult{SkipReason: "SMTP: " + s, senderBlocked: true}
 	}
 
 	_ = listingsdb.SetLastUsedEmail(db, userID, senderEmail)
@@ -168,12 +177,31 @@ type BulkSendStats struct {
 
 // BulkSendListings рассылка по списку (как send_bulk_listing_emails).
 func BulkSendListings(db *sql.DB, userID int64, listings []marktplaats.Listing, delay time.Duration, skipRCPTVerify bool) BulkSendStats {
+	return bulkSendListings(context.Background(), db, userID, listings, delay, skipRCPTVerify, nil)
+}
+
+// BulkSendListingsContext как BulkSendListings, но отмена ctx останавливает рассылку между письмами
+// (в том числе посреди паузы delay); неотправленные объявления в счётчики не попадают.
+func BulkSendListingsContext(ctx context.Context, db *sql.DB, userID int64, listings []marktplaats.Listing, delay time.Duration, skipRCPTVerify bool) BulkSendStats {
+	return bulkSendListings(ctx, db, userID, listings, delay, skipRCPTVerify, nil)
+}
+
+// BulkSendListingsProgress как BulkSendListings; onProgress (если не nil) вызывается после каждого
+// объявления с текущими счётчиками и числом обработанных — прогресс идёт от самих отправок, без опроса.
+func BulkSendListingsProgress(db *sql.DB, userID int64, listings []marktplaats.Listing, delay time.Duration, skipRCPTVerify bool,
+	onProgress func(st BulkSendStats, done int)) BulkSendStats {
+	return bulkSendListings(context.Background(), db, userID, listings, delay, skipRCPTVerify, onProgress)
+}
+
+func bulkSendListings(ctx context.Context, db *sql.DB, userID int64, listings []marktplaats.Listing, delay time.Duration, skipRCPTVerify bool,
+	onProgress func(st BulkSendStats, done int)) BulkSendStats {
 	var st BulkSendStats
+	defer flushBlockedNotes()
 	if len(listings) == 0 {
 		return st
 	}
-	nMail, _ := listingsdb.ActiveEmailsCount(db, userID)
-	nTpl, _ := listingsdb.EmailTemplatesCount(db, userID)
+	rot := newListingRotation(db, userID)
+	nMail, nTpl := len(rot.emails), len(rot.tplIDs)
 	if nTpl == 0 || nMail == 0 {
 		st.Fail = len(listings)
 		if nMail == 0 {
@@ -183,9 +211,29 @@ func BulkSendListings(db *sql.DB, userID int64, listings []marktplaats.Listing,
 		}
 		return st
 	}
+	return runBulk(ctx, listings, delay, func(l marktplaats.Listing) SendResult {
+		return rot.send(l, skipRCPTVerify)
+	}, onProgress)
+}
+
+// runBulk цикл рассылки: send по каждому объявлению, onProgress после каждого (ровно один раз на каждое,
+// в том числе на последнее — done == len(listings)), пауза delay между письмами; ctx прерывает между письмами.
+func runBulk(ctx context.Context, listings []marktplaats.Listing, delay time.Duration,
+	send func(marktplaats.Listing) SendResult, onProgress func(st BulkSendStats, done int)) BulkSendStats {
+	var st BulkSendStats
 	var loggedErr bool
+	var pause *time.Timer
+	if delay > 0 {
+		pause = time.NewTimer(delay)
+		pause.Stop()
+		defer pause.Stop()
+	}
 	for i, item := range listings {
-		res := TrySendListingEmail(db, item, userID, skipRCPTVerify)
+		if ctx.Err() != nil {
+			prettylog.Warnf("рассылка прервана · обработано %d из %d", i, len(listings))
+			return st
+		}
+		res := send(item)
 		switch {
 		case res.OK:
 			st.OK++
@@ -198,8 +246,15 @@ func BulkSendListings(db *sql.DB, userID int64, listings []marktplaats.Listing,
 				loggedErr = true
 			}
 		}
-		if delay > 0 && i < len(listings)-1 {
-			time.Sleep(delay)
+		if onProgress != nil {
+			onProgress(st, i+1)
+		}
+		if pause != nil && i < len(listings)-1 {
+			pause.Reset(delay)
+			select {
+			case <-ctx.Done():
+			case <-pause.C:
+			}
 		}
 	}
 	return st
@@ -0,0 +1,52 @@
+package mailer
+
+import (
+	"context"
+	"testing"
+
+	"github.com/marktplaats-scraper/scraper-golang/internal/marktplaats"
+)
+
+func TestRunBulkProgressPerListing(t *testing.T) {
+	t.Parallel()
+	listings := []marktplaats.Listing{{ItemID: "m1"}, {ItemID: "m2"}, {ItemID: "m3"}, {ItemID: "m4"}}
+	results := map[string]SendResult{
+		"m1": {OK: true}, "m2": {NotExists: true}, "m3": {SkipReason: "SMTP: 550"}, "m4": {OK: true},
+	}
+	var done []int
+	var last BulkSendStats
+	st := runBulk(context.Background(), listings, 0, func(l marktplaats.Listing) SendResult {
+		return results[l.ItemID]
+	}, func(s BulkSendStats, n int) {
+		done = append(done, n)
+		last = s
+	})
+	if len(done) != len(listings) {
+		t.Fatalf("progress calls %v", done)
+	}
+	for i, n := range done {
+		if n != i+1 {
+			t.Fatalf("progress calls %v", done)
+		}
+	}
+	want := BulkSendStats{OK: 2, Fail: 1, NotExists: 1}
+	if st != want || last != want {
+		t.Fatalf("stats %+v, last progress %+v", st, last)
+	}
+}
+
+func TestRunBulkStopsOnCancel(t *testing.T) {
+	t.Parallel()
+	ctx, cancel := context.WithCancel(context.Background())
+	var sent int
+	st := runBulk(ctx, make([]marktplaats.Listing, 5), 0, func(marktplaats.Listing) SendResult {
+		sent++
+		if sent == 2 {
+			cancel()
+		}
+		return SendResult{OK: true}
+	}, nil)
+	if sent != 2 || st.OK != 2 {
+		t.Fatalf("sent=%d stats %+v", sent, st)
+	}
+}
@@ -4,8 +4,8 @@ import (
 	"database/sql"
 	"fmt"
 	"mime"
-	"net/smtp"
 	"strings"
+	"sync"
 
 	"github.com/marktplaats-scraper/scraper-golang/internal/listingsdb"
 )
@@ -34,9 +34,7 @@ func SendTestEmail(db *sql.DB, senderEmail, senderPassword string, userID int64,
 	msg.WriteString("\r\nMIME-Version: 1.0\r\nContent-Type: text/plain; charset=UTF-8\r\nContent-Transfer-Encoding: 8bit\r\n\r\n")
 	msg.WriteString(body)
 
-	addr := "smtp.gmail.com:587"
-	auth := smtp.PlainAuth("", senderEmail, senderPassword, "smtp.gmail.com")
-	err := smtp.SendMail(addr, auth, senderEmail, []string{to}, []byte(msg.String()))
+	err := sendGmail(senderEmail, senderPassword, []string{to}, []byte(msg.String()))
 	if err != nil {
 		s := err.Error()
 		low := strings.ToLower(s)
@@ -58,14 +56,32 @@ func SendTestEmail(db *sql.DB, senderEmail, senderPassword string, userID int64,
 	return true
 }
 
+// testAllConcurrency — сколько SMTP-проверок TestAllEmailsForAdmin держит одновременно.
+const testAllConcurrency = 10
+
 // TestAllEmailsForAdmin проверяет все почты владельца adminUserID; возвращает счётчики и список неуспешных.
+// Проверки идут параллельно (не больше testAllConcurrency): время ≈ N/limit рукопожатий SMTP вместо N.
 func TestAllEmailsForAdmin(db *sql.DB, adminUserID int64) (okN, failN int, failedEmails []string) {
 	pairs, err := listingsdb.AllEmailsForTest(db, adminUserID)
 	if err != nil {
 		return 0, 0, nil
 	}
-	for _, p := range pairs {
-		if SendTestEmail(db, p.Email, p.Password, adminUserID, "") {
+	results := make([]bool, len(pairs))
+	sem := make(chan struct{}, testAllConcurrency)
+	var wg sync.WaitGroup
+	for i, p := range pairs {
+		wg.Add(1)
+		sem <- struct{}{}
+		go func(i int, email, pass string) {
+			defer wg.Done()
+			defer func() { <-sem }()
+			results[i] = SendTestEmail(db, email, pass, adminUserID, "")
+		}(i, p.Email, p.Password)
+	}
+	wg.Wait()
+	flushBlockedNotes()
+	for i, p := range pairs {
+		if results[i] {
 			okN++
 		} else {
 			failN++
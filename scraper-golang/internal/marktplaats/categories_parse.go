@@ -164,13 +164,16 @@ func itoa(i int) string {
 	return fmt.Sprintf("%d", i)
 }
 
+// listingsCounterLabelSel — метка фильтра «Altijd» со счётчиком объявлений категории.
+const listingsCounterLabelSel = `label[for="offeredSince-Altijd"]`
+
 // ListingsCountFromHTML parses counter next to offeredSince-Altijd (Python listings_count).
 func ListingsCountFromHTML(html string) (int, error) {
 	doc, err := goquery.NewDocumentFromReader(strings.NewReader(html))
 	if err != nil {
 		return 0, err
 	}
-	label := doc.Find(`label[for="offeredSince-Altijd"]`).First()
+	label := doc.Find(listingsCounterLabelSel).First()
 	if label.Length() == 0 {
 		return 0, fmt.Errorf("метка счётчика не найдена")
 	}
@@ -25,19 +25,7 @@ func (s *Scraper) listingSlowFromSearchItem(searchRaw []byte, parent Category, m
 	listingURL := strings.TrimRight(site, "/") + vip
 	childID := int(g.Get("categoryId").Int())
 
-	var imgs []string
-	for _, pic := range g.Get("pictures").Array() {
-		u := pic.Get("extraExtraLargeUrl").String()
-		if u == "" {
-			u = pic.Get("largeUrl").String()
-		}
-		if u == "" {
-			u = pic.Get("mediumUrl").String()
-		}
-		if u != "" {
-			imgs = append(imgs, u)
-		}
-	}
+	imgs := pictureURLs(g.Get("pictures"))
 
 	countryCode := g.Get("location.countryAbbreviation").String()
 	cityName := g.Get("location.cityName").String()
@@ -49,16 +37,30 @@ func (s *Scraper) listingSlowFromSearchItem(searchRaw []byte, parent Category, m
 	}
 	sellerID := g.Get("sellerInformation.sellerId").String()
 
-	s.sleepAdaptive()
-	if err := s.navigate(listingURL); err != nil {
+	lim := s.limiter(endpointDetail)
+	lim.wait()
+	status, err := s.navigateStatus(listingURL)
+	if err != nil {
 		return Listing{}, err
 	}
-	_, _ = s.Page.WaitForSelector("#"+ListingRootID, playwright.PageWaitForSelectorOptions{
+	if status == 403 || status == 429 {
+		lim.onForbidden()
+		return Listing{}, ErrForbidden
+	}
+	// Успех для лимитера — только когда карточка реально отрисовалась; страница блокировки — как 403.
+	if _, werr := s.Page.WaitForSelector("#"+ListingRootID, playwright.PageWaitForSelectorOptions{
 		Timeout: playwright.Float(s.TimeoutMS),
 		State:   playwright.WaitForSelectorStateAttached,
-	})
+	}); werr != nil {
+		if html, _ := s.HTMLContent(); PageLooksBlocked(html) {
+			lim.onForbidden()
+			return Listing{}, ErrForbidden
+		}
+	} else {
+		lim.onSuccess()
+	}
 
-	html, err := s.HTMLContent()
+	html, err := s.fragmentHTML("#" + ListingRootID)
 	if err != nil {
 		return Listing{}, err
 	}
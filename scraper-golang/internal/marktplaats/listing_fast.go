@@ -32,19 +32,7 @@ func ListingFastFromSearchItem(raw []byte, parent Category, siteBase string, cra
 	priceType := g.Get("priceInfo.priceType").String()
 	priceCents := int(g.Get("priceInfo.priceCents").Int())
 
-	var imgs []string
-	for _, pic := range g.Get("pictures").Array() {
-		u := pic.Get("extraExtraLargeUrl").String()
-		if u == "" {
-			u = pic.Get("largeUrl").String()
-		}
-		if u == "" {
-			u = pic.Get("mediumUrl").String()
-		}
-		if u != "" {
-			imgs = append(imgs, u)
-		}
-	}
+	imgs := pictureURLs(g.Get("pictures"))
 
 	countryCode := g.Get("location.countryAbbreviation").String()
 	cityName := g.Get("location.cityName").String()
@@ -153,6 +141,39 @@ func ListingFastFromSearchItem(raw []byte, parent Category, siteBase string, cra
 	}, nil
 }
 
+// pictureURLs — самый крупный доступный размер каждой картинки: срез сразу нужной ёмкости,
+// три URL объекта читаются за один проход по его ключам.
+func pictureURLs(pics gjson.Result) []string {
+	arr := pics.Array()
+	if len(arr) == 0 {
+		return nil
+	}
+	imgs := make([]string, 0, len(arr))
+	for _, pic := range arr {
+		var xxl, large, medium string
+		pic.ForEach(func(k, v gjson.Result) bool {
+			switch k.Str {
+			case "extraExtraLargeUrl":
+				xxl = v.String()
+			case "largeUrl":
+				large = v.String()
+			case "mediumUrl":
+				medium = v.String()
+			}
+			return true
+		})
+		switch {
+		case xxl != "":
+			imgs = append(imgs, xxl)
+		case large != "":
+			imgs = append(imgs, large)
+		case medium != "":
+			imgs = append(imgs, medium)
+		}
+	}
+	return imgs
+}
+
 func stringsToSlice(r gjson.Result) []string {
 	var out []string
 	for _, x := range r.Array() {
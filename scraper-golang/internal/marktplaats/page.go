@@ -18,21 +18,24 @@ type Scraper struct {
 	// Stats заполняется при навигации и ожидании __NEXT_DATA__ (для логов длительности).
 	Stats *TimingStats
 
-	adaptiveDelay time.Duration
+	// Limits темп запросов к хосту; nil — общие лимиты процесса для BaseURL (RateLimitsFor).
+	Limits *RateLimits
 }
 
 // NewScraper returns a scraper; BaseURL defaults to marktplaats.nl (Python).
 func NewScraper(page playwright.Page) *Scraper {
 	return &Scraper{
-		Page:          page,
-		BaseURL:       BaseURL,
-		TimeoutMS:     30_000,
-		adaptiveDelay: 300 * time.Millisecond,
+		Page:      page,
+		BaseURL:   BaseURL,
+		TimeoutMS: 30_000,
 	}
 }
 
-func (s *Scraper) sleepAdaptive() {
-	time.Sleep(s.adaptiveDelay)
+func (s *Scraper) limiter(ep endpoint) *endpointLimiter {
+	if s.Limits == nil {
+		s.Limits = RateLimitsFor(s.BaseURL)
+	}
+	return s.Limits.endpoint(ep)
 }
 
 func (s *Scraper) waitNextData() error {
@@ -49,18 +52,12 @@ func (s *Scraper) waitNextData() error {
 }
 
 // NextDataText returns raw JSON inside #__NEXT_DATA__ (Python soup + execute_script fallback).
+// Один Evaluate с textContent: без отдельного QuerySelector и без раскладки, которую требует innerText.
 func (s *Scraper) NextDataText() (string, error) {
-	h, err := s.Page.QuerySelector("#" + NextDataScriptID)
-	if err == nil && h != nil {
-		txt, e := h.InnerText()
-		if e == nil && strings.TrimSpace(txt) != "" {
-			return txt, nil
-		}
-	}
-	v, err := s.Page.Evaluate(`() => {
-		const el = document.getElementById('__NEXT_DATA__');
+	v, err := s.Page.Evaluate(`(id) => {
+		const el = document.getElementById(id);
 		return el ? el.textContent : null;
-	}`)
+	}`, NextDataScriptID)
 	if err != nil {
 		return "", err
 	}
@@ -76,16 +73,40 @@ func (s *Scraper) HTMLContent() (string, error) {
 	return s.Page.Content()
 }
 
+// fragmentHTML returns outerHTML of the first element matching sel; if it is absent — whole document.
+// Разбору нужен только фрагмент, а сериализация всего DOM через канал Playwright — мегабайты на страницу.
+func (s *Scraper) fragmentHTML(sel string) (string, error) {
+	v, err := s.Page.Evaluate(`(sel) => {
+		const el = document.querySelector(sel);
+		return el ? el.outerHTML : null;
+	}`, sel)
+	if err == nil {
+		if sv, ok := v.(string); ok && sv != "" {
+			return sv, nil
+		}
+	}
+	return s.HTMLContent()
+}
+
 func (s *Scraper) navigate(u string) error {
+	_, err := s.navigateStatus(u)
+	return err
+}
+
+// navigateStatus как navigate, плюс HTTP-статус ответа (0, если Playwright его не вернул).
+func (s *Scraper) navigateStatus(u string) (int, error) {
 	t0 := time.Now()
-	_, err := s.Page.Goto(u, playwright.PageGotoOptions{
+	resp, err := s.Page.Goto(u, playwright.PageGotoOptions{
 		WaitUntil: playwright.WaitUntilStateDomcontentloaded,
 		Timeout:   playwright.Float(max(60_000, s.TimeoutMS)),
 	})
 	if s.Stats != nil {
 		s.Stats.addNav(time.Since(t0))
 	}
-	return err
+	if err != nil || resp == nil {
+		return 0, err
+	}
+	return resp.Status(), nil
 }
 
 func max(a, b float64) float64 {
@@ -0,0 +1,125 @@
+package marktplaats
+
+import (
+	"sync"
+	"time"
+)
+
+// endpoint — класс запросов к одному хосту, у каждого свой темп (выдача категорий / карточки объявлений).
+type endpoint int
+
+const (
+	endpointSearch endpoint = iota
+	endpointDetail
+)
+
+const (
+	// rateStartInterval — стартовый интервал эндпоинта (прежняя фиксированная пауза).
+	rateStartInterval = 300 * time.Millisecond
+	// rateMinInterval — нижняя граница интервала: между двумя запросами к эндпоинту не меньше.
+	rateMinInterval = 150 * time.Millisecond
+	rateMaxInterval = 10 * time.Second
+	// rateRecoverAfter — после стольких успешных запросов подряд интервал уменьшается на rateRecoverStep.
+	rateRecoverAfter = 10
+	rateRecoverStep  = 25 * time.Millisecond
+)
+
+// endpointLimiter — интервальный лимитер одного эндпоинта с AIMD:
+// 403 удваивает интервал, серия успешных запросов плавно его уменьшает.
+type endpointLimiter struct {
+	mu       sync.Mutex
+	interval time.Duration
+	next     time.Time
+	okStreak int
+
+	// now и sleep — часы; nil — time.Now и time.Sleep (тест подставляет свои).
+	now   func() time.Time
+	sleep func(time.Duration)
+}
+
+func newEndpointLimiter(interval time.Duration) *endpointLimiter {
+	return &endpointLimiter{interval: interval}
+}
+
+// wait резервирует ближайший слот эндпоинта и спит до него: не раньше чем через interval после слота
+// предыдущего запроса (в том числе чужого воркера). Эндпоинт, простоявший дольше интервала, не ждёт.
+func (l *endpointLimiter) wait() {
+	l.mu.Lock()
+	now := time.Now
+	if l.now != nil {
+		now = l.now
+	}
+	t := now()
+	at := t
+	if l.next.After(at) {
+		at = l.next
+	}
+	l.next = at.Add(l.interval)
+	sleep := l.sleep
+	l.mu.Unlock()
+	if d := at.Sub(t); d > 0 {
+		if sleep == nil {
+			sleep = time.Sleep
+		}
+		sleep(d)
+	}
+}
+
+func (l *endpointLimiter) onForbidden() {
+	l.mu.Lock()
+	defer l.mu.Unlock()
+	l.okStreak = 0
+	l.interval *= 2
+	if l.interval > rateMaxInterval {
+		l.interval = rateMaxInterval
+	}
+}
+
+func (l *endpointLimiter) onSuccess() {
+	l.mu.Lock()
+	defer l.mu.Unlock()
+	l.okStreak++
+	if l.okStreak < rateRecoverAfter {
+		return
+	}
+	l.okStreak = 0
+	l.interval -= rateRecoverStep
+	if l.interval < rateMinInterval {
+		l.interval = rateMinInterval
+	}
+}
+
+// RateLimits темп запросов к одному хосту: выдача и карточки объявлений отдельно.
+// Один экземпляр на хост разделяют все Scraper — воркеры пула и повторные попытки через другие прокси,
+// поэтому увеличенный после 403 интервал не сбрасывается новым Scraper.
+type RateLimits struct {
+	search *endpointLimiter
+	detail *endpointLimiter
+}
+
+// NewRateLimits лимитеры со стартовым интервалом.
+func NewRateLimits() *RateLimits {
+	return &RateLimits{
+		search: newEndpointLimiter(rateStartInterval),
+		detail: newEndpointLimiter(rateStartInterval),
+	}
+}
+
+var hostLimits sync.Map // siteRoot(base) -> *RateLimits
+
+// RateLimitsFor общие на процесс лимиты хоста base (пустой base — marktplaats.nl).
+func RateLimitsFor(base string) *RateLimits {
+	key := siteRoot(base)
+	if l, ok := hostLimits.Load(key); ok {
+		return l.(*RateLimits)
+	}
+	l, _ := hostLimits.LoadOrStore(key, NewRateLimits())
+	return l.(*RateLimits)
+}
+
+func (r *RateLimits) endpoint(ep endpoint) *endpointLimiter {
+	if ep == endpointDetail {
+		return r.detail
+	}
+	return r.search
+}
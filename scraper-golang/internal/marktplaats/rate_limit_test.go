@@ -0,0 +1,80 @@
+package marktplaats
+
+import (
+	"testing"
+	"time"
+)
+
+// fakeLimiter лимитер на ручных часах: sleep сдвигает время и запоминает паузу.
+func fakeLimiter(interval time.Duration) (*endpointLimiter, *time.Time, *[]time.Duration) {
+	now := time.Unix(1_700_000_000, 0)
+	var slept []time.Duration
+	l := newEndpointLimiter(interval)
+	l.now = func() time.Time { return now }
+	l.sleep = func(d time.Duration) {
+		slept = append(slept, d)
+		now = now.Add(d)
+	}
+	return l, &now, &slept
+}
+
+func TestEndpointLimiterIdleDoesNotSleep(t *testing.T) {
+	t.Parallel()
+	l, now, slept := fakeLimiter(rateStartInterval)
+	l.wait()
+	if len(*slept) != 0 {
+		t.Fatalf("first request slept %v", *slept)
+	}
+	*now = now.Add(100 * time.Millisecond)
+	l.wait()
+	if len(*slept) != 1 || (*slept)[0] != rateStartInterval-100*time.Millisecond {
+		t.Fatalf("back-to-back slept %v", *slept)
+	}
+	*now = now.Add(2 * rateStartInterval) // эндпоинт простаивал дольше интервала
+	l.wait()
+	if len(*slept) != 1 {
+		t.Fatalf("idle endpoint slept %v", *slept)
+	}
+}
+
+func TestEndpointLimiterAIMD(t *testing.T) {
+	t.Parallel()
+	l, _, slept := fakeLimiter(rateStartInterval)
+	l.onForbidden()
+	if l.interval != 2*rateStartInterval {
+		t.Fatalf("after 403: %v", l.interval)
+	}
+	l.wait()
+	l.wait()
+	if len(*slept) != 1 || (*slept)[0] != 2*rateStartInterval {
+		t.Fatalf("slept %v", *slept)
+	}
+	for i := 0; i < 20; i++ {
+		l.onForbidden()
+	}
+	if l.interval != rateMaxInterval {
+		t.Fatalf("cap: %v", l.interval)
+	}
+
+	l.interval = rateStartInterval
+	for i := 0; i < rateRecoverAfter-1; i++ {
+		l.onSuccess()
+	}
+	l.onForbidden() // 403 обнуляет серию успехов
+	for i := 0; i < rateRecoverAfter-1; i++ {
+		l.onSuccess()
+	}
+	if l.interval != 2*rateStartInterval {
+		t.Fatalf("recovered before %d successes: %v", rateRecoverAfter, l.interval)
+	}
+	l.onSuccess()
+	if l.interval != 2*rateStartInterval-rateRecoverStep {
+		t.Fatalf("after %d successes: %v", rateRecoverAfter, l.interval)
+	}
+	for i := 0; i < 100*rateRecoverAfter; i++ {
+		l.onSuccess()
+	}
+	if l.interval != rateMinInterval {
+		t.Fatalf("floor: %v", l.interval)
+	}
+}
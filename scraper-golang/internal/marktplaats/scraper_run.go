@@ -12,12 +12,44 @@ import (
 	"github.com/marktplaats-scraper/scraper-golang/internal/prettylog"
 )
 
-func listingURLFromRow(g gjson.Result, base string) string {
-	site := base
-	if site == "" {
-		site = BaseURL
+// searchRowHead — поля строки выдачи, нужные циклу GetListings до построения Listing.
+type searchRowHead struct {
+	itemID     string
+	title      string
+	date       string
+	vipURL     string
+	priceCents int
+	categoryID int
+}
+
+// readSearchRowHead собирает поля за один проход по ключам объекта вместо отдельного Get на каждое поле.
+func readSearchRowHead(row gjson.Result) searchRowHead {
+	var h searchRowHead
+	row.ForEach(func(k, v gjson.Result) bool {
+		switch k.Str {
+		case "itemId":
+			h.itemID = v.String()
+		case "title":
+			h.title = v.String()
+		case "date":
+			h.date = v.String()
+		case "vipUrl":
+			h.vipURL = v.String()
+		case "priceInfo":
+			h.priceCents = int(v.Get("priceCents").Int())
+		case "categoryId":
+			h.categoryID = int(v.Int())
+		}
+		return true
+	})
+	return h
+}
+
+func siteRoot(base string) string {
+	if base == "" {
+		base = BaseURL
 	}
-	return strings.TrimRight(site, "/") + g.Get("vipUrl").String()
+	return strings.TrimRight(base, "/")
 }
 
 // GetListingsOptions mirrors Python get_listings kwargs.
@@ -26,6 +58,10 @@ type GetListingsOptions struct {
 	MaxAgeHours *float64 // slow path: ErrListingTooOld → caller wraps CategoryStaleError
 	SkipCount   bool
 	ExistingIDs map[string]struct{}
+	// FilterNewIDs если задан — item_id каждой страницы выдачи сверяются с базой одним вызовом
+	// (возвращает ещё не сохранённые), уже сохранённые попадают в карту дубликатов. Тогда ExistingIDs
+	// не нужно заполнять всеми id базы.
+	FilterNewIDs func(ids []string) []string
 	// ItemIDsMu + общая ExistingIDs: параллельные воркеры используют одну карту id (без копии).
 	ItemIDsMu *sync.Mutex
 	// AuditMu защищает AuditTrail при параллельном скрапе.
@@ -45,6 +81,16 @@ func appendListingAudit(opt *GetListingsOptions, row ListingAuditRow) {
 	*opt.AuditTrail = append(*opt.AuditTrail, row)
 }
 
+// appendListingAuditf — как appendListingAudit, но Status форматируется только при включённом аудите
+// (без аудита Sprintf на каждой пропущенной строке выдачи не выполняется).
+func appendListingAuditf(opt *GetListingsOptions, row ListingAuditRow, format string, a ...any) {
+	if opt == nil || opt.AuditTrail == nil {
+		return
+	}
+	row.Status = fmt.Sprintf(format, a...)
+	appendListingAudit(opt, row)
+}
+
 // GetParentCategories loads homepage and parses categories (HTML then __CONFIG__).
 func (s *Scraper) GetParentCategories() ([]Category, error) {
 	if err := s.navigate(s.BaseURL); err != nil {
@@ -111,13 +157,39 @@ func (s *Scraper) ListingsCount(cat Category) (int, error) {
 		Timeout: playwright.Float(s.TimeoutMS),
 		State:   playwright.WaitForSelectorStateAttached,
 	})
-	html, err := s.HTMLContent()
+	html, err := s.fragmentHTML(listingsCounterLabelSel)
 	if err != nil {
 		return 0, err
 	}
 	return ListingsCountFromHTML(html)
 }
 
+// markStoredIDs добавляет в itemIDs id строк страницы, которые filterNew не вернул (уже в базе).
+func markStoredIDs(arr []gjson.Result, filterNew func([]string) []string, itemIDs map[string]struct{}, mu *sync.Mutex) {
+	ids := make([]string, 0, len(arr))
+	for _, row := range arr {
+		if id := row.Get("itemId").String(); id != "" {
+			ids = append(ids, id)
+		}
+	}
+	if len(ids) == 0 {
+		return
+	}
+	fresh := make(map[string]struct{}, len(ids))
+	for _, id := range filterNew(ids) {
+		fresh[id] = struct{}{}
+	}
+	if mu != nil {
+		mu.Lock()
+		defer mu.Unlock()
+	}
+	for _, id := range ids {
+		if _, ok := fresh[id]; !ok {
+			itemIDs[id] = struct{}{}
+		}
+	}
+}
+
 // GetListings walks subcategories / parent, paginates search pages, builds listings (Python get_listings).
 func (s *Scraper) GetListings(parent Category, limit int, opt GetListingsOptions) ([]Listing, error) {
 	mu := opt.ItemIDsMu
@@ -170,6 +242,9 @@ func (s *Scraper) GetListings(parent Category, limit int, opt GetListingsOptions
 	}
 
 	var out []Listing
+	fast := s.Fast
+	site := siteRoot(s.BaseURL)
+	searchLimit := s.limiter(endpointSearch)
 
 outer:
 	for _, cat := range categories {
@@ -179,7 +254,7 @@ outer:
 		catSlug := slugFromURL(categoryURL)
 
 		for len(out) < maxListings {
-			s.sleepAdaptive()
+			searchLimit.wait()
 			u := categoryURLWithPage(categoryURL, pageNum)
 			if err := s.navigate(u); err != nil {
 				return out, err
@@ -194,39 +269,48 @@ outer:
 			if strings.TrimSpace(nd) == "" {
 				html, _ := s.HTMLContent()
 				if PageLooksBlocked(html) {
+					searchLimit.onForbidden()
 					return out, ErrForbidden
 				}
 				return out, ErrNextDataMissing
 			}
 
+			// gjson не строит дерево: берём только нужные поддеревья pageProps как срезы исходной строки.
 			props := gjson.Get(nd, "props.pageProps")
-			if props.Get("errorStatusCode").Exists() {
-				code := int(props.Get("errorStatusCode").Int())
+			if esc := props.Get("errorStatusCode"); esc.Exists() {
+				code := int(esc.Int())
 				if code == 403 {
+					searchLimit.onForbidden()
 					return out, ErrForbidden
 				}
 				prettylog.Pagef("категория «%s» недоступна · HTTP %d", catSlug, code)
 				break
 			}
 
+			searchLimit.onSuccess()
+
 			arr := props.Get("searchRequestAndResponse.listings").Array()
 			if len(arr) == 0 {
 				break
 			}
 
+			if opt.FilterNewIDs != nil {
+				markStoredIDs(arr, opt.FilterNewIDs, itemIDs, mu)
+			}
+
 			var pageBatch []Listing
 			for _, row := range arr {
 				if len(out) >= maxListings {
 					break outer
 				}
 
-				raw := []byte(row.Raw)
-				gRow := gjson.ParseBytes(raw)
-				itemID := gRow.Get("itemId").String()
-				titleRow := FormatText(gRow.Get("title").String())
-				dateRow := gRow.Get("date").String()
-				priceRow := int(gRow.Get("priceInfo.priceCents").Int())
-				urlRow := listingURLFromRow(gRow, s.BaseURL)
+				// row уже разобран при обходе массива — повторный ParseBytes не нужен.
+				head := readSearchRowHead(row)
+				itemID := head.itemID
+				titleRow := FormatText(head.title)
+				dateRow := head.date
+				priceRow := head.priceCents
+				urlRow := site + head.vipURL
 
 				if len(itemID) > 0 && itemID[0:1] == AdItemIDPrefix {
 					appendListingAudit(&opt, ListingAuditRow{
@@ -259,49 +343,51 @@ outer:
 					mu.Unlock()
 				}
 
-				childID := int(gRow.Get("categoryId").Int())
+				childID := head.categoryID
 				if len(categories) > 1 && childID != categoryID {
 					return out, &UnexpectedCategoryIDError{Got: childID, Want: categoryID}
 				}
 
 				var listing Listing
 				var le error
-				if s.Fast {
-					listing, le = ListingFastFromSearchItem(raw, parent, s.BaseURL, utcISO8601(), opt.MaxAgeHours)
+				if fast {
+					listing, le = ListingFastFromSearchItem([]byte(row.Raw), parent, s.BaseURL, utcISO8601(), opt.MaxAgeHours)
 					if le != nil {
 						var too *ListingTooOldDetails
 						if errors.As(le, &too) {
 							// В fast, как раньше: старое объявление пропускаем, категорию не рвём (в slow — CategoryStale).
-							appendListingAudit(&opt, ListingAuditRow{
+							appendListingAuditf(&opt, ListingAuditRow{
 								ItemID: too.ItemID, Title: too.Title, ListingURL: too.ListingURL, PriceCents: priceRow,
 								ListedTSRaw: too.ListedTS, Passed: false,
-								Status: fmt.Sprintf("старше порога (%.1f ч > %.1f ч), пропуск", too.AgeHours, too.MaxHours),
-							})
+							}, "старше порога (%.1f ч > %.1f ч), пропуск", too.AgeHours, too.MaxHours)
 							continue
 						}
-						appendListingAudit(&opt, ListingAuditRow{
+						appendListingAuditf(&opt, ListingAuditRow{
 							ItemID: itemID, Title: titleRow, ListingURL: urlRow, PriceCents: priceRow,
-							ListedTSRaw: dateRow, Passed: false, Status: fmt.Sprintf("ошибка: %v", le),
-						})
+							ListedTSRaw: dateRow, Passed: false,
+						}, "ошибка: %v", le)
 						prettylog.Pagef("разбор объявления %q · %v", itemID, le)
 						continue
 					}
 				} else {
-					listing, le = s.listingSlowFromSearchItem(raw, parent, opt.MaxAgeHours)
+					listing, le = s.listingSlowFromSearchItem([]byte(row.Raw), parent, opt.MaxAgeHours)
 					if le != nil {
 						var too *ListingTooOldDetails
 						if errors.As(le, &too) {
-							appendListingAudit(&opt, ListingAuditRow{
+							appendListingAuditf(&opt, ListingAuditRow{
 								ItemID: too.ItemID, Title: too.Title, ListingURL: too.ListingURL, PriceCents: priceRow,
 								ListedTSRaw: too.ListedTS, Passed: false,
-								Status: fmt.Sprintf("старше порога (%.1f ч > %.1f ч)", too.AgeHours, too.MaxHours),
-							})
+							}, "старше порога (%.1f ч > %.1f ч)", too.AgeHours, too.MaxHours)
 							return out, &CategoryStaleError{Listings: out, Msg: le.Error()}
 						}
-						appendListingAudit(&opt, ListingAuditRow{
+						if errors.Is(le, ErrForbidden) {
+							// Блок на карточке — как на выдаче: вызывающий меняет прокси, лимитер уже замедлен.
+							return out, le
+						}
+						appendListingAuditf(&opt, ListingAuditRow{
 							ItemID: itemID, Title: titleRow, ListingURL: urlRow, PriceCents: priceRow,
-							ListedTSRaw: dateRow, Passed: false, Status: fmt.Sprintf("ошибка: %v", le),
-						})
+							ListedTSRaw: dateRow, Passed: false,
+						}, "ошибка: %v", le)
 						prettylog.Pagef("пропуск объявления %q · %v", itemID, le)
 						maxListings--
 						if maxListings < 1 {
@@ -0,0 +1,75 @@
+package prettylog
+
+import (
+	"io"
+	"os"
+	"strconv"
+	"sync"
+	"time"
+)
+
+// pageBatchSize — сколько строк СТРАНИЦА копится перед одной записью в stdout. Скрап пишет их на каждое
+// проблемное объявление, и сотни write подряд из нескольких воркеров заметно тормозят цикл.
+// PRETTYLOG_PAGE_BATCH=1 возвращает построчный вывод.
+var pageBatchSize = envInt("PRETTYLOG_PAGE_BATCH", 32)
+
+// pageFlushAfter — дольше этого накопленные строки не ждут (скрап затих — лог всё равно виден).
+const pageFlushAfter = time.Second
+
+var (
+	outMu     sync.Mutex
+	pageBuf   []byte
+	pageN     int
+	pageTimer *time.Timer
+
+	// lineOut — куда emit пишет строки (тест подменяет); под outMu.
+	lineOut io.Writer = os.Stdout
+)
+
+func envInt(key string, def int) int {
+	if n, err := strconv.Atoi(os.Getenv(key)); err == nil && n > 0 {
+		return n
+	}
+	return def
+}
+
+// emit пишет готовую строку; batched-строки копятся, любая другая сначала выталкивает накопленное,
+// чтобы порядок в логе не менялся.
+func emit(s string, batched bool) {
+	outMu.Lock()
+	defer outMu.Unlock()
+	if batched && pageBatchSize > 1 {
+		pageBuf = append(pageBuf, s...)
+		pageN++
+		if pageN >= pageBatchSize {
+			flushLocked()
+			return
+		}
+		if pageN == 1 {
+			if pageTimer == nil {
+				pageTimer = time.AfterFunc(pageFlushAfter, Flush)
+			} else {
+				pageTimer.Reset(pageFlushAfter)
+			}
+		}
+		return
+	}
+	flushLocked()
+	_, _ = io.WriteString(lineOut, s)
+}
+
+func flushLocked() {
+	if pageN == 0 {
+		return
+	}
+	_, _ = lineOut.Write(pageBuf)
+	pageBuf = pageBuf[:0]
+	pageN = 0
+}
+
+// Flush выталкивает накопленные строки СТРАНИЦА (перед таблицами, выходом из процесса).
+func Flush() {
+	outMu.Lock()
+	flushLocked()
+	outMu.Unlock()
+}
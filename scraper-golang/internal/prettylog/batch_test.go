@@ -0,0 +1,45 @@
+package prettylog
+
+import (
+	"strings"
+	"testing"
+)
+
+// writeLog запоминает каждый Write отдельно: одна запись — один системный вызов в stdout.
+type writeLog struct{ writes []string }
+
+func (w *writeLog) Write(p []byte) (int, error) {
+	w.writes = append(w.writes, string(p))
+	return len(p), nil
+}
+
+// Не Parallel: тест подменяет общий вывод и размер пачки.
+func TestEmitBatchesPageLines(t *testing.T) {
+	w := &writeLog{}
+	outMu.Lock()
+	prevOut, prevSize := lineOut, pageBatchSize
+	lineOut, pageBatchSize = w, 3
+	outMu.Unlock()
+	defer func() {
+		Flush()
+		outMu.Lock()
+		lineOut, pageBatchSize = prevOut, prevSize
+		outMu.Unlock()
+	}()
+
+	emit("p1\n", true)
+	emit("p2\n", true)
+	if len(w.writes) != 0 {
+		t.Fatalf("written before batch is full: %q", w.writes)
+	}
+	emit("p3\n", true) // граница пачки — одна запись
+	emit("p4\n", true)
+	emit("info\n", false) // обычная строка сначала выталкивает p4
+	emit("p5\n", true)
+	Flush() // финальный сброс
+	Flush()
+	want := []string{"p1\np2\np3\n", "p4\n", "info\n", "p5\n"}
+	if strings.Join(w.writes, "|") != strings.Join(want, "|") {
+		t.Fatalf("writes %q, want %q", w.writes, want)
+	}
+}
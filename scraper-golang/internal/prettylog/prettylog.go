@@ -2,6 +2,7 @@
 package prettylog
 
 import (
+	"bufio"
 	"fmt"
 	"os"
 	"strings"
@@ -76,13 +77,28 @@ func timestamp() string {
 }
 
 // line печатает: время │ ТЕГ │ основной текст [· приглушённые детали]
-func line(tagStyled, msg string, detail string) {
-	sep := dim("│")
-	fmt.Fprintf(os.Stdout, "%s %s %s %s", timestamp(), sep, tagStyled, msg)
+// Строка собирается целиком и пишется одним вызовом: меньше системных вызовов в горячем цикле
+// и строки параллельных воркеров не перемешиваются.
+func line(tagStyled, msg string, detail string) { emit(formatLine(tagStyled, msg, detail), false) }
+
+func formatLine(tagStyled, msg string, detail string) string {
+	var b strings.Builder
+	b.Grow(len(msg) + len(detail) + 64)
+	b.WriteString(timestamp())
+	b.WriteByte(' ')
+	b.WriteString(dim("│"))
+	b.WriteByte(' ')
+	b.WriteString(tagStyled)
+	b.WriteByte(' ')
+	b.WriteString(msg)
 	if detail != "" {
-		fmt.Fprintf(os.Stdout, " %s %s", dim("·"), dim(detail))
+		b.WriteByte(' ')
+		b.WriteString(dim("·"))
+		b.WriteByte(' ')
+		b.WriteString(dim(detail))
 	}
-	fmt.Fprintln(os.Stdout)
+	b.WriteByte('\n')
+	return b.String()
 }
 
 // --- Публичные теги ---
@@ -96,7 +112,8 @@ func Browserf(format string, a ...any) { Browser(fmt.Sprintf(format, a...), "")
 func Scrape(msg, detail string) { line(green(padTag("СКРАП")), msg, detail) }
 func Scrapef(format string, a ...any) { Scrape(fmt.Sprintf(format, a...), "") }
 
-func Page(msg, detail string) { line(magenta(padTag("СТРАНИЦА")), msg, detail) }
+// Page — строки пачками по pageBatchSize (см. batch.go).
+func Page(msg, detail string) { emit(formatLine(magenta(padTag("СТРАНИЦА")), msg, detail), true) }
 func Pagef(format string, a ...any) { Page(fmt.Sprintf(format, a...), "") }
 
 // Admin — события Telegram-админбота (кнопки, сообщения, исходящие действия).
@@ -120,6 +137,7 @@ func PlaywrightWarn(msg string) {
 
 // Fatal печатает строку ОШИБКА в stderr и завершает процесс.
 func Fatal(msg string) {
+	Flush()
 	sep := dim("│")
 	tag := red(padTag("ОШИБКА"))
 	if colorOn {
@@ -136,6 +154,7 @@ func Fatalf(format string, a ...any) {
 
 // Section — визуальный разделитель с заголовком.
 func Section(title string) {
+	Flush()
 	w := 56
 	rule := dim(strings.Repeat("─", w))
 	fmt.Fprintln(os.Stdout, rule)
@@ -145,6 +164,7 @@ func Section(title string) {
 
 // Banner — стартовая плашка.
 func Banner(title, subtitle string) {
+	Flush()
 	top := dim("╭" + strings.Repeat("─", 54) + "╮")
 	mid := dim("│")
 	bot := dim("╰" + strings.Repeat("─", 54) + "╯")
@@ -166,40 +186,56 @@ type ResultRow struct {
 	TimeLine string // дата публикации и возраст (если пусто — строка в таблице не выводится)
 }
 
+// tableBufSize — буфер вывода таблиц: по 5–6 Fprintf на строку таблицы уходят в stdout
+// несколькими крупными write вместо тысяч мелких.
+const tableBufSize = 64 << 10
+
+func newTableWriter() *bufio.Writer {
+	Flush()
+	return bufio.NewWriterSize(os.Stdout, tableBufSize)
+}
+
 // ScrapeTable красиво печатает собранные объявления.
 func ScrapeTable(rows []ResultRow) {
 	if len(rows) == 0 {
 		Warn("объявлений нет", "")
 		return
 	}
-	fmt.Fprintln(os.Stdout)
+	w := newTableWriter()
+	defer w.Flush()
+	fmt.Fprintln(w)
 	title := fmt.Sprintf("Итог: %d объявлений", len(rows))
-	fmt.Fprintln(os.Stdout, green(bold("▶ "+title)))
+	fmt.Fprintln(w, green(bold("▶ "+title)))
 	rule := dim(strings.Repeat("─", 58))
-	fmt.Fprintln(os.Stdout, rule)
+	fmt.Fprintln(w, rule)
 	for _, r := range rows {
-		t := r.Title
-		if utf8.RuneCountInString(t) > 42 {
-			t = string([]rune(t)[:41]) + "…"
-		}
-		fmt.Fprintf(os.Stdout, "  %s %s%s\n", dim(fmt.Sprintf("%2d.", r.N)), bold(fmt.Sprintf("%-14s", truncateRunes(r.ID, 14))), ansiReset)
-		fmt.Fprintf(os.Stdout, "     %s %s%s\n", cyan(fmt.Sprintf("€%.2f", r.EUR)), ansiReset, t)
+		t := truncateRunes(r.Title, 42)
+		fmt.Fprintf(w, "  %s %s%s\n", dim(fmt.Sprintf("%2d.", r.N)), bold(fmt.Sprintf("%-14s", truncateRunes(r.ID, 14))), ansiReset)
+		fmt.Fprintf(w, "     %s %s%s\n", cyan(fmt.Sprintf("€%.2f", r.EUR)), ansiReset, t)
 		if strings.TrimSpace(r.TimeLine) != "" {
-			fmt.Fprintf(os.Stdout, "     %s %s%s\n", dim("опубликовано ·"), yellow(r.TimeLine), ansiReset)
+			fmt.Fprintf(w, "     %s %s%s\n", dim("опубликовано ·"), yellow(r.TimeLine), ansiReset)
 		}
-		fmt.Fprintf(os.Stdout, "     %s%s\n", dim("↳ "), dim(r.URL))
-		fmt.Fprintln(os.Stdout)
+		fmt.Fprintf(w, "     %s%s\n", dim("↳ "), dim(r.URL))
+		fmt.Fprintln(w)
 	}
-	fmt.Fprintln(os.Stdout, rule)
-	fmt.Fprintln(os.Stdout, dim("  конец списка"))
-	fmt.Fprintln(os.Stdout)
+	fmt.Fprintln(w, rule)
+	fmt.Fprintln(w, dim("  конец списка"))
+	fmt.Fprintln(w)
 }
 
+// truncateRunes не длиннее max рун («…» вместо хвоста); проход только по префиксу, без копии в []rune.
 func truncateRunes(s string, max int) string {
-	if utf8.RuneCountInString(s) <= max {
-		return s
+	n, cutAt := 0, 0
+	for pos := range s {
+		if n == max-1 {
+			cutAt = pos
+		}
+		if n == max {
+			return s[:cutAt] + "…"
+		}
+		n++
 	}
-	return string([]rune(s)[:max-1]) + "…"
+	return s
 }
 
 // ScrapedListingAudit строка ленты: время + проходит ли порог / статус.
@@ -216,41 +252,40 @@ type ScrapedListingAudit struct {
 
 // ScrapedListingsAuditTable всегда выводит таблицу просмотренных объявлений (даже если итог пустой).
 func ScrapedListingsAuditTable(rows []ScrapedListingAudit) {
-	fmt.Fprintln(os.Stdout)
+	w := newTableWriter()
+	defer w.Flush()
+	fmt.Fprintln(w)
 	title := "Лента объявлений (время · проходит · статус)"
-	fmt.Fprintln(os.Stdout, cyan(bold("▶ "+title)))
+	fmt.Fprintln(w, cyan(bold("▶ "+title)))
 	rule := dim(strings.Repeat("─", 62))
-	fmt.Fprintln(os.Stdout, rule)
+	fmt.Fprintln(w, rule)
 	if len(rows) == 0 {
-		fmt.Fprintln(os.Stdout, dim("  (ни одной строки выдачи не разобрано — проверьте лимит/категорию/ошибки выше)"))
-		fmt.Fprintln(os.Stdout, rule)
-		fmt.Fprintln(os.Stdout)
+		fmt.Fprintln(w, dim("  (ни одной строки выдачи не разобрано — проверьте лимит/категорию/ошибки выше)"))
+		fmt.Fprintln(w, rule)
+		fmt.Fprintln(w)
 		return
 	}
 	for _, r := range rows {
-		t := r.Title
-		if utf8.RuneCountInString(t) > 38 {
-			t = string([]rune(t)[:37]) + "…"
-		}
+		t := truncateRunes(r.Title, 38)
 		passCol := red("нет")
 		if r.Passed {
 			passCol = green("да")
 		}
-		fmt.Fprintf(os.Stdout, "  %s %s%s\n", dim(fmt.Sprintf("%2d.", r.N)), bold(truncateRunes(r.ID, 14)), ansiReset)
+		fmt.Fprintf(w, "  %s %s%s\n", dim(fmt.Sprintf("%2d.", r.N)), bold(truncateRunes(r.ID, 14)), ansiReset)
 		if strings.TrimSpace(t) != "" {
-			fmt.Fprintf(os.Stdout, "     %s%s\n", dim(t), ansiReset)
+			fmt.Fprintf(w, "     %s%s\n", dim(t), ansiReset)
 		}
-		fmt.Fprintf(os.Stdout, "     %s  %s  %s%s\n", passCol, dim("проходит ·"), dim(r.Status), ansiReset)
+		fmt.Fprintf(w, "     %s  %s  %s%s\n", passCol, dim("проходит ·"), dim(r.Status), ansiReset)
 		if strings.TrimSpace(r.TimeLine) != "" {
-			fmt.Fprintf(os.Stdout, "     %s %s%s\n", dim("время ·"), yellow(r.TimeLine), ansiReset)
+			fmt.Fprintf(w, "     %s %s%s\n", dim("время ·"), yellow(r.TimeLine), ansiReset)
 		}
 		if strings.TrimSpace(r.Price) != "" {
-			fmt.Fprintf(os.Stdout, "     %s%s\n", cyan(r.Price), ansiReset)
+			fmt.Fprintf(w, "     %s%s\n", cyan(r.Price), ansiReset)
 		}
-		fmt.Fprintf(os.Stdout, "     %s%s\n", dim("↳ "), dim(r.URL))
-		fmt.Fprintln(os.Stdout)
+		fmt.Fprintf(w, "     %s%s\n", dim("↳ "), dim(r.URL))
+		fmt.Fprintln(w)
 	}
-	fmt.Fprintln(os.Stdout, rule)
-	fmt.Fprintf(os.Stdout, "  %s\n", dim(fmt.Sprintf("всего строк в ленте: %d", len(rows))))
-	fmt.Fprintln(os.Stdout)
+	fmt.Fprintln(w, rule)
+	fmt.Fprintf(w, "  %s\n", dim(fmt.Sprintf("всего строк в ленте: %d", len(rows))))
+	fmt.Fprintln(w)
 }
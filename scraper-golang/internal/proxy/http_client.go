@@ -11,6 +11,28 @@ import (
 	xproxy "golang.org/x/net/proxy"
 )
 
+// Пул соединений транспорта: боты шлют несколько запросов к api.telegram.org параллельно
+// (колбэки, правки, long-poll), а у http.DefaultTransport на хост держится всего 2 простаивающих
+// соединения — остальные каждый раз заново проходят TCP+TLS (через прокси — ещё и CONNECT/SOCKS).
+const (
+	maxIdleConnsPerHost = 8
+	idleConnTimeout     = 90 * time.Second
+	tlsHandshakeTimeout = 15 * time.Second
+)
+
+func newTransport() *http.Transport {
+	d := &net.Dialer{Timeout: 30 * time.Second, KeepAlive: 30 * time.Second}
+	return &http.Transport{
+		DialContext:         d.DialContext,
+		TLSClientConfig:     &tls.Config{MinVersion: tls.VersionTLS12},
+		ForceAttemptHTTP2:   true,
+		MaxIdleConns:        4 * maxIdleConnsPerHost,
+		MaxIdleConnsPerHost: maxIdleConnsPerHost,
+		IdleConnTimeout:     idleConnTimeout,
+		TLSHandshakeTimeout: tlsHandshakeTimeout,
+	}
+}
+
 // HTTPClient возвращает клиент с прямым доступом или через тот же прокси, что и Playwright (HTTP / SOCKS5).
 // entry == nil — без прокси.
 func HTTPClient(entry *Entry, timeout time.Duration) (*http.Client, error) {
@@ -18,17 +40,10 @@ func HTTPClient(entry *Entry, timeout time.Duration) (*http.Client, error) {
 		timeout = 90 * time.Second
 	}
 	if entry == nil || entry.Server == "" {
-		return &http.Client{
-			Timeout: timeout,
-			Transport: &http.Transport{
-				TLSClientConfig: &tls.Config{MinVersion: tls.VersionTLS12},
-			},
-		}, nil
+		return &http.Client{Timeout: timeout, Transport: newTransport()}, nil
 	}
 
-	tr := &http.Transport{
-		TLSClientConfig: &tls.Config{MinVersion: tls.VersionTLS12},
-	}
+	tr := newTransport()
 
 	switch entry.Scheme {
 	case "socks5", "socks5h":
@@ -0,0 +1,19 @@
+package proxy
+
+import (
+	"net/http"
+	"testing"
+)
+
+func TestHTTPClientKeepsConnsPerHost(t *testing.T) {
+	for _, e := range []*Entry{nil, {Scheme: "http", Server: "http://127.0.0.1:8080"}} {
+		c, err := HTTPClient(e, 0)
+		if err != nil {
+			t.Fatal(err)
+		}
+		tr, ok := c.Transport.(*http.Transport)
+		if !ok || tr.MaxIdleConnsPerHost != maxIdleConnsPerHost || !tr.ForceAttemptHTTP2 {
+			t.Fatalf("transport %#v", c.Transport)
+		}
+	}
+}